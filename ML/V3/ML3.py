@@ -3,13 +3,27 @@ import numpy as np
 import xgboost as xgb
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error
-import pulp as pl
 import matplotlib.pyplot as plt
 from sklearn.preprocessing import StandardScaler
 from sklearn.utils import resample
 import warnings
 import seaborn as sns
 from datetime import datetime
+import os
+import sys
+import time
+from functools import partial
+
+# Los motores de planificación compartidos viven en PL/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'PL'))
+from backends import get_backend
+from batch_solver import optimize_production_batch, plan_percentiles
+from lp_model import build_production_lp
+from lagrangian import optimize_production_lagrangian
+from multiproduct import optimize_production_joint
+from result_cache import ResultCache, cached_call
+from solver_config import ESTADOS_CON_SOLUCION, SolverConfig, get_config
+from solver_stats import JsonLinesSink, stats_record
 
 warnings.filterwarnings('ignore')
 
@@ -290,11 +304,7 @@ def predict_future_demand(features, model, scaler, periods=13):
 
         # Predecir
         prediction = model.predict(future_features_scaled)[0]
-        # Aplicar un factor de escala para reducir predicciones muy grandes
-        # Si la predicción es muy alta, la reducimos para que sea factible
-        if prediction > 1e8:  # Si es mayor a 100 millones
-            prediction = prediction / 10  # Reducir por un factor de 10
-
+        # Las magnitudes grandes las maneja el escalado del modelo (scaling.py)
         future_predictions.append(max(0, prediction))  # Asegurar que no sea negativa
 
     return future_predictions
@@ -329,22 +339,126 @@ def perform_bootstrapping(features, target, model, scaler, n_iterations=100):
     print(f"Predicción media: {mean_prediction:.2f}")
     print(f"Intervalo de confianza del 95%: [{lower_bound:.2f}, {upper_bound:.2f}]")
 
-    # Si la predicción es muy alta, ajustarla
-    if mean_prediction > 1e8:  # Si es mayor a 100 millones
-        mean_prediction = mean_prediction / 10  # Reducir por un factor de 10
-        lower_bound = lower_bound / 10
-        upper_bound = upper_bound / 10
-        print(f"Predicción ajustada: {mean_prediction:.2f}")
-        print(f"Intervalo de confianza ajustado: [{lower_bound:.2f}, {upper_bound:.2f}]")
-
     return mean_prediction, lower_bound, upper_bound
 
 
+def simulate_production_plans(features, target, model, scaler, future_demands, initial_stock,
+                              yield_percentage, density, max_productivity, safety_stocks,
+                              n_scenarios=1000, random_state=42):
+    """
+    Genera escenarios de demanda remuestreando los errores relativos del modelo
+    (bootstrap de residuos) y resuelve todos los planes en una sola llamada vectorizada.
+    Retorna los resultados por escenario y sus percentiles.
+    """
+    print(f"Simulando {n_scenarios} escenarios de demanda...")
+
+    # Errores relativos observados: demanda real / demanda predicha
+    fitted = model.predict(scaler.transform(features))
+    valid = np.abs(fitted) > 0
+    ratios = np.clip(np.asarray(target)[valid] / fitted[valid], 0, None)
+
+    if len(ratios) == 0:
+        ratios = np.ones(1)
+
+    rng = np.random.default_rng(random_state)
+    sampled = rng.choice(ratios, size=(n_scenarios, len(future_demands)), replace=True)
+    scenario_demands = sampled * np.asarray(future_demands, dtype=float)
+
+    batch_results = optimize_production_batch(
+        initial_stock, scenario_demands, yield_percentage, density, max_productivity, safety_stocks)
+    percentiles = plan_percentiles(batch_results)
+
+    feasible_fraction = batch_results['feasible'].mean()
+    print(f"Escenarios factibles: {feasible_fraction:.1%}")
+    if percentiles is not None:
+        p5, p50, p95 = percentiles['optimal_value']
+        print(f"Producción total (P5 / P50 / P95): {p5:.2f} / {p50:.2f} / {p95:.2f}")
+
+    return batch_results, percentiles
+
+
+# Niveles de relajación del modelo elástico (penalización por unidad, de menor a mayor):
+# primero la mitad del stock de seguridad, luego la otra mitad y por último la capacidad
+SAFETY_SLACK_TIERS = ((0.5, 1e3), (0.5, 1e4))
+CAPACITY_SLACK_PENALTY = 1e5
+
+# A partir de cuántos productos el modelo conjunto se resuelve por descomposición lagrangiana
+DECOMPOSITION_MIN_PRODUCTS = 100
+
+
+def _elastic_result(x, n_periods, safety_stocks, capacity, status='Optimal'):
+    """
+    Arma el resultado de linear_programming_optimization a partir de la solución
+    del modelo elástico, con el detalle de las restricciones relajadas.
+    """
+    production = x[:n_periods]
+    stocks = x[n_periods:2 * n_periods]
+    safety_slack = x[2 * n_periods:4 * n_periods].reshape(len(SAFETY_SLACK_TIERS), n_periods)
+    capacity_slack = x[4 * n_periods:5 * n_periods]
+
+    safety_relaxations = []
+    for t in range(n_periods):
+        tolerance = 1e-6 * max(1.0, abs(safety_stocks[t]))
+        shortfall = safety_slack[:, t].sum()
+        if shortfall > tolerance:
+            tiers = [k + 1 for k in range(len(SAFETY_SLACK_TIERS)) if safety_slack[k, t] > tolerance]
+            safety_relaxations.append({
+                'period': t,
+                'required': safety_stocks[t],
+                'shortfall': float(shortfall),
+                'tier': max(tiers)
+            })
+
+    capacity_relaxations = [
+        {'period': t, 'capacity': capacity, 'excess': float(capacity_slack[t])}
+        for t in range(n_periods) if capacity_slack[t] > 1e-6 * max(1.0, capacity)
+    ]
+
+    relaxations = {
+        'safety_stock': safety_relaxations,
+        'capacity': capacity_relaxations,
+        'safety_stock_total': sum(r['shortfall'] for r in safety_relaxations),
+        'capacity_total': sum(r['excess'] for r in capacity_relaxations)
+    }
+
+    return {
+        'status': status,
+        'production_levels': production.tolist(),
+        'ending_stocks': stocks.tolist(),
+        'relaxations': relaxations,
+        'configuration': {
+            'elastic': True,
+            'relaxed': bool(safety_relaxations or capacity_relaxations),
+            'max_safety_tier': max((r['tier'] for r in safety_relaxations), default=0),
+            'capacity_relaxed': bool(capacity_relaxations)
+        }
+    }
+
+
 def linear_programming_optimization(initial_stock, demands, yield_percentage,
-                                    density, max_productivity, safety_stocks=None):
+                                    density, max_productivity, safety_stocks=None, cache=None, backend=None,
+                                    stats_sink=None, config=None):
     """
-    Realiza la optimización mediante programación lineal con restricciones más flexibles.
+    Realiza la optimización mediante programación lineal con restricciones elásticas.
+
+    Se resuelve un único modelo en el que el stock de seguridad y la capacidad
+    se pueden violar con penalizaciones por niveles (SAFETY_SLACK_TIERS y
+    CAPACITY_SLACK_PENALTY), así que siempre tiene solución. El resultado incluye
+    'relaxations' con las restricciones relajadas por período y cuánto.
+
+    Con cache (ResultCache) las entradas ya resueltas se recuperan del disco.
+    Con backend ('highs', 'cbc', 'pdhg' o un SolverBackend) se elige el solucionador (CBC por defecto);
+    'pdhg' es el método de primer orden para modelos demasiado grandes para el simplex.
+    Con stats_sink (StatsSink) la resolución emite un registro de estadísticas.
+    Con config (SolverConfig) se fijan hilos, límite de tiempo, brechas, presolve y
+    modo anytime; una solución interrumpida por el límite tiene estado 'Incumbent'.
     """
+    if cache is not None:
+        return cached_call(cache, "ML3.linear_programming_optimization",
+                           partial(linear_programming_optimization, stats_sink=stats_sink),
+                           initial_stock, demands, yield_percentage, density, max_productivity, safety_stocks,
+                           backend=backend, config=get_config(config))
+
     print("Optimizando mediante programación lineal...")
 
     # Número de períodos
@@ -358,96 +472,48 @@ def linear_programming_optimization(initial_stock, demands, yield_percentage,
     if len(safety_stocks) != n_periods:
         raise ValueError("La longitud de safety_stocks debe ser igual a la longitud de demands")
 
-    # Reducir las demandas muy grandes para hacer el problema más factible
-    max_demand = max(demands)
-    scaling_factor = 1.0
-
-    if max_demand > max_productivity * 100:  # Si la demanda es más de 100 veces la capacidad
-        scaling_factor = (max_productivity * 100) / max_demand
-        print(f"Aplicando factor de escala {scaling_factor:.4f} a las demandas para viabilidad")
-        demands = [d * scaling_factor for d in demands]
-
-    # Intentar con diferentes configuraciones hasta encontrar una solución factible
-    attempts = [
-        {"use_slack": False, "reduce_safety": False},  # Intentar configuración original
-        {"use_slack": True, "reduce_safety": False},  # Añadir variables de holgura
-        {"use_slack": True, "reduce_safety": True},  # Añadir variables de holgura y reducir stock de seguridad
-    ]
-
-    for attempt_config in attempts:
-        use_slack = attempt_config["use_slack"]
-        reduce_safety = attempt_config["reduce_safety"]
-
-        # Crear el problema de programación lineal
-        prob = pl.LpProblem("Production_Optimization", pl.LpMinimize)
-
-        # Variables de decisión
-        production = [pl.LpVariable(f"production_{i}", lowBound=0) for i in range(n_periods)]
-        ending_stock = [pl.LpVariable(f"ending_stock_{i}", lowBound=0) for i in range(n_periods)]
-
-        # Variables de holgura si se utilizan
-        slack_vars = None
-        if use_slack:
-            slack_vars = [pl.LpVariable(f"slack_{i}", lowBound=0) for i in range(n_periods)]
-
-        # Función objetivo: minimizar la producción total y las variables de holgura si existen
-        if use_slack:
-            # Gran penalización para las variables de holgura (1000 veces más importantes que la producción)
-            prob += pl.lpSum(production) + 1000 * pl.lpSum(slack_vars)
+    # Capacidad efectiva del modelo: producción <= 1.1 * máx. y densidad * producción <= 1.2 * máx.
+    effective_capacity = min(max_productivity * 1.1, max_productivity * 1.2 / density)
+
+    # Un solo modelo elástico: el stock nunca es negativo y, si hace falta, se relaja
+    # primero la mitad del stock de seguridad, luego el resto y por último la capacidad
+    start = time.perf_counter()
+    lp = build_production_lp(
+        initial_stock, demands, yield_percentage, effective_capacity, safety_stocks, stock_floor=0,
+        safety_slack_penalty=SAFETY_SLACK_TIERS, capacity_slack_penalty=CAPACITY_SLACK_PENALTY)
+    # El escalado (scaling.py) lleva demandas, stocks y penalizaciones a magnitudes cercanas a 1
+    solver = get_backend("cbc" if backend is None else backend, scaling=True, config=config)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    solution = solver.solve(lp)
+    solve_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    status = solution['status']
+    result = None
+    if status in ESTADOS_CON_SOLUCION:
+        result = _elastic_result(solution['x'], n_periods, safety_stocks, effective_capacity, status)
+
+    if stats_sink is not None:
+        stats_sink.emit(stats_record(
+            "ML3.linear_programming_optimization", solver.name, n_periods, lp.num_rows, lp.num_columns,
+            lp.nonzeros, build_time, solution.get('write_s', 0.0), solve_time - solution.get('write_s', 0.0),
+            time.perf_counter() - start, solution.get('iterations'), status,
+            configuration=result['configuration'] if result is not None else None
+        ))
+
+    if result is not None:
+        relaxations = result['relaxations']
+        if result['configuration']['relaxed']:
+            print(f"Solución con restricciones relajadas: stock de seguridad "
+                  f"{relaxations['safety_stock_total']:.2f}, capacidad {relaxations['capacity_total']:.2f}")
         else:
-            prob += pl.lpSum(production)
-
-        # Restricciones
-        # 1. Balance de inventario
-        for i in range(n_periods):
-            if i == 0:
-                # Primer período: stock inicial + producción - demanda = stock final
-                prob += ending_stock[i] == initial_stock + production[i] * yield_percentage - demands[i]
-            else:
-                # Períodos siguientes: stock anterior + producción - demanda = stock final
-                prob += ending_stock[i] == ending_stock[i - 1] + production[i] * yield_percentage - demands[i]
-
-        # 2. Restricción de productividad máxima
-        for i in range(n_periods):
-            # Aumentar ligeramente el máximo para más flexibilidad
-            prob += production[i] <= max_productivity * 1.1
-
-        # 3. Restricción de stock de seguridad (con posible reducción)
-        safety_factor = 0.5 if reduce_safety else 1.0
-        for i in range(n_periods):
-            if use_slack:
-                # Con variable de holgura para permitir violaciones de la restricción
-                prob += ending_stock[i] + slack_vars[i] >= safety_stocks[i] * safety_factor
-            else:
-                prob += ending_stock[i] >= safety_stocks[i] * safety_factor
-
-        # 4. Restricción de densidad de producción (más flexible)
-        for i in range(n_periods):
-            prob += production[i] * density <= max_productivity * 1.2
-
-        # Resolver el problema
-        prob.solve()
-
-        # Si encontramos una solución óptima, retornarla
-        if pl.LpStatus[prob.status] == 'Optimal':
-            print(f"Solución encontrada con configuración: {attempt_config}")
-            # Extraer resultados
-            production_levels = [pl.value(p) for p in production]
-            ending_stocks = [pl.value(s) for s in ending_stock]
-
-            # Si aplicamos un factor de escala, reajustar los resultados
-            if scaling_factor < 1.0:
-                ending_stocks = [s / scaling_factor for s in ending_stocks]
-
-            return {
-                'status': 'Optimal',
-                'production_levels': production_levels,
-                'ending_stocks': ending_stocks,
-                'configuration': attempt_config
-            }
+            print("Solución encontrada sin relajar restricciones")
+        return result
 
-    # Si ninguna configuración funcionó
-    print("No se pudo encontrar una solución factible con ninguna configuración")
+    # Solo se llega aquí si el solucionador falla (el modelo elástico siempre es factible)
+    print(f"El solucionador no encontró solución (estado: {status})")
 
     # Como último recurso, calcular una solución heurística simple
     production_levels = []
@@ -468,10 +534,103 @@ def linear_programming_optimization(initial_stock, demands, yield_percentage,
         'status': 'Heuristic',
         'production_levels': production_levels,
         'ending_stocks': ending_stocks,
-        'configuration': {'use_slack': False, 'reduce_safety': False, 'heuristic': True}
+        'configuration': {'elastic': False, 'heuristic': True}
     }
 
 
+def joint_production_optimization(planning_inputs, total_capacity=None, cache=None, decomposition=False,
+                                  stats_sink=None, config=None, elastic=False):
+    """
+    Optimiza todos los productos en un solo modelo con la capacidad total compartida.
+    planning_inputs es un diccionario {product_id: parámetros de linear_programming_optimization}.
+    Usa las mismas restricciones que linear_programming_optimization sin holguras o,
+    con elastic=True, con las mismas holguras (SAFETY_SLACK_TIERS y CAPACITY_SLACK_PENALTY,
+    que también se aplica a la capacidad total); así el modelo conjunto siempre tiene
+    solución y cada producto trae 'relaxations' como en linear_programming_optimization.
+    Con decomposition=True (y capacidad total) el modelo se resuelve por descomposición
+    lagrangiana, con un subproblema por producto en procesos paralelos (ver lagrangian.py);
+    el resultado incluye además la brecha de dualidad ('gap').
+    stats_sink y config se usan como en linear_programming_optimization (config se
+    aplica al modelo conjunto o a cada subproblema).
+    """
+    if cache is not None:
+        return cached_call(cache, "ML3.joint_production_optimization",
+                           partial(joint_production_optimization, stats_sink=stats_sink),
+                           planning_inputs, total_capacity, decomposition=decomposition, config=get_config(config),
+                           elastic=elastic)
+
+    # La descomposición lagrangiana resuelve el modelo sin holguras
+    decomposition = decomposition and total_capacity is not None and not elastic
+    if decomposition:
+        print("Optimizando todos los productos por descomposición lagrangiana...")
+    else:
+        print("Optimizando todos los productos en un modelo conjunto...")
+
+    product_ids = list(planning_inputs.keys())
+    inputs = [planning_inputs[product_id] for product_id in product_ids]
+
+    demands = np.array([p['demands'] for p in inputs], dtype=float)
+    initial_stocks = np.array([p['initial_stock'] for p in inputs], dtype=float)
+    yields = np.array([p['yield_percentage'] for p in inputs], dtype=float)
+    max_productivity = np.array([p['max_productivity'] for p in inputs], dtype=float)
+    densities = np.array([p['density'] for p in inputs], dtype=float)
+    safety_stocks = np.maximum(0, np.array([p['safety_stocks'] for p in inputs], dtype=float))
+
+    # Producción <= 1.1 * máx. y densidad * producción <= 1.2 * máx.
+    capacities = np.minimum(max_productivity * 1.1, max_productivity * 1.2 / densities)
+
+    if decomposition:
+        start = time.perf_counter()
+        joint_results = optimize_production_lagrangian(
+            initial_stocks, demands, yields, capacities, total_capacity, safety_stocks, config=config)
+        if stats_sink is not None:
+            stats_sink.emit(stats_record(
+                "ML3.joint_production_optimization", "lagrangian", demands.shape[1], None, None, None, 0.0, 0.0,
+                time.perf_counter() - start, 0.0, joint_results.get('iterations'), joint_results['status']
+            ))
+        if 'gap' in joint_results:
+            print(f"Brecha de dualidad: {joint_results['gap']:.2e} ({joint_results['iterations']} iteraciones)")
+    elif elastic:
+        joint_results = optimize_production_joint(
+            initial_stocks, demands, yields, capacities, total_capacity, safety_stocks,
+            config=config, stats_sink=stats_sink, stock_floor=0, safety_slack_penalty=SAFETY_SLACK_TIERS,
+            capacity_slack_penalty=CAPACITY_SLACK_PENALTY)
+    else:
+        joint_results = optimize_production_joint(
+            initial_stocks, demands, yields, capacities, total_capacity, safety_stocks,
+            config=config, stats_sink=stats_sink)
+
+    print(f"Estado del modelo conjunto: {joint_results['status']}")
+    if joint_results['status'] not in ESTADOS_CON_SOLUCION:
+        return joint_results
+
+    if elastic:
+        # Mismo detalle de holguras que el modelo de un producto: [P, S, E_1, E_2, X] por producto
+        joint_results['products'] = {}
+        for i, product_id in enumerate(product_ids):
+            x = np.concatenate([joint_results['production_levels'][i], joint_results['ending_stocks'][i],
+                                *joint_results['safety_slack'][:, i], joint_results['capacity_slack'][i]])
+            product_results = _elastic_result(x, demands.shape[1], safety_stocks[i].tolist(), capacities[i],
+                                              joint_results['status'])
+            product_results['configuration']['joint'] = True
+            joint_results['products'][product_id] = product_results
+        shared_excess = joint_results.get('shared_capacity_slack')
+        if shared_excess is not None and shared_excess.max() > 1e-6 * max(1.0, float(np.max(total_capacity))):
+            print(f"Capacidad total excedida en {shared_excess.sum():.2f} unidades")
+        return joint_results
+
+    joint_results['products'] = {
+        product_id: {
+            'status': joint_results['status'],
+            'production_levels': joint_results['production_levels'][i].tolist(),
+            'ending_stocks': joint_results['ending_stocks'][i].tolist(),
+            'configuration': {'elastic': False, 'joint': True}
+        }
+        for i, product_id in enumerate(product_ids)
+    }
+    return joint_results
+
+
 def visualize_results(demands, production_levels, ending_stocks, product_id):
     """
     Visualiza los resultados de la optimización.
@@ -520,7 +679,7 @@ def save_results_to_csv(results, product_ids):
         if product_id in results:
             product_results = results[product_id]
 
-            if product_results['status'] in ['Optimal', 'Heuristic']:
+            if product_results['status'] in [*ESTADOS_CON_SOLUCION, 'Heuristic']:
                 # Crear un dataframe con los resultados detallados
                 df = pd.DataFrame({
                     'product_id': [product_id] * len(product_results['demands']),
@@ -579,6 +738,8 @@ def main():
         # 4. Procesar cada producto
         product_ids = ['21A', '22B', '23C']
         optimization_results = {}
+        planning_inputs = {}
+        plan_percentile_rows = []
 
         for product_id in product_ids:
             print(f"\n=== PROCESANDO PRODUCTO {product_id} ===")
@@ -644,17 +805,67 @@ def main():
             # Stocks de seguridad (reducidos a 5% de la demanda media para mejorar factibilidad)
             safety_stocks = [mean_prediction * 0.05] * len(future_demands)
 
-            # Realizar optimización
-            opt_results = linear_programming_optimization(
-                initial_stock, future_demands, yield_percentage, density, max_productivity, safety_stocks)
+            # Parámetros para la optimización conjunta
+            planning_inputs[product_id] = {
+                'initial_stock': initial_stock,
+                'demands': future_demands,
+                'yield_percentage': yield_percentage,
+                'density': density,
+                'max_productivity': max_productivity,
+                'safety_stocks': safety_stocks
+            }
+
+            # Distribución de planes bajo incertidumbre de la demanda (mismo modelo que el LP:
+            # el rendimiento afecta el balance y la densidad solo limita la producción)
+            _, percentiles = simulate_production_plans(
+                features, target, model, scaler, future_demands, initial_stock, yield_percentage, 1.0,
+                min(max_productivity * 1.1, max_productivity * 1.2 / density), safety_stocks)
+
+            if percentiles is not None:
+                for q, levels in zip(percentiles['percentiles'], percentiles['production_levels']):
+                    plan_percentile_rows.append(pd.DataFrame({
+                        'product_id': product_id,
+                        'period': range(1, len(levels) + 1),
+                        'percentile': q,
+                        'production': levels
+                    }))
+
+        # 5. Optimización conjunta con la capacidad total compartida (un solo modelo elástico o, con
+        # muchos productos, descomposición lagrangiana con un subproblema por producto)
+        total_capacity = None
+        if 'AvailableCapacity_Total' in boundary_conditions_clean.columns:
+            total_values = boundary_conditions_clean['AvailableCapacity_Total'].dropna()
+            if len(total_values) > 0:
+                total_capacity = np.percentile(total_values, 95)
+
+        cache = ResultCache('.cache_optimizacion')
+        stats_sink = JsonLinesSink('solver_stats.jsonl')  # Un registro por programa lineal resuelto
+        solver_config = SolverConfig()  # p. ej. SolverConfig(time_limit=60, anytime=True) para la ventana nocturna
+        joint_results = {'status': 'Not Solved'}
+        if planning_inputs:
+            joint_results = joint_production_optimization(
+                planning_inputs, total_capacity, cache=cache,
+                decomposition=len(planning_inputs) >= DECOMPOSITION_MIN_PRODUCTS,
+                stats_sink=stats_sink, config=solver_config,
+                elastic=len(planning_inputs) < DECOMPOSITION_MIN_PRODUCTS)
+
+        for product_id, inputs in planning_inputs.items():
+            if joint_results['status'] in ESTADOS_CON_SOLUCION:
+                opt_results = joint_results['products'][product_id]
+            else:
+                # Respaldo: optimización individual con holguras y heurística
+                opt_results = linear_programming_optimization(
+                    inputs['initial_stock'], inputs['demands'], inputs['yield_percentage'],
+                    inputs['density'], inputs['max_productivity'], inputs['safety_stocks'], cache=cache,
+                    stats_sink=stats_sink, config=solver_config)
 
             # Visualizar y almacenar resultados
-            if opt_results['status'] in ['Optimal', 'Heuristic']:
-                visualize_results(future_demands, opt_results['production_levels'], opt_results['ending_stocks'],
+            if opt_results['status'] in [*ESTADOS_CON_SOLUCION, 'Heuristic']:
+                visualize_results(inputs['demands'], opt_results['production_levels'], opt_results['ending_stocks'],
                                   product_id)
 
                 optimization_results[product_id] = {
-                    'demands': future_demands,
+                    'demands': inputs['demands'],
                     'production_levels': opt_results['production_levels'],
                     'ending_stocks': opt_results['ending_stocks'],
                     'status': opt_results['status']
@@ -663,9 +874,16 @@ def main():
             else:
                 print(f"No se pudo optimizar la producción para el producto {product_id}.")
 
-        # 5. Guardar resultados
+        cache_stats = cache.stats()
+        print(f"Caché de optimización: {cache_stats['hits']} aciertos, {cache_stats['misses']} fallos")
+
+        # 6. Guardar resultados
         save_results_to_csv(optimization_results, product_ids)
 
+        if plan_percentile_rows:
+            pd.concat(plan_percentile_rows, ignore_index=True).to_csv('production_plan_percentiles.csv', index=False)
+            print("Percentiles de los planes guardados en 'production_plan_percentiles.csv'")
+
         print("\n=== PROCESO DE OPTIMIZACIÓN COMPLETADO CON ÉXITO ===")
 
     except Exception as e:
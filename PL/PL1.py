@@ -1,6 +1,9 @@
 from pulp import *
 
-def optimize_production(initial_stock, demands, yield_percentage, density, max_productivity, safety_stocks=None):
+from lp_model import build_production_model
+
+def optimize_production(initial_stock, demands, yield_percentage, density, max_productivity, safety_stocks=None,
+                        formulation='cumulative'):
     """
     Optimizes production plan using linear programming to meet demand while minimizing productivity,
     considering yield, density, safety stock, and a final target stock of zero.
@@ -14,6 +17,9 @@ def optimize_production(initial_stock, demands, yield_percentage, density, max_p
         safety_stocks (list of float, optional): The safety stock for each period.
             If None, no safety stock constraint is applied.  Defaults to None.
             Must be the same length as demands if provided.
+        formulation (str, optional): 'cumulative' carries stock as a growing expression (original model),
+            'balance' uses one stock variable and one balance equality per period (linear size).
+            Defaults to 'cumulative'.
 
     Returns:
         dict: A dictionary containing the optimal solution:
@@ -32,24 +38,12 @@ def optimize_production(initial_stock, demands, yield_percentage, density, max_p
 
 
 
-    # 1. Create the problem
-    prob = LpProblem("Production_Optimization", LpMinimize)  # Minimize production
-
-    # 2. Define decision variables
-    production_vars = [LpVariable(f"P_{t}", 0, max_productivity) for t in range(num_periods)]  # Productivity in each period
-
-    # 3. Define the objective function (Minimize total production)
-    prob += lpSum(production_vars), "Total_Production"
-
-    # 4. Define the constraints
-    stock = initial_stock
-    for t in range(num_periods):
-        # Inventory balance constraint
-        stock = stock + (production_vars[t] * yield_percentage * density) - demands[t]
-        prob += stock >= safety_stocks[t], f"Inventory_Balance_{t}"
-
-    # Final stock constraint (zero stock at the end)
-    prob += stock == 0, "Final_Stock"
+    # 1-4. Create the problem, decision variables, objective and constraints
+    # (final stock constraint: zero stock at the end)
+    prob, production_vars, _ = build_production_model(
+        initial_stock, demands, yield_percentage, density, max_productivity, safety_stocks,
+        objective="min", formulation=formulation, final_stock=0, name="Production_Optimization"
+    )
 
     # 5. Solve the problem
     prob.solve()
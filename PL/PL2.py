@@ -1,7 +1,10 @@
 from pulp import *
 import pandas as pd
 
-def optimize_production(initial_stock, demands, yield_percentage, density, max_productivity, safety_stocks=None):
+from lp_model import build_production_model
+
+def optimize_production(initial_stock, demands, yield_percentage, density, max_productivity, safety_stocks=None,
+                        formulation='cumulative'):
 
     num_periods = len(demands)
 
@@ -11,25 +14,12 @@ def optimize_production(initial_stock, demands, yield_percentage, density, max_p
     elif len(safety_stocks) != num_periods:
         raise ValueError("Length of safety_stocks must equal the number of periods (demands).")
 
-    # 1. Create the problem
-    prob = LpProblem("Production_Optimization", LpMinimize)  # Minimize production
-
-    # 2. Define decision variables
-    production_vars = [LpVariable(f"P_{t}", 0, max_productivity) for t in range(num_periods)]  # Productivity in each period
-
-    # 3. Define the objective function (Minimize total production)
-    prob += lpSum(production_vars), "Total_Production"
-
-    # 4. Define the constraints
-    stock = initial_stock
-    stocks = []
-    for t in range(num_periods):
-        stock = stock + (production_vars[t] * yield_percentage * density) - demands[t]
-        prob += stock >= safety_stocks[t], f"Inventory_Balance_{t}"
-        stocks.append(stock)
-
-    # Final stock constraint (zero stock at the end)
-    prob += stock == 0, "Final_Stock"
+    # 1-4. Create the problem, decision variables, objective and constraints
+    # (final stock constraint: zero stock at the end)
+    prob, production_vars, _ = build_production_model(
+        initial_stock, demands, yield_percentage, density, max_productivity, safety_stocks,
+        objective="min", formulation=formulation, final_stock=0, name="Production_Optimization"
+    )
 
     # 5. Solve the problem
     prob.solve()
@@ -1,7 +1,11 @@
 from pulp import *
 import matplotlib.pyplot as plt
 
-def optimize_production(initial_stock, demands, yield_percentage, density, max_productivity, safety_stocks=None, objective='minimize'):
+from envelope import production_envelope
+from lp_model import build_production_model
+
+def optimize_production(initial_stock, demands, yield_percentage, density, max_productivity, safety_stocks=None, objective='minimize',
+                        formulation='cumulative'):
     """
     Optimizes the production plan using linear programming to meet demand, either minimizing or
     maximizing productivity, considering yield, density, safety stock, and a final target stock of zero.
@@ -15,8 +19,12 @@ def optimize_production(initial_stock, demands, yield_percentage, density, max_p
         safety_stocks (list of float, optional): The safety stock for each period.
             If None, no safety stock constraint is applied. Defaults to None.
             Must be the same length as demands if provided.
-        objective (str, optional): The optimization objective. Can be 'minimize' or 'maximize'.
+        objective (str, optional): The optimization objective. Can be 'minimize', 'maximize' or
+            'envelope' (both objectives on a single model plus the per-period production band).
             Defaults to 'minimize'.
+        formulation (str, optional): 'cumulative' carries stock as a growing expression (original model),
+            'balance' uses one stock variable and one balance equality per period (linear size).
+            Defaults to 'cumulative'.
 
     Returns:
         dict: A dictionary containing the optimal solution:
@@ -24,6 +32,8 @@ def optimize_production(initial_stock, demands, yield_percentage, density, max_p
             - 'production_levels': A list of optimal production levels for each period.
             - 'ending_stocks': A list of ending stock levels for each period.
             - 'status': The status of the optimization ('Optimal', 'Infeasible', etc.).
+        With objective='envelope': 'status', 'min' and 'max' (dictionaries as above) and
+        'band_min'/'band_max' (lowest and highest feasible production in each period).
     """
     num_periods = len(demands)
 
@@ -34,28 +44,21 @@ def optimize_production(initial_stock, demands, yield_percentage, density, max_p
         raise ValueError("Length of safety_stocks must equal the number of periods (demands).")
 
     # 1. Create the problem
-    if objective.lower() == 'minimize':
-        prob = LpProblem("Production_Optimization_Minimize", LpMinimize)
-    elif objective.lower() == 'maximize':
-        prob = LpProblem("Production_Optimization_Maximize", LpMaximize)
-    else:
-        raise ValueError("Invalid objective. Choose 'minimize' or 'maximize'.")
-
-    # 2. Define decision variables
-    production_vars = [LpVariable(f"P_{t}", 0, max_productivity) for t in range(num_periods)]  # Productivity in each period
-
-    # 3. Define the objective function (Minimize or Maximize total production)
-    prob += lpSum(production_vars), "Total_Production"
-
-    # 4. Define the constraints
-    stock = initial_stock
-    for t in range(num_periods):
-        # Inventory balance constraint
-        stock = stock + (production_vars[t] * yield_percentage * density) - demands[t]
-        prob += stock >= safety_stocks[t], f"Inventory_Balance_{t}"
-
-    # Final stock constraint (zero stock at the end)
-    prob += stock == 0, "Final_Stock"
+    if objective.lower() not in ('minimize', 'maximize', 'envelope'):
+        raise ValueError("Invalid objective. Choose 'minimize', 'maximize' or 'envelope'.")
+    if objective.lower() == 'envelope':
+        # Build once, solve both directions and derive the per-period band (final stock of zero)
+        return production_envelope(initial_stock, demands, yield_percentage, density, max_productivity,
+                                   safety_stocks, final_stock=0, formulation=formulation)
+    direction = 'min' if objective.lower() == 'minimize' else 'max'
+
+    # 2-4. Define decision variables, objective (Minimize or Maximize total production) and constraints
+    # (final stock constraint: zero stock at the end)
+    prob, production_vars, _ = build_production_model(
+        initial_stock, demands, yield_percentage, density, max_productivity, safety_stocks,
+        objective=direction, formulation=formulation, final_stock=0,
+        name=f"Production_Optimization_{objective.capitalize()}"
+    )
 
     # 5. Solve the problem
     prob.solve()
@@ -139,46 +142,30 @@ if __name__ == "__main__":
     max_productivity = 300
     safety_stocks = [20, 20, 20, 0] # Example safety stock levels. Last one is 0.
 
-    # Optimize to minimize productivity
+    # Minimize and maximize productivity on a single model
     try:
-        results_min = optimize_production(initial_stock, demands, yield_percentage, density, max_productivity, safety_stocks, objective='minimize')
-
-        print("\n--- Optimization Results (Minimize Productivity) ---")
-        print(f"Status: {results_min['status']}")
-        if results_min['status'] == 'Optimal':
-            print(f"Optimal Total Production: {results_min['optimal_value']}")
-            print("Production Levels:")
-            for t, p in enumerate(results_min['production_levels']):
-                print(f"  Period {t+1}: {p}")
-            print("Ending Stocks:")
-            for t, s in enumerate(results_min['ending_stocks']):
-                print(f"  Period {t+1}: {s}")
-            visualize_results(results_min, demands)
-        elif results_min['status'] == 'Infeasible':
+        envelope = optimize_production(initial_stock, demands, yield_percentage, density, max_productivity, safety_stocks, objective='envelope')
+
+        if envelope['status'] == 'Optimal':
+            for label, key in (('Minimize', 'min'), ('Maximize', 'max')):
+                results = envelope[key]
+                print(f"\n--- Optimization Results ({label} Productivity) ---")
+                print(f"Status: {results['status']}")
+                print(f"Optimal Total Production: {results['optimal_value']}")
+                print("Production Levels:")
+                for t, p in enumerate(results['production_levels']):
+                    print(f"  Period {t+1}: {p}")
+                print("Ending Stocks:")
+                for t, s in enumerate(results['ending_stocks']):
+                    print(f"  Period {t+1}: {s}")
+                visualize_results(results, demands)
+
+            print("\n--- Feasible Production Band per Period ---")
+            for t, (low, high) in enumerate(zip(envelope['band_min'], envelope['band_max'])):
+                print(f"  Period {t+1}: {low:.2f} - {high:.2f}")
+        elif envelope['status'] == 'Infeasible':
             print("Problem is infeasible: No solution satisfies all constraints.")
         else:
-            print(f"Problem status: {results_min['status']}. Check the model and data.")
+            print(f"Problem status: {envelope['status']}. Check the model and data.")
     except ValueError as e:
         print(f"Error: {e}")
-
-    # Optimize to maximize productivity
-    try:
-        results_max = optimize_production(initial_stock, demands, yield_percentage, density, max_productivity, safety_stocks, objective='maximize')
-
-        print("\n--- Optimization Results (Maximize Productivity) ---")
-        print(f"Status: {results_max['status']}")
-        if results_max['status'] == 'Optimal':
-            print(f"Optimal Total Production: {results_max['optimal_value']}")
-            print("Production Levels:")
-            for t, p in enumerate(results_max['production_levels']):
-                print(f"  Period {t+1}: {p}")
-            print("Ending Stocks:")
-            for t, s in enumerate(results_max['ending_stocks']):
-                print(f"  Period {t+1}: {s}")
-            visualize_results(results_max, demands)
-        elif results_max['status'] == 'Infeasible':
-            print("Problem is infeasible: No solution satisfies all constraints.")
-        else:
-            print(f"Problem status: {results_max['status']}. Check the model and data.")
-    except ValueError as e:
-        print(f"Error: {e}")
\ No newline at end of file
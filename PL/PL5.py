@@ -1,6 +1,8 @@
 from pulp import *
 import matplotlib.pyplot as plt
 
+from lp_model import build_production_model
+
 
 def optimize_production(
     initial_stock,
@@ -9,7 +11,8 @@ def optimize_production(
     density,
     max_productivity,
     safety_stocks=None,
-    objective="min"  # "min" to minimize productivity or "max" to maximize
+    objective="min",  # "min" to minimize productivity or "max" to maximize
+    formulation="cumulative"  # "cumulative" (original) or "balance" (explicit stock variables)
 ):
     num_periods = len(demands)
 
@@ -18,29 +21,12 @@ def optimize_production(
     elif len(safety_stocks) != num_periods:
         raise ValueError("Length of safety_stocks must equal the number of periods.")
 
-    # 1. Create problem
-    direction = LpMinimize if objective == "min" else LpMaximize
-    prob = LpProblem("Production_Optimization", direction)
-
-    # 2. Decision variables
-    production_vars = [LpVariable(f"P_{t}", 0, max_productivity) for t in range(num_periods)]
-
-    # 3. Objective function
-    prob += lpSum(production_vars), "Total_Production"
-
-    # 4. Constraints
-    stock = initial_stock
-    stock_vars = []  # Track ending stock levels for plotting
-
-    for t in range(num_periods):
-        # Inventory balance calculation
-        new_stock = stock + (production_vars[t] * yield_percentage * density) - demands[t]
-        prob += new_stock >= safety_stocks[t], f"Safety_Stock_{t}"
-        stock_vars.append(new_stock)
-        stock = new_stock  # Carry forward stock
-
-    # Final stock must be zero
-    prob += stock == 0, "Final_Stock_Zero"
+    # 1-4. Create problem, decision variables, objective function and constraints
+    # (final stock must be zero)
+    prob, production_vars, stock_vars = build_production_model(
+        initial_stock, demands, yield_percentage, density, max_productivity, safety_stocks,
+        objective=objective, formulation=formulation, final_stock=0, name="Production_Optimization"
+    )
 
     # 5. Solve
     prob.solve()
@@ -3,12 +3,28 @@ import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
 import os
-
-
-def cargar_datos_csv(ruta_archivo, corregir_problemas=True):
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from backends import SolverBackend, get_backend
+from capacity_finder import MARGEN, find_thresholds
+from feasibility import check_feasibility, imprimir_diagnostico
+from greedy import optimize_production_greedy, comparar_resultados
+from integer_planning import optimize_production_integer
+from lp_model import build_production_model, build_production_lp, model_size, production_result
+from planning_session import PlanningSession
+from result_cache import ResultCache
+from rolling_horizon import plan_rolling_horizon
+from solver_config import ESTADO_INCUMBENTE, ESTADOS_CON_SOLUCION, SolverConfig, get_config
+from solver_stats import MemorySink, solve_cbc_with_stats, stats_record, summarize
+
+
+def cargar_datos_csv(ruta_archivo, corregir_problemas=True, max_periodos=None):
     """
     Carga los datos desde un archivo CSV con manejo mejorado de errores y diagnóstico.
     Retorna un diccionario con los datos procesados.
+    Con max_periodos se limita el número de períodos; por defecto se conservan todos
+    (los horizontes largos se resuelven con plan_rolling_horizon).
     """
     try:
         # Verificar si el archivo existe
@@ -82,11 +98,10 @@ def cargar_datos_csv(ruta_archivo, corregir_problemas=True):
                     print("Se reemplazará con un valor más razonable: 1000")
                     stock_inicial = 1000
 
-        # Limitar el número de períodos si es excesivo
-        max_periodos = 52  # Un año de semanas
-        if len(periodos) > max_periodos:
+        # Limitar el número de períodos solo si se solicita
+        if max_periodos is not None and len(periodos) > max_periodos:
             print(f"\nADVERTENCIA: El número de períodos ({len(periodos)}) es muy alto.")
-            print(f"Para facilitar la optimización, se limitará a los primeros {max_periodos} períodos.")
+            print(f"Se limitará a los primeros {max_periodos} períodos.")
             periodos = periodos[:max_periodos]
             demandas = demandas[:max_periodos]
             stocks_seguridad = stocks_seguridad[:max_periodos]
@@ -175,10 +190,139 @@ def optimize_production(
         max_productivity,
         safety_stocks=None,
         objective="min",  # "min" to minimize productivity or "max" to maximize
-        debug=False
+        debug=False,
+        engine="cbc",  # "cbc" (PuLP + CBC), "greedy" (O(T), sin CBC), "highs" (en proceso), "pdhg" (primer orden), "integer" (obleas enteras), "auto" (despachador adaptativo) o un SolverBackend
+        cross_check=False,  # Con engine="greedy", verificar el resultado contra CBC
+        formulation="cumulative",  # "cumulative" (stock como expresión acumulada) o "balance" (variables de stock)
+        final_stock=None,  # None: stock final >= último stock de seguridad; número: stock final exacto
+        precheck=True,  # Descartar en O(T) los modelos infactibles antes de invocar el solucionador
+        cache=None,  # ResultCache opcional: entradas idénticas no vuelven a invocar al solucionador
+        stats_sink=None,  # StatsSink opcional: recibe un registro de estadísticas por programa lineal resuelto
+        scaling=True,  # Escalar el modelo matricial antes de resolver (engine="highs", "pdhg" o SolverBackend)
+        config=None  # SolverConfig opcional: hilos, límite de tiempo, brechas, presolve y modo anytime
 ):
     num_periods = len(demands)
 
+    if cache is not None:
+        argumentos = (initial_stock, demands, yield_percentage, density, max_productivity, safety_stocks)
+        opciones = {
+            'objective': objective,
+            'engine': engine,
+            'cross_check': cross_check,
+            'formulation': formulation,
+            'final_stock': final_stock,
+            'precheck': precheck
+        }
+        # La configuración y el escalado cambian el resultado (brechas, límite de tiempo), así que son parte
+        # de la clave; un SolverBackend entra con sus opciones (ver result_cache._canonico)
+        clave = cache.key("PL6.optimize_production", *argumentos,
+                          **dict(opciones, scaling=scaling, config=get_config(config)))
+        resultado = cache.get(clave)
+        if resultado is None:
+            resultado = optimize_production(*argumentos, debug=debug, stats_sink=stats_sink, scaling=scaling,
+                                            config=config, **opciones)
+            # Una solución interrumpida por el límite de tiempo no se guarda como definitiva
+            if resultado['status'] != ESTADO_INCUMBENTE:
+                cache.put(clave, resultado)
+        elif debug:
+            print("Resultado recuperado de la caché (sin invocar al solucionador).")
+        return resultado
+
+    # Verificación de factibilidad con sumas prefijas, sin resolver
+    if precheck:
+        pisos, final_exacto = safety_stocks, final_stock
+        if engine == "integer" and final_stock is not None and num_periods > 0:
+            # En obleas enteras el stock final es un mínimo: se verifica como piso del último período
+            pisos = list(safety_stocks) if safety_stocks is not None else [0] * num_periods
+            pisos[-1] = max(pisos[-1], final_stock)
+            final_exacto = None
+        reporte = check_feasibility(
+            initial_stock, demands, yield_percentage, density, max_productivity,
+            pisos, final_stock=final_exacto
+        )
+        if not reporte['feasible']:
+            if debug:
+                print("\nEl modelo es infactible (verificación previa, sin invocar el solucionador):")
+                imprimir_diagnostico(reporte)
+            return {
+                'status': 'Infeasible',
+                'feasibility': reporte
+            }
+
+    if engine == "greedy":
+        inicio = time.perf_counter()
+        resultado = optimize_production_greedy(
+            initial_stock, demands, yield_percentage, density, max_productivity,
+            safety_stocks, objective=objective, final_stock=final_stock
+        )
+        if stats_sink is not None:
+            # Sin modelo que construir ni archivo que escribir: todo el tiempo es de resolución
+            stats_sink.emit(stats_record(
+                "PL6.optimize_production", "greedy", num_periods, None, None, None, 0.0, 0.0,
+                time.perf_counter() - inicio, 0.0, None, resultado['status']
+            ))
+
+        if cross_check:
+            resultado_cbc = optimize_production(
+                initial_stock, demands, yield_percentage, density, max_productivity,
+                safety_stocks, objective=objective, debug=debug, engine="cbc",
+                formulation=formulation, final_stock=final_stock, stats_sink=stats_sink, config=config
+            )
+            coinciden, mensaje = comparar_resultados(resultado, resultado_cbc)
+            if not coinciden:
+                print(f"ADVERTENCIA: {mensaje} Se usará el resultado de CBC.")
+                return resultado_cbc
+            if debug:
+                print(mensaje)
+
+        return resultado
+    elif engine == "auto":
+        # El motor más rápido registrado para la clase de la instancia (ver dispatcher.py)
+        from dispatcher import default_dispatcher
+        resultado = default_dispatcher().solve(
+            initial_stock, demands, yield_percentage, density, max_productivity,
+            safety_stocks, objective=objective, final_stock=final_stock, config=config, debug=debug,
+            cross_check=cross_check, formulation=formulation, stats_sink=stats_sink, scaling=scaling
+        )
+        motor, clase = resultado.pop('engine'), resultado.pop('feature_class')
+        segundos = resultado.pop('elapsed_s')
+        if debug:
+            print(f"Despachador: motor '{motor}' para la clase {clase} ({segundos:.4f} s)")
+        return resultado
+    elif engine == "integer":
+        # Obleas enteras: relajación con HiGHS, redondeo y búsqueda local (ver integer_planning.py)
+        return optimize_production_integer(
+            initial_stock, demands, yield_percentage, density, max_productivity,
+            safety_stocks, objective=objective, final_stock=final_stock, scaling=scaling,
+            config=config, debug=debug
+        )
+    elif engine in ("highs", "pdhg") or isinstance(engine, SolverBackend):
+        # Matrices dispersas resueltas en proceso, sin archivos temporales ni subprocesos
+        inicio = time.perf_counter()
+        lp = build_production_lp(
+            initial_stock, demands, yield_percentage * density, max_productivity,
+            safety_stocks, objective=objective, final_stock=final_stock
+        )
+        backend = get_backend(engine, scaling=scaling, config=config)
+        tiempo_construccion = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        solucion = backend.solve(lp)
+        tiempo_resolucion = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        resultado = production_result(solucion, num_periods)
+        if stats_sink is not None:
+            stats_sink.emit(stats_record(
+                "PL6.optimize_production", backend.name, num_periods, lp.num_rows, lp.num_columns,
+                lp.nonzeros, tiempo_construccion, solucion.get('write_s', 0.0),
+                tiempo_resolucion - solucion.get('write_s', 0.0), time.perf_counter() - inicio,
+                solucion.get('iterations'), solucion['status']
+            ))
+        return resultado
+    elif engine != "cbc":
+        raise ValueError("Motor inválido. Use 'cbc', 'greedy', 'highs', 'pdhg', 'integer', 'auto' o una instancia de SolverBackend.")
+
     if safety_stocks is None:
         safety_stocks = [0] * num_periods
     elif len(safety_stocks) != num_periods:
@@ -194,71 +338,64 @@ def optimize_production(
         print("\nResumen de restricciones:")
         print(f"Factor de producción efectiva: {yield_percentage * density}")
 
-    # 1. Crear problema
-    direction = LpMinimize if objective == "min" else LpMaximize
-    prob = LpProblem("Optimizacion_Produccion", direction)
-
-    # 2. Variables de decisión
-    production_vars = [LpVariable(f"P_{t}", 0, max_productivity) for t in range(num_periods)]
-
-    # 3. Función objetivo
-    prob += lpSum(production_vars), "Produccion_Total"
-
-    # 4. Restricciones
-    stock = initial_stock
-    stock_vars = []  # Para seguimiento de niveles de stock finales
-
-    for t in range(num_periods):
-        # Cálculo del balance de inventario
-        new_stock = stock + (production_vars[t] * yield_percentage * density) - demands[t]
-        prob += new_stock >= safety_stocks[t], f"Stock_Seguridad_{t}"
-        stock_vars.append(new_stock)
-        stock = new_stock  # Llevar el stock hacia adelante
-
-    # El stock final debe ser igual o mayor que el último stock de seguridad
-    prob += stock >= safety_stocks[-1], "Stock_Final_Minimo"
+    # 1-4. Crear problema, variables, función objetivo y restricciones
+    inicio = time.perf_counter()
+    prob, production_vars, stock_vars = build_production_model(
+        initial_stock, demands, yield_percentage, density, max_productivity,
+        safety_stocks, objective=objective, formulation=formulation, final_stock=final_stock
+    )
+    tiempo_construccion = time.perf_counter() - inicio
 
     # 5. Resolver
-    status = prob.solve(PULP_CBC_CMD(msg=debug))
+    config = get_config(config)
+    if stats_sink is None:
+        prob.solve(PULP_CBC_CMD(msg=debug, **config.cbc_options()))
+    else:
+        estadisticas = solve_cbc_with_stats(prob, msg=debug, **config.cbc_options())
+    estado = config.cbc_status(prob)
 
     # 6. Extraer resultados
-    if LpStatus[prob.status] == 'Optimal':
+    inicio = time.perf_counter()
+    if estado in ESTADOS_CON_SOLUCION:
         optimal_value = value(prob.objective)
         production_levels = [value(var) for var in production_vars]
         ending_stocks = [value(s) for s in stock_vars]
 
-        return {
+        resultado = {
             'optimal_value': optimal_value,
             'production_levels': production_levels,
             'ending_stocks': ending_stocks,
-            'status': LpStatus[prob.status]
+            'status': estado
         }
     else:
+        resultado = {
+            'status': estado
+        }
+
+    if stats_sink is not None:
+        rows, columns, nonzeros = model_size(prob)
+        stats_sink.emit(stats_record(
+            "PL6.optimize_production", "cbc", num_periods, rows, columns, nonzeros, tiempo_construccion,
+            estadisticas['write_s'], estadisticas['solve_s'], time.perf_counter() - inicio,
+            estadisticas['iterations'], estado
+        ))
+
+    if resultado['status'] == ESTADO_INCUMBENTE:
+        if debug:
+            print(f"\nLímite de tiempo alcanzado: se retorna la mejor solución encontrada (no demostrada óptima).")
+    elif resultado['status'] != 'Optimal':
         if debug:
             print("\nNo se encontró solución óptima. Diagnóstico del problema:")
-            print(f"Estado: {LpStatus[prob.status]}")
+            print(f"Estado: {estado}")
 
             # Analizar por qué podría ser inviable
             if LpStatus[prob.status] == 'Infeasible':
-                total_demand = sum(demands)
-                max_possible_production = max_productivity * num_periods * yield_percentage * density
-
-                print(f"Demanda total: {total_demand}")
-                print(f"Producción máxima posible: {max_possible_production}")
+                imprimir_diagnostico(check_feasibility(
+                    initial_stock, demands, yield_percentage, density, max_productivity,
+                    safety_stocks, final_stock=final_stock
+                ))
 
-                if total_demand > max_possible_production + initial_stock:
-                    print("DIAGNÓSTICO: La demanda total excede la capacidad máxima de producción.")
-                    print("Recomendación: Aumentar la productividad máxima o reducir la demanda.")
-
-                # Verificar balance inicial
-                if initial_stock < safety_stocks[0]:
-                    print(
-                        "DIAGNÓSTICO: El stock inicial es menor que el stock de seguridad requerido para el primer período.")
-                    print(f"Stock inicial: {initial_stock}, Stock de seguridad requerido: {safety_stocks[0]}")
-
-        return {
-            'status': LpStatus[prob.status]
-        }
+    return resultado
 
 
 def plot_results(periodos, production, stocks, demands, safety_stocks):
@@ -325,8 +462,8 @@ def validar_solucion(resultados, datos):
     """
     Valida la solución para asegurar que es viable y cumple todas las restricciones.
     """
-    if resultados['status'] != 'Optimal':
-        return False, "No se encontró una solución óptima."
+    if resultados['status'] not in ESTADOS_CON_SOLUCION:
+        return False, "No se encontró una solución."
 
     # Validar que la producción no excede el máximo
     for i, prod in enumerate(resultados['production_levels']):
@@ -341,110 +478,200 @@ def validar_solucion(resultados, datos):
     return True, "La solución es viable y cumple todas las restricciones."
 
 
-def intentar_resolver_con_parametros_alternativos(datos, intento=1, max_intentos=5):
+def estrategias_alternativas(datos):
     """
-    Intenta encontrar una solución usando diferentes configuraciones de parámetros.
-    """
-    print(f"\nIntentando resolución alternativa (intento {intento}/{max_intentos})...")
+    Retorna las estrategias de ajuste en orden de prioridad como una lista de
+    (mensajes, parámetros), donde parámetros reemplaza los valores originales.
 
-    # Parámetros originales
-    yield_percentage_original = YIELD_PERCENTAGE
-    density_original = DENSITY
-    max_productivity_original = MAX_PRODUCTIVITY
-    stock_inicial_original = datos['stock_inicial']
+    Los ajustes son los umbrales exactos de factibilidad (verificación O(T) de
+    capacity_finder); se omiten los que ningún valor del parámetro puede resolver.
+    """
+    umbrales = find_thresholds(
+        datos['stock_inicial'], datos['demandas'], YIELD_PERCENTAGE, DENSITY, MAX_PRODUCTIVITY,
+        datos['stocks_seguridad']
+    )
+    stock_inicial_extremo = max(sum(datos['demandas'][:3]), 5000)
+
+    estrategias = []
+
+    # 1. Aumentar la productividad máxima justo hasta la mínima factible
+    if umbrales['min_max_productivity'] is not None:
+        estrategias.append((
+            [f"Aumentando productividad máxima: {MAX_PRODUCTIVITY} → {umbrales['min_max_productivity']:.2f} "
+             f"(mínima factible)"],
+            {'max_productivity': umbrales['min_max_productivity']}
+        ))
+
+    # 2. Aumentar el rendimiento y la densidad, con la productividad mínima factible
+    #    para el nuevo factor (no menor que la actual)
+    yield_percentage_nuevo = min(1.0, YIELD_PERCENTAGE * 1.5)
+    density_nuevo = min(1.0, DENSITY * 1.5)
+    umbral_factor = check_feasibility(
+        datos['stock_inicial'], datos['demandas'], yield_percentage_nuevo, density_nuevo, MAX_PRODUCTIVITY,
+        datos['stocks_seguridad']
+    )['min_max_productivity']
+    if umbral_factor is not None:
+        productividad = max(MAX_PRODUCTIVITY, umbral_factor + MARGEN * max(1.0, umbral_factor))
+        estrategias.append((
+            [f"Aumentando rendimiento: {YIELD_PERCENTAGE} → {yield_percentage_nuevo}",
+             f"Aumentando densidad: {DENSITY} → {density_nuevo}",
+             f"Productividad máxima: {MAX_PRODUCTIVITY} → {productividad:.2f}"],
+            {'yield_percentage': yield_percentage_nuevo, 'density': density_nuevo,
+             'max_productivity': productividad}
+        ))
+
+    # 3. Reducir los stocks de seguridad a la mayor fracción que se puede cumplir
+    if umbrales['max_safety_fraction'] is not None:
+        fraccion = umbrales['max_safety_fraction']
+        estrategias.append((
+            [f"Reduciendo stocks de seguridad al {fraccion:.2%} de los valores originales (máximo factible)"],
+            {'safety_stocks': [max(0, s * fraccion) for s in datos['stocks_seguridad']]}
+        ))
+
+    # 4. Aumentar el stock inicial hasta el mínimo factible
+    if umbrales['min_initial_stock'] is not None:
+        estrategias.append((
+            [f"Ajustando stock inicial: {datos['stock_inicial']} → {umbrales['min_initial_stock']:.2f} "
+             f"(mínimo factible)"],
+            {'initial_stock': umbrales['min_initial_stock']}
+        ))
+
+    # 5. Usar configuración extrema
+    estrategias.append((
+        ["Usando configuración máxima para encontrar cualquier solución viable"],
+        {'initial_stock': stock_inicial_extremo, 'yield_percentage': 1.0, 'density': 1.0,
+         'max_productivity': 100000, 'safety_stocks': [0] * len(datos['stocks_seguridad'])}
+    ))
+
+    return estrategias
+
+
+def _resolver_estrategia(parametros):
+    """
+    Resuelve una estrategia en un proceso del pool (no depende de variables globales).
+    """
+    return optimize_production(
+        parametros['initial_stock'],
+        parametros['demands'],
+        parametros['yield_percentage'],
+        parametros['density'],
+        parametros['max_productivity'],
+        parametros['safety_stocks'],
+        objective=parametros['objective'],
+        config=parametros['config']
+    )
+
+
+def _resolver_estrategias_en_paralelo(datos, estrategias, primer_intento, max_workers=None, config=None):
+    """
+    Evalúa todas las estrategias a la vez y retorna (resultado, intento) de la
+    primera estrategia factible según el orden de prioridad, o (None, 0).
+    El trabajo pendiente de menor prioridad se cancela en cuanto se conoce la respuesta.
+    """
+    # Sin estrategias (intento > max_intentos) no hay nada que evaluar ni pool que crear
+    if not estrategias:
+        return None, 0
+
+    base = {
+        'initial_stock': datos['stock_inicial'],
+        'demands': datos['demandas'],
+        'yield_percentage': YIELD_PERCENTAGE,
+        'density': DENSITY,
+        'max_productivity': MAX_PRODUCTIVITY,
+        'safety_stocks': datos['stocks_seguridad'],
+        'objective': OBJETIVO,
+        'config': config
+    }
+
+    executor = ProcessPoolExecutor(max_workers=max_workers or len(estrategias))
+    futuros = {}
+    for indice, (mensajes, parametros) in enumerate(estrategias):
+        for mensaje in mensajes:
+            print(f"[intento {primer_intento + indice}] {mensaje}")
+        argumentos = dict(base)
+        argumentos.update(parametros)
+        futuros[executor.submit(_resolver_estrategia, argumentos)] = indice
+
+    resultados = {}
+    mejor = None
+    pendientes = set(futuros)
+    try:
+        while pendientes:
+            terminados, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in terminados:
+                indice = futuros[futuro]
+                resultados[indice] = futuro.result()
+                if resultados[indice]['status'] in ESTADOS_CON_SOLUCION and (mejor is None or indice < mejor):
+                    mejor = indice
+
+            # La respuesta es definitiva cuando todas las estrategias prioritarias terminaron
+            if mejor is not None and all(i in resultados for i in range(mejor)):
+                break
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if mejor is None:
+        return None, 0
+    return resultados[mejor], primer_intento + mejor
+
+
+def intentar_resolver_con_parametros_alternativos(datos, intento=1, max_intentos=5, sesion=None,
+                                                  paralelo=False, max_workers=None, stats_sink=None, config=None):
+    """
+    Intenta encontrar una solución usando diferentes configuraciones de parámetros.
+    El modelo se construye una sola vez (PlanningSession) y cada intento solo
+    actualiza los parámetros que cambia su estrategia.
 
-    # Estrategias de ajuste según el intento
-    if intento == 1:
-        # Aumentar la productividad máxima
-        MAX_PRODUCTIVITY_NUEVO = MAX_PRODUCTIVITY * 5
-        print(f"Aumentando productividad máxima: {MAX_PRODUCTIVITY} → {MAX_PRODUCTIVITY_NUEVO}")
+    Con paralelo=True todas las estrategias se resuelven a la vez en un pool de
+    procesos y se conserva la primera factible según el orden de prioridad.
 
-        resultado = optimize_production(
-            datos['stock_inicial'],
-            datos['demandas'],
-            YIELD_PERCENTAGE,
-            DENSITY,
-            MAX_PRODUCTIVITY_NUEVO,
-            datos['stocks_seguridad'],
-            objective=OBJETIVO,
-            debug=True
-        )
+    Con stats_sink (y sin paralelo) cada intento resuelto emite un registro de
+    estadísticas con su número de intento. config (SolverConfig) se aplica a cada resolución.
+    """
+    estrategias = estrategias_alternativas(datos)
+    max_intentos = min(max_intentos, len(estrategias))
 
-    elif intento == 2:
-        # Aumentar el rendimiento y la densidad
-        YIELD_PERCENTAGE_NUEVO = min(1.0, YIELD_PERCENTAGE * 1.5)
-        DENSITY_NUEVO = min(1.0, DENSITY * 1.5)
-        print(f"Aumentando rendimiento: {YIELD_PERCENTAGE} → {YIELD_PERCENTAGE_NUEVO}")
-        print(f"Aumentando densidad: {DENSITY} → {DENSITY_NUEVO}")
+    if paralelo:
+        print(f"\nResolviendo en paralelo los intentos {intento} a {max_intentos}...")
+        resultado, numero = _resolver_estrategias_en_paralelo(
+            datos, estrategias[intento - 1:max_intentos], intento, max_workers, config)
 
-        resultado = optimize_production(
-            datos['stock_inicial'],
-            datos['demandas'],
-            YIELD_PERCENTAGE_NUEVO,
-            DENSITY_NUEVO,
-            MAX_PRODUCTIVITY * 2,
-            datos['stocks_seguridad'],
-            objective=OBJETIVO,
-            debug=True
-        )
+        if resultado is not None:
+            print(f"\n✅ Se encontró una solución viable con parámetros alternativos (intento {numero})!")
+            return resultado, numero
 
-    elif intento == 3:
-        # Reducir stocks de seguridad
-        stocks_seguridad_nuevos = [max(0, s * 0.5) for s in datos['stocks_seguridad']]
-        print("Reduciendo stocks de seguridad al 50% de los valores originales")
+        print("\n❌ No se pudo encontrar una solución después de varios intentos.")
+        return {'status': 'Infeasible'}, 0
 
-        resultado = optimize_production(
+    if sesion is None:
+        sesion = PlanningSession(
             datos['stock_inicial'],
             datos['demandas'],
             YIELD_PERCENTAGE,
             DENSITY,
-            MAX_PRODUCTIVITY * 3,
-            stocks_seguridad_nuevos,
+            MAX_PRODUCTIVITY,
+            datos['stocks_seguridad'],
             objective=OBJETIVO,
-            debug=True
+            debug=True,
+            stats_sink=stats_sink,
+            config=config
         )
 
-    elif intento == 4:
-        # Ajustar stock inicial
-        stock_inicial_nuevo = max(sum(datos['stocks_seguridad'][:3]), 1000)
-        print(f"Ajustando stock inicial: {datos['stock_inicial']} → {stock_inicial_nuevo}")
+    for numero in range(intento, max_intentos + 1):
+        print(f"\nIntentando resolución alternativa (intento {numero}/{max_intentos})...")
 
-        resultado = optimize_production(
-            stock_inicial_nuevo,
-            datos['demandas'],
-            YIELD_PERCENTAGE,
-            DENSITY,
-            MAX_PRODUCTIVITY * 4,
-            datos['stocks_seguridad'],
-            objective=OBJETIVO,
-            debug=True
-        )
+        mensajes, parametros = estrategias[numero - 1]
+        for mensaje in mensajes:
+            print(mensaje)
 
-    elif intento == 5:
-        # Usar configuración extrema
-        print("Usando configuración máxima para encontrar cualquier solución viable")
-        stock_inicial_nuevo = max(sum(datos['demandas'][:3]), 5000)
-        stocks_seguridad_nuevos = [0] * len(datos['stocks_seguridad'])
+        resultado = sesion.solve_with(attempt=numero, **parametros)
 
-        resultado = optimize_production(
-            stock_inicial_nuevo,
-            datos['demandas'],
-            1.0,  # Rendimiento máximo
-            1.0,  # Densidad máxima
-            100000,  # Productividad muy alta
-            stocks_seguridad_nuevos,
-            objective=OBJETIVO,
-            debug=True
-        )
+        if resultado['status'] in ESTADOS_CON_SOLUCION:
+            print("\n✅ Se encontró una solución viable con parámetros alternativos!")
+            return resultado, numero
 
-    if resultado['status'] == 'Optimal':
-        print("\n✅ Se encontró una solución viable con parámetros alternativos!")
-        return resultado, intento
-    elif intento < max_intentos:
-        return intentar_resolver_con_parametros_alternativos(datos, intento + 1, max_intentos)
-    else:
-        print("\n❌ No se pudo encontrar una solución después de varios intentos.")
-        return {'status': 'Infeasible'}, 0
+    print("\n❌ No se pudo encontrar una solución después de varios intentos.")
+    return {'status': 'Infeasible'}, 0
 
 
 if __name__ == "__main__":
@@ -453,6 +680,12 @@ if __name__ == "__main__":
     DENSITY = 0.9  # Densidad
     MAX_PRODUCTIVITY = 300  # Productividad máxima por período
     OBJETIVO = "min"  # "min" para minimizar producción, "max" para maximizar
+    ALTERNATIVAS_EN_PARALELO = False  # Resolver todas las estrategias alternativas a la vez
+    VENTANA_HORIZONTE = 52  # Horizontes más largos se resuelven por ventanas rodantes
+    PERIODOS_FIJADOS = 26  # Períodos que se fijan de cada ventana
+    CACHE = ResultCache(".cache_optimizacion")  # Resultados ya resueltos para las mismas entradas
+    ESTADISTICAS = MemorySink()  # Un registro por programa lineal resuelto (JsonLinesSink o SQLiteSink para persistirlos)
+    CONFIGURACION = SolverConfig()  # p. ej. SolverConfig(time_limit=60, anytime=True) para la ventana nocturna
 
     # Archivo CSV de entrada
     ARCHIVO_CSV = "resultado_produccion.csv"
@@ -470,34 +703,66 @@ if __name__ == "__main__":
 
         # Ejecutar optimización
         print("\nEjecutando optimización de producción...")
-        resultado = optimize_production(
-            datos['stock_inicial'],
-            datos['demandas'],
-            YIELD_PERCENTAGE,
-            DENSITY,
-            MAX_PRODUCTIVITY,
-            datos['stocks_seguridad'],
-            objective=OBJETIVO,
-            debug=True
-        )
+        if datos['num_periodos'] > VENTANA_HORIZONTE:
+            print(f"Horizonte largo: ventanas de {VENTANA_HORIZONTE} períodos, fijando {PERIODOS_FIJADOS} por ventana")
+            resultado = plan_rolling_horizon(
+                datos['stock_inicial'],
+                datos['demandas'],
+                YIELD_PERCENTAGE,
+                DENSITY,
+                MAX_PRODUCTIVITY,
+                datos['stocks_seguridad'],
+                window=VENTANA_HORIZONTE,
+                commit=PERIODOS_FIJADOS,
+                objective=OBJETIVO,
+                optimizer=optimize_production,
+                debug=True,
+                cache=CACHE,
+                stats_sink=ESTADISTICAS,
+                config=CONFIGURACION
+            )
+        else:
+            resultado = optimize_production(
+                datos['stock_inicial'],
+                datos['demandas'],
+                YIELD_PERCENTAGE,
+                DENSITY,
+                MAX_PRODUCTIVITY,
+                datos['stocks_seguridad'],
+                objective=OBJETIVO,
+                debug=True,
+                cache=CACHE,
+                stats_sink=ESTADISTICAS,
+                config=CONFIGURACION
+            )
 
         print(f"\nEstado de la Optimización: {resultado['status']}")
+        estadisticas_cache = CACHE.stats()
+        print(f"Caché: {estadisticas_cache['hits']} aciertos, {estadisticas_cache['misses']} fallos")
 
         # Si no se encuentra solución, intentar con parámetros alternativos
-        if resultado['status'] != 'Optimal':
+        if resultado['status'] not in ESTADOS_CON_SOLUCION:
             print("\nBuscando soluciones alternativas...")
-            resultado_alternativo, intento_exitoso = intentar_resolver_con_parametros_alternativos(datos)
+            resultado_alternativo, intento_exitoso = intentar_resolver_con_parametros_alternativos(
+                datos, paralelo=ALTERNATIVAS_EN_PARALELO, stats_sink=ESTADISTICAS, config=CONFIGURACION)
 
-            if resultado_alternativo['status'] == 'Optimal':
+            if resultado_alternativo['status'] in ESTADOS_CON_SOLUCION:
                 resultado = resultado_alternativo
                 print(f"\nSe encontró una solución viable en el intento {intento_exitoso}.")
 
-        if resultado['status'] == 'Optimal':
+        tiempos = summarize(ESTADISTICAS.records)
+        print(f"Solucionador: {tiempos['solves']} resoluciones; construcción {tiempos['build_s']:.3f} s, "
+              f"escritura {tiempos['write_s']:.3f} s, resolución {tiempos['solve_s']:.3f} s, "
+              f"extracción {tiempos['extract_s']:.3f} s")
+
+        if resultado['status'] in ESTADOS_CON_SOLUCION:
             # Validar la solución
             es_viable, mensaje = validar_solucion(resultado, datos)
 
             if es_viable:
                 print(f"✅ {mensaje}")
+                if resultado['status'] == ESTADO_INCUMBENTE:
+                    print("Límite de tiempo alcanzado: mejor solución encontrada, no demostrada óptima.")
                 print(f"Valor Óptimo ({'mínimo' if OBJETIVO == 'min' else 'máximo'}): {resultado['optimal_value']:.2f}")
 
                 # Mostrar resultados resumidos
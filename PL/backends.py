@@ -0,0 +1,231 @@
+"""
+Solucionadores intercambiables para los modelos en forma matricial (LinearProgram).
+
+    - HighsBackend: resuelve en el mismo proceso con HiGHS a través de
+      scipy.optimize.linprog, directamente sobre las matrices dispersas
+      (sin archivos temporales ni subprocesos).
+    - CbcBackend: traduce el modelo a PuLP y lo resuelve con CBC como hasta ahora.
+    - PdhgBackend: método de primer orden sin factorizar (ver pdhg.py), para
+      modelos continuos demasiado grandes para el simplex; solución aproximada
+      con la tolerancia indicada.
+    - ScaledBackend: envuelve a otro backend y resuelve el modelo escalado
+      (ver scaling.py), con la solución y los duales en las unidades originales.
+
+Todos retornan un diccionario con 'status' (nombres de PuLP), 'x', 'objective',
+'eq_duals', 'ub_duals', 'upper_duals' (sensibilidad del objetivo a las cotas
+superiores de las variables), 'iterations' y 'write_s' (tiempo de escritura de
+archivos intermedios, 0 en proceso). Con una SolverConfig en modo anytime el
+estado puede ser 'Incumbent' (ver solver_config.py), también con 'x'.
+"""
+
+import numpy as np
+import pulp as pl
+from scipy.optimize import linprog
+
+from pdhg import solve_pdhg
+from scaling import compute_scaling, scale_program, unscale_solution
+from solver_config import ESTADOS_CON_SOLUCION, get_config
+from solver_stats import solve_cbc_with_stats
+
+# Violación relativa máxima de las restricciones de un punto interrumpido para considerarlo factible
+TOLERANCIA_FACTIBILIDAD = 1e-6
+
+# Estados de scipy.optimize.linprog traducidos a los nombres de PuLP
+ESTADOS_LINPROG = {
+    0: 'Optimal',
+    1: 'Not Solved',
+    2: 'Infeasible',
+    3: 'Unbounded',
+    4: 'Not Solved'
+}
+
+
+class SolverBackend:
+    """
+    Interfaz común: solve(lp) recibe un LinearProgram y retorna el diccionario de solución.
+    """
+
+    name = None
+
+    def solve(self, lp):
+        raise NotImplementedError
+
+
+class HighsBackend(SolverBackend):
+    """
+    HiGHS en proceso vía SciPy. options (opciones de linprog) tienen prioridad sobre config.
+    """
+
+    name = "highs"
+
+    def __init__(self, config=None, **options):
+        self.config = get_config(config)
+        self.options = dict(self.config.highs_options(), **options)
+
+    def solve(self, lp):
+        signo = 1.0 if lp.sense == "min" else -1.0
+        res = linprog(
+            signo * lp.c,
+            A_ub=lp.A_ub,
+            b_ub=lp.b_ub,
+            A_eq=lp.A_eq,
+            b_eq=lp.b_eq,
+            bounds=np.column_stack([lp.lower, lp.upper]),
+            method='highs',
+            integrality=lp.integrality,
+            options=self.options or None
+        )
+
+        factible = res.x is not None and lp.primal_residual(res.x) <= TOLERANCIA_FACTIBILIDAD
+        status = self.config.highs_status(ESTADOS_LINPROG.get(res.status, 'Not Solved'), factible)
+        solucion = {'status': status, 'iterations': getattr(res, 'nit', None), 'write_s': 0.0}
+        if status not in ESTADOS_CON_SOLUCION:
+            return solucion
+
+        solucion['x'] = res.x
+        solucion['objective'] = float(lp.c @ res.x)
+        ineqlin = getattr(res, 'ineqlin', None)
+        eqlin = getattr(res, 'eqlin', None)
+        solucion['ub_duals'] = signo * ineqlin.marginals if ineqlin is not None and lp.A_ub is not None else None
+        solucion['eq_duals'] = signo * eqlin.marginals if eqlin is not None and lp.A_eq is not None else None
+        upper = getattr(res, 'upper', None)
+        solucion['upper_duals'] = signo * upper.marginals if upper is not None else None
+        return solucion
+
+
+class CbcBackend(SolverBackend):
+    """
+    CBC a través de PuLP (archivo MPS + subproceso). options (argumentos de
+    PULP_CBC_CMD) tienen prioridad sobre config.
+    """
+
+    name = "cbc"
+
+    def __init__(self, msg=False, config=None, **options):
+        self.msg = msg
+        self.config = get_config(config)
+        self.options = dict(self.config.cbc_options(), **options)
+
+    def _modelo_pulp(self, lp):
+        prob = pl.LpProblem("Modelo", pl.LpMinimize if lp.sense == "min" else pl.LpMaximize)
+
+        enteras = lp.integrality if lp.integrality is not None else np.zeros(lp.num_columns)
+        variables = [
+            pl.LpVariable(
+                f"x_{j}",
+                lowBound=lp.lower[j] if np.isfinite(lp.lower[j]) else None,
+                upBound=lp.upper[j] if np.isfinite(lp.upper[j]) else None,
+                cat=pl.LpInteger if enteras[j] else pl.LpContinuous
+            )
+            for j in range(lp.num_columns)
+        ]
+
+        prob += pl.LpAffineExpression([(variables[j], lp.c[j]) for j in np.flatnonzero(lp.c)])
+
+        restricciones = []
+        for prefijo, A, b, sentido in (("ub", lp.A_ub, lp.b_ub, pl.LpConstraintLE),
+                                       ("eq", lp.A_eq, lp.b_eq, pl.LpConstraintEQ)):
+            nombres = []
+            if A is not None:
+                for i in range(A.shape[0]):
+                    inicio, fin = A.indptr[i], A.indptr[i + 1]
+                    expr = pl.LpAffineExpression(
+                        [(variables[j], v) for j, v in zip(A.indices[inicio:fin], A.data[inicio:fin])])
+                    nombre = f"{prefijo}_{i}"
+                    prob += pl.LpConstraint(expr, sentido, nombre, b[i])
+                    nombres.append(nombre)
+            restricciones.append(nombres)
+
+        return prob, variables, restricciones
+
+    def solve(self, lp):
+        prob, variables, (nombres_ub, nombres_eq) = self._modelo_pulp(lp)
+        estadisticas = solve_cbc_with_stats(prob, msg=self.msg, **self.options)
+
+        status = self.config.cbc_status(prob)
+        solucion = {'status': status, 'iterations': estadisticas['iterations'], 'write_s': estadisticas['write_s']}
+        if status not in ESTADOS_CON_SOLUCION:
+            return solucion
+
+        solucion['x'] = np.array([v.value() or 0.0 for v in variables])
+        solucion['objective'] = float(lp.c @ solucion['x'])
+        solucion['ub_duals'] = np.array([prob.constraints[n].pi for n in nombres_ub]) if nombres_ub else None
+        solucion['eq_duals'] = np.array([prob.constraints[n].pi for n in nombres_eq]) if nombres_eq else None
+        # El costo reducido de una variable en su cota superior es el dual de esa cota
+        en_cota = np.isclose(solucion['x'], lp.upper)
+        solucion['upper_duals'] = np.where(en_cota, [v.dj or 0.0 for v in variables], 0.0)
+        return solucion
+
+
+class PdhgBackend(SolverBackend):
+    """
+    PDHG con reinicios adaptativos (pdhg.py). Del config usa time_limit y anytime:
+    en modo anytime, si el límite de tiempo detiene la resolución con un punto
+    que cumple las restricciones (residuo primal dentro de tolerance), se retorna
+    como 'Incumbent'. Agotar max_iterations o no converger es 'Not Solved'.
+    Conviene envolverlo en ScaledBackend (scaling=True).
+    """
+
+    name = "pdhg"
+
+    def __init__(self, config=None, tolerance=1e-6, max_iterations=100000, restarts=True):
+        self.config = get_config(config)
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.restarts = restarts
+
+    def solve(self, lp):
+        solucion = solve_pdhg(lp, tolerance=self.tolerance, max_iterations=self.max_iterations,
+                              time_limit=self.config.time_limit, restarts=self.restarts)
+        factible = solucion['time_limit_reached'] and lp.primal_residual(solucion['x']) <= self.tolerance
+        solucion['status'] = self.config.highs_status(solucion['status'], factible)
+        if solucion['status'] not in ESTADOS_CON_SOLUCION:
+            return {clave: solucion[clave] for clave in ('status', 'iterations', 'write_s', 'kkt_error',
+                                                       'time_limit_reached')}
+        return solucion
+
+
+class ScaledBackend(SolverBackend):
+    """
+    Escala el modelo antes de resolverlo con el backend envuelto y desescala la
+    solución. Los modelos con variables enteras se resuelven sin escalar.
+    """
+
+    def __init__(self, backend, passes=None):
+        self.backend = backend
+        self.passes = passes
+
+    @property
+    def name(self):
+        return self.backend.name
+
+    def solve(self, lp):
+        if lp.integrality is not None and np.any(lp.integrality):
+            return self.backend.solve(lp)
+
+        opciones = {} if self.passes is None else {'passes': self.passes}
+        escalas = compute_scaling(lp, **opciones)
+        return unscale_solution(self.backend.solve(scale_program(lp, escalas)), escalas)
+
+
+BACKENDS = {
+    "highs": HighsBackend,
+    "cbc": CbcBackend,
+    "pdhg": PdhgBackend
+}
+
+
+def get_backend(backend, scaling=False, config=None):
+    """
+    Retorna una instancia de backend a partir de su nombre o de una instancia existente.
+    config (SolverConfig) se aplica al crear el backend por nombre; una instancia
+    existente conserva la suya.
+    Con scaling=True el backend se envuelve en ScaledBackend (si no lo está ya).
+    """
+    if not isinstance(backend, SolverBackend):
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend inválido. Use uno de: {', '.join(BACKENDS)}.")
+        backend = BACKENDS[backend](config=config)
+    if scaling and not isinstance(backend, ScaledBackend):
+        backend = ScaledBackend(backend)
+    return backend
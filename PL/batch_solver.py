@@ -0,0 +1,145 @@
+"""
+Solucionador vectorizado: planifica miles de escenarios de demanda en una sola
+llamada de NumPy.
+
+Aplica el mismo algoritmo de greedy.py (pasada hacia atrás + pasada hacia
+adelante sobre la producción acumulada) a una matriz (escenarios x períodos),
+usando máximos acumulados en lugar de bucles de Python.
+"""
+
+import numpy as np
+
+from greedy import TOLERANCIA
+
+# Escenarios procesados por bloque para acotar la memoria intermedia
+ESCENARIOS_POR_BLOQUE = 20000
+
+
+def _por_escenario(valor, num_escenarios, nombre):
+    arreglo = np.asarray(valor, dtype=float)
+    if arreglo.ndim == 0:
+        return np.full(num_escenarios, float(arreglo))
+    if arreglo.shape != (num_escenarios,):
+        raise ValueError(f"'{nombre}' debe ser un escalar o un arreglo de longitud {num_escenarios}.")
+    return arreglo
+
+
+def _resolver_bloque(demandas, stock_inicial, factor, capacidad, seguridad, objective, stock_final):
+    num_periodos = demandas.shape[1]
+    indices = np.arange(num_periodos, dtype=float)
+
+    demanda_acumulada = np.cumsum(demandas, axis=1)
+    requerida = (demanda_acumulada + seguridad - stock_inicial[:, None]) / factor[:, None]
+    tolerancia = TOLERANCIA * np.maximum(1.0, np.abs(requerida).max(axis=1))
+
+    if objective == "max" and stock_final is None:
+        acumulada = capacidad[:, None] * (indices + 1)
+        factible = np.all(acumulada >= requerida - tolerancia[:, None], axis=1)
+        produccion = np.repeat(capacidad[:, None], num_periodos, axis=1)
+    else:
+        requerida_final = None
+        if stock_final is not None:
+            requerida_final = (demanda_acumulada[:, -1] + stock_final - stock_inicial) / factor
+            requerida[:, -1] = np.maximum(requerida[:, -1], requerida_final)
+
+        # límite_t = max_{s>=t} (requerida_s - capacidad * (s - t))
+        desplazada = requerida - capacidad[:, None] * indices
+        limite = np.maximum.accumulate(desplazada[:, ::-1], axis=1)[:, ::-1] + capacidad[:, None] * indices
+
+        acumulada = np.maximum.accumulate(np.maximum(limite, 0.0), axis=1)
+        produccion = np.diff(acumulada, axis=1, prepend=0.0)
+
+        factible = np.all(produccion <= (capacidad + tolerancia)[:, None], axis=1)
+        if requerida_final is not None:
+            factible &= acumulada[:, -1] <= requerida_final + tolerancia
+        produccion = np.minimum(produccion, capacidad[:, None])
+
+    stocks = stock_inicial[:, None] + factor[:, None] * np.cumsum(produccion, axis=1) - demanda_acumulada
+    return produccion, stocks, factible
+
+
+def optimize_production_batch(
+        initial_stocks,
+        demands,
+        yield_percentages,
+        densities,
+        max_productivities,
+        safety_stocks=None,
+        objective="min",
+        final_stocks=None
+):
+    """
+    Resuelve un escenario por fila de la matriz de demandas (escenarios x períodos).
+
+    initial_stocks, yield_percentages, densities, max_productivities y final_stocks
+    aceptan un escalar o un arreglo por escenario; safety_stocks acepta un escalar,
+    un vector por período o una matriz (escenarios x períodos).
+
+    Retorna un diccionario con matrices 'production_levels' y 'ending_stocks',
+    el vector 'optimal_value' y la máscara booleana 'feasible'. Las filas de
+    escenarios infactibles se rellenan con NaN.
+    """
+    demandas = np.atleast_2d(np.asarray(demands, dtype=float))
+    num_escenarios, num_periodos = demandas.shape
+
+    if objective not in ("min", "max"):
+        raise ValueError("Objetivo inválido. Use 'min' o 'max'.")
+
+    stock_inicial = _por_escenario(initial_stocks, num_escenarios, 'initial_stocks')
+    factor = (_por_escenario(yield_percentages, num_escenarios, 'yield_percentages') *
+              _por_escenario(densities, num_escenarios, 'densities'))
+    capacidad = _por_escenario(max_productivities, num_escenarios, 'max_productivities')
+    stock_final = None
+    if final_stocks is not None:
+        stock_final = _por_escenario(final_stocks, num_escenarios, 'final_stocks')
+
+    if np.any(factor <= 0):
+        raise ValueError("El factor de producción efectiva (rendimiento x densidad) debe ser positivo.")
+
+    if safety_stocks is None:
+        seguridad = np.zeros((num_escenarios, num_periodos))
+    else:
+        seguridad = np.broadcast_to(np.asarray(safety_stocks, dtype=float), (num_escenarios, num_periodos))
+
+    produccion = np.empty((num_escenarios, num_periodos))
+    stocks = np.empty((num_escenarios, num_periodos))
+    factible = np.empty(num_escenarios, dtype=bool)
+
+    for inicio in range(0, num_escenarios, ESCENARIOS_POR_BLOQUE):
+        fin = min(inicio + ESCENARIOS_POR_BLOQUE, num_escenarios)
+        bloque = slice(inicio, fin)
+        produccion[bloque], stocks[bloque], factible[bloque] = _resolver_bloque(
+            demandas[bloque], stock_inicial[bloque], factor[bloque], capacidad[bloque],
+            seguridad[bloque], objective, None if stock_final is None else stock_final[bloque]
+        )
+
+    produccion[~factible] = np.nan
+    stocks[~factible] = np.nan
+
+    return {
+        'optimal_value': produccion.sum(axis=1),
+        'production_levels': produccion,
+        'ending_stocks': stocks,
+        'feasible': factible
+    }
+
+
+def plan_percentiles(resultados, percentiles=(5, 50, 95)):
+    """
+    Calcula percentiles por período de la producción y del stock final sobre
+    los escenarios factibles de optimize_production_batch.
+    """
+    factible = resultados['feasible']
+    if not factible.any():
+        return None
+
+    produccion = resultados['production_levels'][factible]
+    stocks = resultados['ending_stocks'][factible]
+
+    return {
+        'percentiles': list(percentiles),
+        'production_levels': np.percentile(produccion, percentiles, axis=0),
+        'ending_stocks': np.percentile(stocks, percentiles, axis=0),
+        'optimal_value': np.percentile(produccion.sum(axis=1), percentiles),
+        'feasible_fraction': float(factible.mean())
+    }
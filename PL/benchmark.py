@@ -0,0 +1,407 @@
+"""
+Banco de pruebas de rendimiento de los planificadores de producción.
+
+Genera instancias sintéticas con la escala de Supply_Demand.csv (demandas del
+orden de 1e9 por semana, stocks de seguridad de una fracción de la demanda),
+con horizontes de 13 a 100000 períodos, de 1 a 1000 productos y una fracción
+configurable de instancias infactibles (capacidad por debajo de la mínima factible).
+
+Para cada combinación mide construcción, escritura, resolución y extracción
+(registros de solver_stats) y el tiempo total de optimize_production (PL6) por
+motor y de linear_programming_optimization (ML3), que resuelven los productos de
+a uno, y de los motores multiproducto, que los resuelven juntos: el modelo
+conjunto con capacidad compartida (multiproduct), su descomposición lagrangiana
+(lagrangian) y los planes apilados en un solo programa (stacked_solver). Guarda
+los resultados en JSON junto con las versiones del entorno para comparar entre versiones.
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from functools import partial
+
+import numpy as np
+import pulp as pl
+import scipy
+
+from feasibility import check_feasibility
+from solver_config import ESTADOS_CON_SOLUCION
+from solver_stats import MemorySink, stats_record, summarize
+
+# (períodos por instancia, productos x períodos) por encima de los cuales un motor se omite.
+# Referencia: una instancia de 100000 períodos toma ~0.5 s con greedy y ~250 s con HiGHS.
+LIMITES_MOTOR = {
+    'greedy': (None, 2 * 10 ** 7),
+    'highs': (10 ** 4, 10 ** 6),
+    'cbc': (10 ** 4, 2 * 10 ** 5),
+    'ml3': (10 ** 4, 2 * 10 ** 5),
+    'joint': (10 ** 4, 10 ** 6),
+    'stacked': (10 ** 4, 10 ** 6),
+    'lagrangian': (10 ** 4, 2 * 10 ** 5)
+}
+
+# Motores que reciben todos los productos de una combinación en una sola llamada
+MOTORES_CONJUNTOS = {
+    'joint': 'multiproduct.optimize_production_joint',
+    'stacked': 'stacked_solver.optimize_production_stacked',
+    'lagrangian': 'lagrangian.optimize_production_lagrangian'
+}
+
+# Capacidad total compartida de 'joint' y 'lagrangian', relativa a la suma de las
+# productividades mínimas factibles: deja factible el modelo conjunto pero activa
+# la restricción en los períodos de mayor demanda
+HOLGURA_COMPARTIDA = 1.1
+
+PRESETS = {
+    'quick': {
+        'horizons': (13, 52, 520),
+        'products': (1, 10),
+        'engines': ('greedy', 'highs', 'cbc', 'joint', 'stacked', 'lagrangian')
+    },
+    'full': {
+        'horizons': (13, 52, 520, 5200, 100000),
+        'products': (1, 10, 100, 1000),
+        'engines': ('greedy', 'highs', 'cbc', 'ml3', 'joint', 'stacked', 'lagrangian')
+    }
+}
+
+
+def generate_instance(num_periods, feasible=True, demand_scale=3e9, rng=None):
+    """
+    Genera una instancia de un producto. La capacidad se fija respecto a la
+    productividad mínima factible: entre 1.05 y 1.5 veces si feasible, entre
+    0.5 y 0.95 veces si no.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+
+    # Demanda lognormal con estacionalidad anual, como EffectiveDemand
+    estacionalidad = 1 + 0.3 * np.sin(2 * np.pi * np.arange(num_periods) / 52)
+    demands = demand_scale * estacionalidad * rng.lognormal(-0.125, 0.5, num_periods)
+    safety_stocks = demands * rng.uniform(0.05, 0.15, num_periods)
+    initial_stock = float(rng.uniform(0.5, 2.0) * demand_scale)
+    yield_percentage = float(rng.uniform(0.7, 0.95))
+    density = float(rng.uniform(0.8, 1.0))
+
+    factor = yield_percentage * density
+    requerida = (np.cumsum(demands) + safety_stocks - initial_stock) / factor
+    minima = max(float(np.max(requerida / np.arange(1, num_periods + 1))), demand_scale / factor * 0.01)
+    holgura = rng.uniform(1.05, 1.5) if feasible else rng.uniform(0.5, 0.95)
+
+    return {
+        'initial_stock': initial_stock,
+        'demands': demands.tolist(),
+        'yield_percentage': yield_percentage,
+        'density': density,
+        'max_productivity': minima * holgura,
+        'safety_stocks': safety_stocks.tolist(),
+        'feasible': feasible
+    }
+
+
+def generate_instances(num_periods, num_products=1, infeasible_fraction=0.0, demand_scale=3e9, seed=0):
+    """
+    Genera num_products instancias de a una (sin materializar todas en memoria);
+    las primeras round(infeasible_fraction * num_products) son infactibles.
+    """
+    rng = np.random.default_rng(seed)
+    infactibles = round(infeasible_fraction * num_products)
+    for i in range(num_products):
+        yield generate_instance(num_periods, feasible=i >= infactibles, demand_scale=demand_scale, rng=rng)
+
+
+def _lagrangiana(initial_stocks, demands, factors, capacities, total_capacity, safety_stocks, stats_sink=None):
+    """
+    optimize_production_lagrangian con un registro de estadísticas de toda la
+    descomposición (sin tamaño de modelo: resuelve un subproblema por producto).
+    """
+    from lagrangian import optimize_production_lagrangian
+
+    inicio = time.perf_counter()
+    resultado = optimize_production_lagrangian(initial_stocks, demands, factors, capacities, total_capacity,
+                                               safety_stocks)
+    if stats_sink is not None:
+        stats_sink.emit(stats_record(
+            MOTORES_CONJUNTOS['lagrangian'], "lagrangian", len(demands[0]), None, None, None, 0.0, 0.0,
+            time.perf_counter() - inicio, 0.0, resultado.get('iterations'), resultado['status']
+        ))
+    return resultado
+
+
+def _resolver_conjunto(funcion, instancias, stats_sink=None):
+    """
+    Resuelve las instancias como un modelo conjunto (optimize_production_joint o
+    _lagrangiana). Como en stacked_solver, las infactibles se descartan antes con
+    check_feasibility; las demás comparten una capacidad total de HOLGURA_COMPARTIDA
+    veces la suma de sus productividades mínimas factibles.
+    Retorna un resultado por instancia con el estado del modelo conjunto.
+    """
+    resultados = [None] * len(instancias)
+    factibles = []
+    minimas = []
+    for i, instancia in enumerate(instancias):
+        reporte = check_feasibility(instancia['initial_stock'], instancia['demands'], instancia['yield_percentage'],
+                                    instancia['density'], instancia['max_productivity'], instancia['safety_stocks'])
+        if reporte['feasible']:
+            factibles.append(instancias[i])
+            minimas.append(reporte['min_max_productivity'])
+        else:
+            resultados[i] = {'status': 'Infeasible'}
+
+    if factibles:
+        conjunto = funcion(
+            [i['initial_stock'] for i in factibles],
+            [i['demands'] for i in factibles],
+            [i['yield_percentage'] * i['density'] for i in factibles],
+            [i['max_productivity'] for i in factibles],
+            HOLGURA_COMPARTIDA * sum(minimas),
+            [i['safety_stocks'] for i in factibles],
+            stats_sink=stats_sink
+        )
+        resultados = [{'status': conjunto['status']} if r is None else r for r in resultados]
+    return resultados
+
+
+def _objetivo(engine):
+    """
+    Retorna la función a medir: linear_programming_optimization de ML/V3 para 'ml3'
+    (requiere sus dependencias de ML), optimize_production de PL6 con el motor
+    indicado o, para los motores de MOTORES_CONJUNTOS, una función que recibe la
+    lista de instancias y retorna un resultado por instancia.
+    """
+    if engine == 'joint':
+        from multiproduct import optimize_production_joint
+        return partial(_resolver_conjunto, optimize_production_joint)
+    if engine == 'lagrangian':
+        import lagrangian  # noqa: F401 (importar fuera de la medición)
+        return partial(_resolver_conjunto, _lagrangiana)
+    if engine == 'stacked':
+        from stacked_solver import optimize_production_stacked
+        return optimize_production_stacked
+
+    if engine == 'ml3':
+        ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ML', 'V3')
+        if ruta not in sys.path:
+            sys.path.append(ruta)
+        from ML3 import linear_programming_optimization
+        return linear_programming_optimization
+
+    from PL6 import optimize_production
+    return partial(optimize_production, engine=engine, formulation="balance")
+
+
+def _factible(engine, instancia):
+    """
+    Si la instancia tiene solución en el modelo que resuelve el motor. ML3 usa solo
+    el rendimiento como factor y una capacidad efectiva mayor (la de
+    linear_programming_optimization), así que una instancia generada como
+    infactible puede ser factible para ML3.
+    """
+    if engine != 'ml3':
+        return instancia['feasible']
+    capacidad = min(instancia['max_productivity'] * 1.1, instancia['max_productivity'] * 1.2 / instancia['density'])
+    return check_feasibility(instancia['initial_stock'], instancia['demands'], instancia['yield_percentage'], 1.0,
+                             capacidad, instancia['safety_stocks'])['feasible']
+
+
+def _clasificada_factible(engine, resultado):
+    """
+    Si el motor declaró factible la instancia. El modelo elástico de ML3 siempre
+    tiene solución: es factible si no relajó ninguna restricción (holgura nula).
+    """
+    if engine != 'ml3':
+        return resultado['status'] in ESTADOS_CON_SOLUCION + ('Heuristic',)
+    return resultado['status'] in ESTADOS_CON_SOLUCION and not resultado['configuration']['relaxed']
+
+
+def _resolver_de_a_uno(funcion, instancias, stats_sink):
+    """
+    Resuelve las instancias una por una (sin materializarlas todas) y genera
+    (instancia, resultado, segundos de la llamada).
+    """
+    for instancia in instancias:
+        inicio = time.perf_counter()
+        # Las funciones imprimen su progreso; se descarta para no distorsionar los tiempos
+        with contextlib.redirect_stdout(io.StringIO()):
+            resultado = funcion(instancia['initial_stock'], instancia['demands'], instancia['yield_percentage'],
+                                instancia['density'], instancia['max_productivity'], instancia['safety_stocks'],
+                                stats_sink=stats_sink)
+        yield instancia, resultado, time.perf_counter() - inicio
+
+
+def run_case(engine, num_periods, num_products, infeasible_fraction=0.2, demand_scale=3e9, seed=0):
+    """
+    Resuelve todas las instancias de una combinación con un motor y retorna una
+    fila de resultados con tiempos totales por etapa. Los motores de
+    MOTORES_CONJUNTOS resuelven todos los productos en una sola llamada.
+    """
+    if engine in MOTORES_CONJUNTOS:
+        objetivo = MOTORES_CONJUNTOS[engine]
+    else:
+        objetivo = 'ML3.linear_programming_optimization' if engine == 'ml3' else 'PL6.optimize_production'
+    fila = {
+        'target': objetivo,
+        'engine': engine,
+        'num_periods': num_periods,
+        'num_products': num_products,
+        'infeasible_fraction': infeasible_fraction
+    }
+
+    max_periodos, max_celdas = LIMITES_MOTOR[engine]
+    if (max_periodos is not None and num_periods > max_periodos) or num_periods * num_products > max_celdas:
+        fila['status'] = 'skipped'
+        return fila
+
+    try:
+        # Importar fuera de la medición
+        funcion = _objetivo(engine)
+    except ImportError as e:
+        fila['status'] = 'skipped'
+        fila['reason'] = str(e)
+        return fila
+
+    sink = MemorySink()
+    estados = {}
+    correctos = 0
+    total = 0.0
+    instancias = generate_instances(num_periods, num_products, infeasible_fraction, demand_scale, seed)
+    if engine in MOTORES_CONJUNTOS:
+        instancias = list(instancias)
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            resultados = funcion(instancias, stats_sink=sink)
+        # Una sola llamada: todo el tiempo se asigna a la combinación
+        tiempos = [time.perf_counter() - inicio] + [0.0] * (len(instancias) - 1)
+        resueltas = zip(instancias, resultados, tiempos)
+    else:
+        resueltas = _resolver_de_a_uno(funcion, instancias, sink)
+
+    for instancia, resultado, segundos in resueltas:
+        total += segundos
+        estados[resultado['status']] = estados.get(resultado['status'], 0) + 1
+        correctos += _clasificada_factible(engine, resultado) == _factible(engine, instancia)
+
+    fila.update(summarize(sink.records))
+    fila.update({
+        'status': 'ok',
+        'total_s': total,
+        'per_product_s': total / num_products,
+        'statuses': estados,
+        'classified_correctly': correctos,
+        # El voraz no arma un modelo y la descomposición lagrangiana arma uno por producto: sin tamaño
+        'rows': max((r['rows'] for r in sink.records if r['rows'] is not None), default=None),
+        'columns': max((r['columns'] for r in sink.records if r['columns'] is not None), default=None),
+        'nonzeros': max((r['nonzeros'] for r in sink.records if r['nonzeros'] is not None), default=None),
+        'iterations': sum(r['iterations'] or 0 for r in sink.records)
+    })
+    return fila
+
+
+def _revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmark(horizons=(13, 52, 520), products=(1, 10), engines=('greedy', 'highs', 'cbc'),
+                  infeasible_fraction=0.2, demand_scale=3e9, seed=0, output=None, debug=True):
+    """
+    Ejecuta todas las combinaciones horizonte x productos x motor.
+    Retorna {'metadata', 'results'} y, si output no es None, lo guarda como JSON.
+    """
+    resultados = []
+    for num_periods in horizons:
+        for num_products in products:
+            for engine in engines:
+                fila = run_case(engine, num_periods, num_products, infeasible_fraction, demand_scale, seed)
+                resultados.append(fila)
+                if debug:
+                    if fila['status'] == 'ok':
+                        print(f"{engine:<10} {num_periods:>7} períodos x {num_products:>5} productos: "
+                              f"{fila['total_s']:.3f} s (construcción {fila['build_s']:.3f}, "
+                              f"escritura {fila['write_s']:.3f}, resolución {fila['solve_s']:.3f}, "
+                              f"extracción {fila['extract_s']:.3f})")
+                    else:
+                        print(f"{engine:<10} {num_periods:>7} períodos x {num_products:>5} productos: omitido")
+
+    informe = {
+        'metadata': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'revision': _revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'scipy': scipy.__version__,
+            'pulp': pl.__version__,
+            'seed': seed,
+            'demand_scale': demand_scale
+        },
+        'results': resultados
+    }
+
+    if output is not None:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, indent=2)
+
+    return informe
+
+
+def compare_benchmarks(base, nuevo, tolerance=1.25, min_seconds=0.01):
+    """
+    Compara dos informes (diccionarios o rutas JSON) y retorna las combinaciones
+    cuyo tiempo total creció más que tolerance veces (ignorando las de menos de min_seconds).
+    """
+    informes = []
+    for informe in (base, nuevo):
+        if isinstance(informe, str):
+            with open(informe, encoding='utf-8') as f:
+                informe = json.load(f)
+        informes.append({
+            (r['engine'], r['num_periods'], r['num_products'], r['infeasible_fraction']): r
+            for r in informe['results'] if r['status'] == 'ok'
+        })
+
+    regresiones = []
+    for clave, fila in informes[1].items():
+        anterior = informes[0].get(clave)
+        if anterior is None or anterior['total_s'] < min_seconds:
+            continue
+        razon = fila['total_s'] / anterior['total_s']
+        if razon > tolerance:
+            regresiones.append({
+                'engine': clave[0],
+                'num_periods': clave[1],
+                'num_products': clave[2],
+                'before_s': anterior['total_s'],
+                'after_s': fila['total_s'],
+                'ratio': razon
+            })
+    return regresiones
+
+
+if __name__ == "__main__":
+    PRESET = "quick"  # "quick" o "full" (hasta 100000 períodos y 1000 productos)
+    ARCHIVO_SALIDA = "benchmark_resultados.json"
+    ARCHIVO_BASE = None  # Informe anterior para detectar regresiones
+
+    print(f"Banco de pruebas ({PRESET})")
+    print("=" * 100)
+    informe = run_benchmark(output=ARCHIVO_SALIDA, **PRESETS[PRESET])
+    print(f"\nResultados guardados en '{ARCHIVO_SALIDA}'")
+
+    if ARCHIVO_BASE is not None:
+        regresiones = compare_benchmarks(ARCHIVO_BASE, informe)
+        if regresiones:
+            print("\nRegresiones detectadas:")
+            for r in regresiones:
+                print(f"  {r['engine']} {r['num_periods']} x {r['num_products']}: "
+                      f"{r['before_s']:.3f} s → {r['after_s']:.3f} s ({r['ratio']:.2f}x)")
+        else:
+            print("\nSin regresiones respecto al informe base.")
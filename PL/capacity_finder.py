@@ -0,0 +1,115 @@
+"""
+Umbrales de factibilidad sobre la verificación O(T) de feasibility.py.
+
+En lugar de probar multiplicadores fijos de capacidad y resolver cada intento,
+se buscan los valores exactos (con tolerancia relativa) en los que el modelo
+pasa a ser factible:
+
+    - productividad máxima mínima (forma cerrada de check_feasibility)
+    - stock inicial mínimo (bisección)
+    - fracción máxima de los stocks de seguridad que se puede cumplir (bisección)
+
+Cada evaluación cuesta O(T) y no invoca al solucionador; basta una resolución
+final con el umbral encontrado.
+"""
+
+from feasibility import check_feasibility
+
+# Margen relativo hacia el lado factible: la verificación acepta diferencias de
+# TOLERANCIA, así que el borde exacto puede quedar fuera de la tolerancia de CBC
+MARGEN = 1e-7
+
+
+def bisect_threshold(es_factible, bajo, alto, creciente=True, tolerancia=1e-9, max_iteraciones=200):
+    """
+    Busca por bisección el borde de factibilidad de un parámetro monótono en [bajo, alto].
+
+    creciente=True: factible a partir del umbral (retorna el mínimo valor factible).
+    creciente=False: factible hasta el umbral (retorna el máximo valor factible).
+    Si alto es None el intervalo se extiende duplicando hasta encontrar un valor factible.
+    Retorna (umbral, evaluaciones); umbral es None si no hay valor factible.
+    """
+    evaluaciones = 0
+
+    def probar(valor):
+        nonlocal evaluaciones
+        evaluaciones += 1
+        return es_factible(valor)
+
+    # Si el extremo que sería la respuesta ya es factible, no hay borde en el intervalo
+    if probar(bajo if creciente else alto):
+        return (bajo if creciente else alto), evaluaciones
+
+    if creciente and alto is None:
+        alto = max(1.0, 2 * abs(bajo))
+        while not probar(alto):
+            if evaluaciones >= max_iteraciones:
+                return None, evaluaciones
+            bajo, alto = alto, alto * 2
+    elif not probar(alto if creciente else bajo):
+        return None, evaluaciones
+
+    # Invariante: el extremo factible cumple y el otro no
+    while alto - bajo > tolerancia * max(1.0, abs(alto), abs(bajo)) and evaluaciones < max_iteraciones:
+        medio = (bajo + alto) / 2
+        if probar(medio) == creciente:
+            alto = medio
+        else:
+            bajo = medio
+
+    return (alto if creciente else bajo), evaluaciones
+
+
+def find_thresholds(initial_stock, demands, yield_percentage, density, max_productivity,
+                    safety_stocks=None, final_stock=None, tolerance=1e-9, margin=MARGEN):
+    """
+    Retorna un diccionario con:
+        - 'min_max_productivity': productividad máxima mínima factible
+        - 'min_initial_stock': stock inicial mínimo (>= 0) factible con la capacidad actual
+          (None con stock final fijo, donde la factibilidad no es monótona en el stock inicial)
+        - 'max_safety_fraction': mayor fracción (<= 1) de los stocks de seguridad que se
+          puede cumplir con la capacidad actual
+        - 'checks': número total de verificaciones de factibilidad
+    Cada umbral es None si ningún valor del parámetro hace factible el modelo y
+    se desplaza margin (relativo) hacia el lado factible.
+    """
+    num_periods = len(demands)
+    if safety_stocks is None:
+        safety_stocks = [0] * num_periods
+
+    def factible(**cambios):
+        parametros = {
+            'initial_stock': initial_stock,
+            'max_productivity': max_productivity,
+            'safety_stocks': safety_stocks
+        }
+        parametros.update(cambios)
+        return check_feasibility(
+            parametros['initial_stock'], demands, yield_percentage, density, parametros['max_productivity'],
+            parametros['safety_stocks'], final_stock=final_stock
+        )['feasible']
+
+    # La productividad mínima sale de las sumas prefijas en una sola verificación
+    capacidad = check_feasibility(
+        initial_stock, demands, yield_percentage, density, max_productivity, safety_stocks,
+        final_stock=final_stock
+    )['min_max_productivity']
+    total = 1
+
+    stock_inicial = None
+    if final_stock is None:
+        stock_inicial, evaluaciones = bisect_threshold(
+            lambda s: factible(initial_stock=s), 0.0, None, tolerancia=tolerance)
+        total += evaluaciones
+
+    fraccion, evaluaciones = bisect_threshold(
+        lambda a: factible(safety_stocks=[s * a for s in safety_stocks]), 0.0, 1.0,
+        creciente=False, tolerancia=tolerance)
+    total += evaluaciones
+
+    return {
+        'min_max_productivity': None if capacidad is None else capacidad + margin * max(1.0, capacidad),
+        'min_initial_stock': None if stock_inicial is None else stock_inicial + margin * max(1.0, stock_inicial),
+        'max_safety_fraction': None if fraccion is None else max(0.0, fraccion - margin),
+        'checks': total
+    }
@@ -0,0 +1,418 @@
+"""
+Despachador adaptativo: elige el motor más rápido para cada instancia.
+
+El mismo modelo de producción se resuelve con varios motores (voraz analítico,
+HiGHS en proceso, PDHG, CBC, el voraz vectorizado por escenarios, el modelo
+conjunto o la descomposición lagrangiana). SolverDispatcher clasifica cada
+instancia por sus características y la envía al motor que históricamente fue
+más rápido para esa clase:
+
+    - horizonte: el menor de HORIZONTES que lo contiene
+    - enteros: planificación en obleas enteras (integer_planning.py)
+    - acoplada: varios productos con capacidad total compartida
+    - escenarios (o productos, si es acoplada): filas de demanda, agrupadas en ESCENARIOS
+
+Los tiempos se guardan por clase y motor (cantidad de resoluciones y tiempo
+medio) en un archivo JSON. Solo cuentan las resoluciones que retornan un plan:
+un 'Infeasible' rápido o un 'Not Solved' no son comparables con una solución.
+Se actualizan en memoria con cada resolución (el archivo solo se escribe con
+save() o calibrate()) y se pueden
+calibrar fuera de línea con calibrate() sobre un corpus local, por ejemplo el
+de calibration_corpus() (instancias sintéticas de benchmark.py). Sin tiempos
+para una clase se usa el orden de preferencia de MOTORES.
+"""
+
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from batch_solver import optimize_production_batch
+from feasibility import check_feasibility
+from greedy import optimize_production_greedy
+from integer_planning import optimize_production_integer
+from lagrangian import optimize_production_lagrangian
+from multiproduct import optimize_production_joint
+from solver_config import ESTADOS_CON_SOLUCION
+
+HORIZONTES = (13, 52, 520, 5200, 100000)
+ESCENARIOS = (1, 100, 10000)
+
+# Motores candidatos por tipo de instancia, en orden de preferencia sin tiempos registrados
+MOTORES = {
+    'single': ('greedy', 'highs', 'pdhg', 'cbc'),
+    'integer': ('integer_greedy', 'integer'),
+    'scenarios': ('batch', 'greedy_loop'),
+    'coupled': ('joint', 'lagrangian')
+}
+
+# Opciones de solve que se pasan a cada tipo de motor
+OPCIONES = {
+    'single': ('debug', 'cross_check', 'formulation', 'stats_sink', 'scaling'),
+    'integer': ('debug', 'scaling'),
+    'scenarios': (),
+    'coupled': ()
+}
+
+# Argumentos de SolverDispatcher.solve que se toman de cada instancia del corpus
+_ARGUMENTOS = ('initial_stock', 'demands', 'yield_percentage', 'density', 'max_productivity', 'safety_stocks',
+               'objective', 'final_stock', 'integer', 'total_capacity')
+
+# Archivo de tiempos que carga el despachador por defecto (engine="auto" de PL6)
+ARCHIVO_TIEMPOS = "dispatcher_timings.json"
+
+# Horizonte máximo con el que se calibra cada motor (~250 s con HiGHS a 100000 períodos)
+LIMITES_CALIBRACION = {
+    'highs': 10 ** 4,
+    'pdhg': 10 ** 4,
+    'cbc': 10 ** 4,
+    'integer': 10 ** 4,
+    'joint': 10 ** 4,
+    'lagrangian': 10 ** 4
+}
+
+
+def _tipo(caracteristicas):
+    if caracteristicas['coupled']:
+        return 'coupled'
+    if caracteristicas['integer']:
+        return 'integer'
+    if caracteristicas['scenarios'] > 1:
+        return 'scenarios'
+    return 'single'
+
+
+def _cubeta(valor, limites):
+    return next((limite for limite in limites if valor <= limite), None)
+
+
+def instance_features(demands, integer=False, total_capacity=None):
+    """
+    Características de una instancia. demands es un vector (un producto) o una
+    matriz: escenarios x períodos sin total_capacity, productos x períodos con ella.
+    """
+    demandas = np.asarray(demands, dtype=float)
+    filas = 1 if demandas.ndim == 1 else demandas.shape[0]
+    acoplada = total_capacity is not None and demandas.ndim == 2
+    if integer and demandas.ndim == 2:
+        raise ValueError("La planificación en obleas enteras es de un solo producto y escenario.")
+    return {
+        'horizon': demandas.shape[-1],
+        'integer': bool(integer),
+        'coupled': acoplada,
+        'scenarios': 1 if acoplada else filas,
+        'products': filas if acoplada else 1
+    }
+
+
+def feature_class(caracteristicas):
+    """
+    Clave de la clase de una instancia, p. ej. 'single|h520|s1' o 'coupled|h52|p100'.
+    """
+    horizonte = _cubeta(caracteristicas['horizon'], HORIZONTES) or 'max'
+    if caracteristicas['coupled']:
+        productos = _cubeta(caracteristicas['products'], ESCENARIOS) or 'max'
+        return f"coupled|h{horizonte}|p{productos}"
+    escenarios = _cubeta(caracteristicas['scenarios'], ESCENARIOS) or 'max'
+    return f"{_tipo(caracteristicas)}|h{horizonte}|s{escenarios}"
+
+
+def _por_fila(valor, num_filas):
+    return np.broadcast_to(np.asarray(valor, dtype=float), (num_filas,))
+
+
+def _resolver_escenarios_en_bucle(instancia):
+    """
+    Un escenario por fila con el voraz de un producto; mismo formato que optimize_production_batch.
+    """
+    demandas = np.atleast_2d(np.asarray(instancia['demands'], dtype=float))
+    num_escenarios, num_periodos = demandas.shape
+    stocks_iniciales = _por_fila(instancia['initial_stock'], num_escenarios)
+    rendimientos = _por_fila(instancia['yield_percentage'], num_escenarios)
+    densidades = _por_fila(instancia['density'], num_escenarios)
+    capacidades = _por_fila(instancia['max_productivity'], num_escenarios)
+    finales = None if instancia['final_stock'] is None else _por_fila(instancia['final_stock'], num_escenarios)
+    seguridad = (np.zeros((num_escenarios, num_periodos)) if instancia['safety_stocks'] is None
+                 else np.broadcast_to(np.asarray(instancia['safety_stocks'], dtype=float),
+                                      (num_escenarios, num_periodos)))
+
+    produccion = np.full((num_escenarios, num_periodos), np.nan)
+    stocks = np.full((num_escenarios, num_periodos), np.nan)
+    factible = np.zeros(num_escenarios, dtype=bool)
+    for i in range(num_escenarios):
+        resultado = optimize_production_greedy(
+            stocks_iniciales[i], demandas[i].tolist(), rendimientos[i], densidades[i], capacidades[i],
+            seguridad[i].tolist(), objective=instancia['objective'],
+            final_stock=None if finales is None else finales[i]
+        )
+        if resultado['status'] == 'Optimal':
+            produccion[i], stocks[i], factible[i] = resultado['production_levels'], resultado['ending_stocks'], True
+
+    return {
+        'optimal_value': produccion.sum(axis=1),
+        'production_levels': produccion,
+        'ending_stocks': stocks,
+        'feasible': factible
+    }
+
+
+def _con_solucion(resultado):
+    """
+    Si el resultado trae un plan (en el formato por escenarios, si alguno es factible).
+    """
+    if 'status' in resultado:
+        return resultado['status'] in ESTADOS_CON_SOLUCION
+    return bool(np.any(resultado['feasible']))
+
+
+def _optimize_production():
+    # PL6 importa matplotlib y pandas: se carga solo si hace falta y antes de medir
+    from PL6 import optimize_production
+    return optimize_production
+
+
+def _resolver(motor, instancia, config, opciones):
+    """
+    Resuelve la instancia con el motor indicado; opciones son las de OPCIONES para su tipo.
+    """
+    argumentos = (instancia['initial_stock'], instancia['demands'], instancia['yield_percentage'],
+                  instancia['density'], instancia['max_productivity'], instancia['safety_stocks'])
+
+    if motor in MOTORES['single']:
+        return _optimize_production()(*argumentos, objective=instancia['objective'], engine=motor,
+                                      final_stock=instancia['final_stock'], config=config,
+                                      **dict({'formulation': "balance"}, **opciones))
+    if motor in MOTORES['integer']:
+        return optimize_production_integer(*argumentos, objective=instancia['objective'],
+                                           final_stock=instancia['final_stock'],
+                                           backend="greedy" if motor == 'integer_greedy' else "highs",
+                                           config=config, **opciones)
+    if motor == 'batch':
+        return optimize_production_batch(*argumentos, objective=instancia['objective'],
+                                         final_stocks=instancia['final_stock'])
+    if motor == 'greedy_loop':
+        return _resolver_escenarios_en_bucle(instancia)
+
+    demandas = np.atleast_2d(np.asarray(instancia['demands'], dtype=float))
+    factores = (_por_fila(instancia['yield_percentage'], demandas.shape[0])
+                * _por_fila(instancia['density'], demandas.shape[0]))
+    acopladas = (instancia['initial_stock'], demandas, factores, instancia['max_productivity'],
+                 instancia['total_capacity'], instancia['safety_stocks'])
+    if motor == 'joint':
+        return optimize_production_joint(*acopladas, config=config)
+    if motor == 'lagrangian':
+        return optimize_production_lagrangian(*acopladas, config=config)
+    raise ValueError(f"Motor inválido: {motor}.")
+
+
+class SolverDispatcher:
+    """
+    Envía cada instancia al motor más rápido registrado para su clase.
+
+    timings: ruta del archivo JSON de tiempos (None = solo en memoria); si existe se carga.
+    record: actualizar los tiempos con cada resolución que retorna un plan.
+    autosave: guardar el archivo tras cada resolución registrada (si hay ruta); por
+    defecto solo se guarda con save() o al terminar calibrate().
+    config: SolverConfig que se pasa a los motores que la aceptan.
+    """
+
+    def __init__(self, timings=None, record=True, autosave=False, config=None):
+        self.path = timings
+        self.record = record
+        self.autosave = autosave
+        self.config = config
+        self.timings = {}
+        if timings is not None and os.path.exists(timings):
+            with open(timings, encoding='utf-8') as f:
+                self.timings = json.load(f)
+
+    def candidates(self, caracteristicas):
+        return MOTORES[_tipo(caracteristicas)]
+
+    def choose(self, caracteristicas):
+        """
+        Motor con el menor tiempo medio registrado para la clase de la instancia;
+        sin tiempos, el primero de MOTORES para su tipo.
+        """
+        candidatos = self.candidates(caracteristicas)
+        registrados = self.timings.get(feature_class(caracteristicas), {})
+        medidos = [(registrados[motor]['mean_s'], motor) for motor in candidatos
+                   if registrados.get(motor, {}).get('count', 0) > 0]
+        return min(medidos)[1] if medidos else candidatos[0]
+
+    def _registrar(self, clase, motor, segundos=None):
+        """
+        Agrega una resolución al tiempo medio de (clase, motor); segundos=None marca un
+        fallo (excepción o resolución sin plan).
+        """
+        fila = self.timings.setdefault(clase, {}).setdefault(motor, {'count': 0, 'mean_s': 0.0, 'failures': 0})
+        if segundos is None:
+            fila['failures'] += 1
+            return
+        fila['count'] += 1
+        fila['mean_s'] += (segundos - fila['mean_s']) / fila['count']
+
+    def save(self, path=None):
+        path = self.path if path is None else path
+        if path is None:
+            raise ValueError("No se indicó un archivo de tiempos.")
+        # Escritura atómica: un proceso interrumpido no deja el archivo a medias
+        descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+            json.dump(self.timings, f, indent=2, sort_keys=True)
+        os.replace(temporal, path)
+
+    def solve(self, initial_stock, demands, yield_percentage, density, max_productivity, safety_stocks=None,
+              objective="min", final_stock=None, integer=False, total_capacity=None, engine=None, config=None,
+              **options):
+        """
+        Resuelve la instancia con el motor elegido (o con engine, si se indica).
+
+        Con demands vector es un producto (integer=True: obleas enteras); con una
+        matriz sin total_capacity, un escenario por fila (resultado de
+        optimize_production_batch); con total_capacity, un producto por fila con la
+        capacidad compartida (resultado de optimize_production_joint).
+
+        config: SolverConfig de esta resolución (por defecto la del despachador).
+        options: se pasan al motor elegido; las admitidas por tipo están en OPCIONES
+        (debug, cross_check, formulation, stats_sink y scaling para un producto).
+
+        Retorna el resultado del motor más 'engine', 'feature_class' y 'elapsed_s'.
+        Si el motor falla con una excepción se prueba el siguiente candidato.
+        """
+        caracteristicas = instance_features(demands, integer, total_capacity)
+        clase = feature_class(caracteristicas)
+        if caracteristicas['coupled'] and (objective != "min" or final_stock is not None):
+            raise ValueError("El modelo acoplado solo minimiza la producción y no admite stock final.")
+        no_admitidas = sorted(set(options) - set(OPCIONES[_tipo(caracteristicas)]))
+        if no_admitidas:
+            raise ValueError(f"Opciones no admitidas para instancias '{_tipo(caracteristicas)}': "
+                             f"{', '.join(no_admitidas)}.")
+        config = self.config if config is None else config
+
+        instancia = {
+            'initial_stock': initial_stock,
+            'demands': demands,
+            'yield_percentage': yield_percentage,
+            'density': density,
+            'max_productivity': max_productivity,
+            'safety_stocks': safety_stocks,
+            'objective': objective,
+            'final_stock': final_stock,
+            'total_capacity': total_capacity
+        }
+
+        elegido = self.choose(caracteristicas) if engine is None else engine
+        motores = [elegido] + [m for m in self.candidates(caracteristicas) if m != elegido]
+        error = None
+        for motor in motores:
+            if motor in MOTORES['single']:
+                _optimize_production()
+            inicio = time.perf_counter()
+            try:
+                resultado = _resolver(motor, instancia, config, options)
+            except (ValueError, MemoryError) as e:
+                error = e
+                if self.record:
+                    self._registrar(clase, motor)
+                continue
+            segundos = time.perf_counter() - inicio
+            break
+        else:
+            raise error
+
+        if self.record:
+            self._registrar(clase, motor, segundos if _con_solucion(resultado) else None)
+            if self.autosave and self.path is not None:
+                self.save()
+
+        return dict(resultado, engine=motor, feature_class=clase, elapsed_s=segundos)
+
+    def calibrate(self, corpus, engines=None, repeats=1, debug=False):
+        """
+        Resuelve cada instancia del corpus con todos sus motores candidatos (o los
+        de engines) y registra los tiempos. Cada instancia es un diccionario con
+        los argumentos de solve. Retorna la tabla de tiempos.
+        """
+        for instancia in corpus:
+            argumentos = {clave: valor for clave, valor in instancia.items() if clave in _ARGUMENTOS}
+            caracteristicas = instance_features(argumentos['demands'], argumentos.get('integer', False),
+                                                argumentos.get('total_capacity'))
+            for motor in self.candidates(caracteristicas):
+                limite = LIMITES_CALIBRACION.get(motor)
+                if (engines is not None and motor not in engines) or (
+                        limite is not None and caracteristicas['horizon'] > limite):
+                    continue
+                for _ in range(repeats):
+                    resultado = self.solve(**argumentos, engine=motor)
+                    if debug:
+                        estado = resultado.get('status', 'batch')
+                        print(f"{resultado['feature_class']:<24} {resultado['engine']:<15} "
+                              f"{resultado['elapsed_s']:.4f} s ({estado})")
+        if self.path is not None:
+            self.save()
+        return self.timings
+
+
+_despachador = None
+
+
+def default_dispatcher():
+    """
+    Despachador compartido por el proceso (engine="auto" de PL6): carga
+    ARCHIVO_TIEMPOS (en el directorio de trabajo) si existe. Las resoluciones
+    actualizan los tiempos solo en memoria; el archivo se escribe al calibrar o
+    con save().
+    """
+    global _despachador
+    if _despachador is None:
+        _despachador = SolverDispatcher(ARCHIVO_TIEMPOS)
+    return _despachador
+
+
+def calibration_corpus(horizons=(13, 52, 520, 5200), instances=3, scenarios=(100,), products=(10,), seed=0):
+    """
+    Corpus sintético de calibración con las instancias de benchmark.py: por
+    horizonte, instancias de un producto (continuas y enteras), matrices de
+    escenarios y grupos de productos con capacidad compartida. Todas las
+    instancias de un producto y los grupos son factibles.
+    """
+    from benchmark import generate_instance
+
+    rng = np.random.default_rng(seed)
+    for num_periods in horizons:
+        for _ in range(instances):
+            instancia = generate_instance(num_periods, rng=rng)
+            instancia.pop('feasible')
+            yield instancia
+            # Obleas enteras: la misma instancia con mil unidades por oblea
+            yield dict(instancia, integer=True, density=instancia['density'] * 1e3,
+                       max_productivity=max(1.0, instancia['max_productivity'] / 1e3))
+
+        for num_escenarios in scenarios:
+            base = generate_instance(num_periods, rng=rng)
+            demandas = np.asarray(base['demands']) * rng.lognormal(0, 0.1, (num_escenarios, num_periods))
+            base.pop('feasible')
+            yield dict(base, demands=demandas)
+
+        for num_productos in products:
+            grupo = [generate_instance(num_periods, rng=rng) for _ in range(num_productos)]
+            # Cada producto es factible a su productividad mínima constante, así que una
+            # capacidad total de al menos la suma de esas productividades hace factible al grupo
+            minimas = [check_feasibility(p['initial_stock'], p['demands'], p['yield_percentage'], p['density'],
+                                         p['max_productivity'], p['safety_stocks'])['min_max_productivity']
+                       for p in grupo]
+            demandas = np.array([p['demands'] for p in grupo])
+            capacidades = np.array([p['max_productivity'] for p in grupo])
+            yield {
+                'initial_stock': np.array([p['initial_stock'] for p in grupo]),
+                'demands': demandas,
+                'yield_percentage': np.array([p['yield_percentage'] for p in grupo]),
+                'density': np.array([p['density'] for p in grupo]),
+                'max_productivity': capacidades,
+                'safety_stocks': np.array([p['safety_stocks'] for p in grupo]),
+                # 10 % de margen sobre la suma de las productividades mínimas
+                'total_capacity': float(sum(minimas) * 1.1)
+            }
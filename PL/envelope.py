@@ -0,0 +1,162 @@
+"""
+Envolvente de producción: mínimo y máximo del modelo con una sola construcción.
+
+El modelo se construye una vez; el mínimo y el máximo comparten restricciones y
+objetivo (producción total), así que entre ambas resoluciones solo cambia el
+sentido de la optimización. Por defecto se resuelve en proceso con HiGHS sobre
+las matrices de build_production_lp (sin archivos MPS ni subprocesos de CBC).
+
+La banda por período (producción mínima y máxima posible en cada período entre
+todos los planes factibles) se obtiene en O(T) sin resolver, a partir de las
+trayectorias extremas de la producción acumulada X_t:
+
+    Lo_t: acumulada mínima factible (pasada hacia atrás y hacia adelante del voraz)
+    Hi_t: acumulada máxima factible, min(capacidad * (t + 1), requerida_final)
+
+    máx P_t = min(capacidad, Hi_t - Lo_{t-1})      mín P_t = max(0, Lo_t - Hi_{t-1})
+
+Cualquier acumulada entre Lo_t y Hi_t se puede completar hacia atrás y hacia
+adelante, así que ambas cotas se alcanzan. La alternativa ingenua son 2T resoluciones.
+"""
+
+import numpy as np
+import pulp as pl
+
+from backends import get_backend
+from feasibility import check_feasibility
+from lp_model import LinearProgram, build_production_lp, build_production_model, production_result
+
+
+def production_band(initial_stock, demands, yield_percentage, density, max_productivity,
+                    safety_stocks=None, final_stock=None):
+    """
+    Retorna un diccionario con 'feasible' y, si lo es, 'min_production' y
+    'max_production' (listas por período) y 'min_cumulative' y 'max_cumulative'
+    (producción acumulada mínima y máxima al cierre de cada período).
+    """
+    num_periods = len(demands)
+    if safety_stocks is None:
+        safety_stocks = [0] * num_periods
+    elif len(safety_stocks) != num_periods:
+        raise ValueError("La longitud de stocks_seguridad debe ser igual al número de períodos.")
+
+    if not check_feasibility(initial_stock, demands, yield_percentage, density, max_productivity,
+                             safety_stocks, final_stock=final_stock)['feasible']:
+        return {'feasible': False}
+
+    factor = yield_percentage * density
+    demanda_acumulada = np.cumsum(np.asarray(demands, dtype=float))
+    requerida = (demanda_acumulada + np.asarray(safety_stocks, dtype=float) - initial_stock) / factor
+    periodos = np.arange(1, num_periods + 1)
+
+    # Acumulada mínima: límite hacia atrás L_t = max(R_t, L_{t+1} - M), luego máximo corrido desde 0
+    if final_stock is not None and num_periods > 0:
+        requerida_final = (demanda_acumulada[-1] + final_stock - initial_stock) / factor
+        requerida[-1] = max(requerida[-1], requerida_final)
+    limite = np.maximum.accumulate((requerida - max_productivity * periodos)[::-1])[::-1] + max_productivity * periodos
+    minima = np.maximum.accumulate(np.maximum(limite, 0.0))
+
+    # Acumulada máxima: producir al máximo, sin pasar del total que fija el stock final
+    maxima = max_productivity * periodos
+    if final_stock is not None and num_periods > 0:
+        maxima = np.minimum(maxima, requerida_final)
+    maxima = np.maximum(maxima, minima)
+
+    minima_anterior = np.concatenate([[0.0], minima[:-1]])
+    maxima_anterior = np.concatenate([[0.0], maxima[:-1]])
+
+    return {
+        'feasible': True,
+        'min_production': np.clip(minima - maxima_anterior, 0.0, max_productivity).tolist(),
+        'max_production': np.clip(maxima - minima_anterior, 0.0, max_productivity).tolist(),
+        'min_cumulative': minima.tolist(),
+        'max_cumulative': maxima.tolist()
+    }
+
+
+def production_envelope(initial_stock, demands, yield_percentage, density, max_productivity,
+                        safety_stocks=None, final_stock=None, formulation="cumulative",
+                        per_period=True, debug=False, engine="highs", scaling=True, config=None):
+    """
+    Resuelve el mínimo y el máximo de la producción total sobre un único modelo.
+
+    engine: "highs", "pdhg" o un SolverBackend (matrices en proceso, con scaling y
+    config como en optimize_production), o "cbc" (modelo de PuLP con formulation).
+
+    Retorna un diccionario con:
+        - 'status': estado común (el conjunto factible es el mismo para ambos)
+        - 'min' y 'max': diccionarios como los de optimize_production
+        - 'band_min' y 'band_max': producción mínima y máxima posible por período
+          (solo con per_period=True)
+    """
+    if engine == "cbc":
+        resultados = _extremos_cbc(initial_stock, demands, yield_percentage, density, max_productivity,
+                                   safety_stocks, final_stock, formulation, debug)
+    else:
+        resultados = _extremos_matriciales(initial_stock, demands, yield_percentage, density, max_productivity,
+                                           safety_stocks, final_stock, engine, scaling, config)
+    if 'status' in resultados:
+        return resultados
+
+    envolvente = {'status': 'Optimal', 'min': resultados["min"], 'max': resultados["max"]}
+
+    if per_period:
+        banda = production_band(initial_stock, demands, yield_percentage, density, max_productivity,
+                                safety_stocks, final_stock=final_stock)
+        envolvente['band_min'] = banda.get('min_production')
+        envolvente['band_max'] = banda.get('max_production')
+
+    return envolvente
+
+
+def _extremos_matriciales(initial_stock, demands, yield_percentage, density, max_productivity,
+                          safety_stocks, final_stock, engine, scaling, config):
+    """
+    Mínimo y máximo con un backend matricial: el máximo reutiliza las matrices del
+    mínimo (mismo LinearProgram con el sentido opuesto). Retorna {'min': ..., 'max': ...}
+    o {'status': ...} si el modelo no tiene solución.
+    """
+    num_periods = len(demands)
+    minimo = build_production_lp(initial_stock, demands, yield_percentage * density, max_productivity,
+                                 safety_stocks, objective="min", final_stock=final_stock)
+    maximo = LinearProgram(minimo.c, minimo.A_ub, minimo.b_ub, minimo.A_eq, minimo.b_eq,
+                           minimo.lower, minimo.upper, sense="max")
+    backend = get_backend(engine, scaling=scaling, config=config)
+
+    resultados = {}
+    for objetivo, lp in (("min", minimo), ("max", maximo)):
+        resultado = production_result(backend.solve(lp), num_periods)
+        if resultado['status'] != 'Optimal':
+            return {'status': resultado['status']}
+        resultados[objetivo] = resultado
+    return resultados
+
+
+def _extremos_cbc(initial_stock, demands, yield_percentage, density, max_productivity,
+                  safety_stocks, final_stock, formulation, debug):
+    """
+    Mínimo y máximo con CBC sobre un único modelo de PuLP, cambiando solo el sentido.
+    """
+    prob, production_vars, stock_terms = build_production_model(
+        initial_stock, demands, yield_percentage, density, max_productivity,
+        safety_stocks, objective="min", formulation=formulation, final_stock=final_stock,
+        name="Envolvente_Produccion"
+    )
+
+    resultados = {}
+    for sentido, objetivo in ((pl.LpMinimize, "min"), (pl.LpMaximize, "max")):
+        # Mismas restricciones y mismo objetivo: solo cambia el sentido
+        prob.sense = sentido
+        prob.solve(pl.PULP_CBC_CMD(msg=debug))
+        status = pl.LpStatus[prob.status]
+
+        if status != 'Optimal':
+            return {'status': status}
+
+        resultados[objetivo] = {
+            'optimal_value': pl.value(prob.objective),
+            'production_levels': [pl.value(var) for var in production_vars],
+            'ending_stocks': [pl.value(s) for s in stock_terms],
+            'status': status
+        }
+    return resultados
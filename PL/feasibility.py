@@ -0,0 +1,163 @@
+"""
+Verificación de factibilidad en O(T) con sumas prefijas, sin llamar al solucionador.
+
+Producir a la capacidad máxima en todos los períodos es el plan con más holgura,
+así que el modelo es factible si y solo si en cada período
+
+    demanda_acumulada_t + stock_seguridad_t <= stock_inicial + factor * capacidad * (t + 1)
+
+Con un stock final fijo (PL1-PL5) además se exige poder terminar exactamente en
+ese stock: sin producir de más antes por los stocks de seguridad y sin que el
+stock inicial ya lo exceda.
+"""
+
+from greedy import TOLERANCIA
+
+
+def check_feasibility(initial_stock, demands, yield_percentage, density, max_productivity,
+                      safety_stocks=None, final_stock=None):
+    """
+    Retorna un diccionario con:
+        - 'feasible': si el modelo tiene solución
+        - 'infeasible_periods': lista de períodos infactibles con su faltante exacto
+          (unidades de producto que faltan aun produciendo al máximo)
+        - 'min_max_productivity': productividad máxima mínima que haría factible el modelo
+          (None si ningún aumento de capacidad lo resuelve)
+        - 'capacity_increase': aumento de capacidad necesario respecto a max_productivity
+        - 'final_stock_issues': problemas con el stock final fijo (si aplica)
+    """
+    num_periods = len(demands)
+
+    if safety_stocks is None:
+        safety_stocks = [0] * num_periods
+    elif len(safety_stocks) != num_periods:
+        raise ValueError("La longitud de stocks_seguridad debe ser igual al número de períodos.")
+
+    factor = yield_percentage * density
+    if factor <= 0:
+        raise ValueError("El factor de producción efectiva (rendimiento x densidad) debe ser positivo.")
+
+    infeasible_periods = []
+    min_max_productivity = 0.0
+    demanda_acumulada = 0.0
+    produccion_requerida_max = 0.0
+
+    for t in range(num_periods):
+        demanda_acumulada += demands[t]
+        requerido = demanda_acumulada + safety_stocks[t]
+        disponible = initial_stock + factor * max_productivity * (t + 1)
+
+        # Producción acumulada mínima (antes del factor) para cumplir el período t
+        produccion_requerida = (requerido - initial_stock) / factor
+        produccion_requerida_max = max(produccion_requerida_max, produccion_requerida)
+        min_max_productivity = max(min_max_productivity, produccion_requerida / (t + 1))
+
+        if requerido > disponible + TOLERANCIA * max(1.0, abs(requerido)):
+            infeasible_periods.append({
+                'period': t,
+                'required': requerido,
+                'available': disponible,
+                'shortfall': requerido - disponible
+            })
+
+    final_stock_issues = []
+    if final_stock is not None and num_periods > 0:
+        produccion_final = (demanda_acumulada + final_stock - initial_stock) / factor
+        # Relativa a los términos y no solo al resultado: con stocks y demandas del
+        # orden de 1e9 la resta deja errores de redondeo de 1e-6 aunque el resultado sea ~0
+        escala = (abs(demanda_acumulada) + abs(final_stock) + abs(initial_stock)) / factor
+        tolerancia = TOLERANCIA * max(1.0, abs(produccion_final), escala)
+        disponible = initial_stock + factor * max_productivity * num_periods
+        requerido = demanda_acumulada + final_stock
+
+        min_max_productivity = max(min_max_productivity, produccion_final / num_periods)
+        if requerido > disponible + tolerancia * factor and not any(
+                p['period'] == num_periods - 1 for p in infeasible_periods):
+            infeasible_periods.append({
+                'period': num_periods - 1,
+                'required': requerido,
+                'available': disponible,
+                'shortfall': requerido - disponible
+            })
+
+        if produccion_final < -tolerancia:
+            final_stock_issues.append({
+                'issue': 'initial_stock_exceeds_final',
+                'excess': -produccion_final * factor
+            })
+        if produccion_requerida_max > produccion_final + tolerancia:
+            final_stock_issues.append({
+                'issue': 'safety_stocks_exceed_final',
+                'excess': (produccion_requerida_max - produccion_final) * factor
+            })
+
+    feasible = not infeasible_periods and not final_stock_issues
+
+    return {
+        'feasible': feasible,
+        'infeasible_periods': infeasible_periods,
+        'min_max_productivity': None if final_stock_issues else min_max_productivity,
+        'capacity_increase': None if final_stock_issues else max(0.0, min_max_productivity - max_productivity),
+        'final_stock_issues': final_stock_issues
+    }
+
+
+def minimum_carry_stocks(demands, yield_percentage, density, max_productivity, safety_stocks=None,
+                         final_stock=None):
+    """
+    Stock mínimo al final de cada período para que el resto del horizonte siga
+    siendo factible (pasada hacia atrás con la capacidad máxima):
+
+        minimo_t = max(stock_seguridad_t, minimo_{t+1} + demanda_{t+1} - factor * capacidad)
+
+    con el stock final (si se indica) como mínimo del último período. Todo plan
+    factible cumple stock_t >= minimo_t.
+    """
+    num_periods = len(demands)
+    if safety_stocks is None:
+        safety_stocks = [0] * num_periods
+    elif len(safety_stocks) != num_periods:
+        raise ValueError("La longitud de stocks_seguridad debe ser igual al número de períodos.")
+
+    capacidad = yield_percentage * density * max_productivity
+    minimos = [0.0] * num_periods
+    siguiente = None
+    for t in range(num_periods - 1, -1, -1):
+        minimo = safety_stocks[t]
+        if siguiente is None:
+            if final_stock is not None:
+                minimo = max(minimo, final_stock)
+        else:
+            minimo = max(minimo, siguiente + demands[t + 1] - capacidad)
+        minimos[t] = minimo
+        siguiente = minimo
+    return minimos
+
+
+def imprimir_diagnostico(reporte, max_periodos=10):
+    """
+    Muestra el diagnóstico de factibilidad de check_feasibility.
+    """
+    if reporte['feasible']:
+        print("DIAGNÓSTICO: El modelo es factible.")
+        return
+
+    periodos = reporte['infeasible_periods']
+    if periodos:
+        print(f"DIAGNÓSTICO: {len(periodos)} período(s) no se pueden cubrir ni produciendo al máximo.")
+        for p in periodos[:max_periodos]:
+            print(f"  Período {p['period'] + 1}: requerido {p['required']:.2f}, "
+                  f"disponible {p['available']:.2f}, faltante {p['shortfall']:.2f}")
+        if len(periodos) > max_periodos:
+            print("  ...")
+
+    for problema in reporte['final_stock_issues']:
+        if problema['issue'] == 'initial_stock_exceeds_final':
+            print(f"DIAGNÓSTICO: El stock inicial excede el stock final requerido en {problema['excess']:.2f}.")
+        else:
+            print(f"DIAGNÓSTICO: Los stocks de seguridad obligan a terminar con {problema['excess']:.2f} "
+                  f"unidades más que el stock final requerido.")
+
+    if reporte['capacity_increase'] is not None:
+        print(f"Recomendación: Aumentar la productividad máxima a {reporte['min_max_productivity']:.2f} "
+              f"(+{reporte['capacity_increase']:.2f}) o reducir la demanda.")
@@ -0,0 +1,135 @@
+"""
+Solucionador rápido (sin PuLP ni CBC) para el modelo de producción de un solo producto.
+
+El modelo de PL1-PL6 solo tiene cotas sobre la producción, un factor fijo
+rendimiento x densidad y pisos de stock de seguridad, por lo que la producción
+acumulada mínima se obtiene con una pasada hacia atrás (producir lo más tarde
+posible sin violar la capacidad) seguida de una pasada hacia adelante.
+Ambas son O(T).
+"""
+
+# Tolerancia relativa para comparar cantidades (mismo orden que la de CBC)
+TOLERANCIA = 1e-9
+
+
+def _tolerancia(*valores):
+    escala = max([1.0] + [abs(v) for v in valores])
+    return TOLERANCIA * escala
+
+
+def _resultado(initial_stock, demands, factor, production_levels):
+    ending_stocks = []
+    stock = initial_stock
+    for t, produccion in enumerate(production_levels):
+        stock = stock + produccion * factor - demands[t]
+        ending_stocks.append(stock)
+
+    return {
+        'optimal_value': sum(production_levels),
+        'production_levels': production_levels,
+        'ending_stocks': ending_stocks,
+        'status': 'Optimal'
+    }
+
+
+def optimize_production_greedy(
+        initial_stock,
+        demands,
+        yield_percentage,
+        density,
+        max_productivity,
+        safety_stocks=None,
+        objective="min",  # "min" para minimizar la producción o "max" para maximizarla
+        final_stock=None  # None: stock final >= último stock de seguridad (PL6); número: stock final exacto (PL1-PL5)
+):
+    """
+    Resuelve el mismo modelo que optimize_production en O(T) y devuelve el mismo
+    diccionario de resultados ('optimal_value', 'production_levels',
+    'ending_stocks', 'status').
+    """
+    num_periods = len(demands)
+
+    if safety_stocks is None:
+        safety_stocks = [0] * num_periods
+    elif len(safety_stocks) != num_periods:
+        raise ValueError("La longitud de stocks_seguridad debe ser igual al número de períodos.")
+
+    if objective not in ("min", "max"):
+        raise ValueError("Objetivo inválido. Use 'min' o 'max'.")
+
+    factor = yield_percentage * density
+    if factor <= 0:
+        raise ValueError("El factor de producción efectiva (rendimiento x densidad) debe ser positivo.")
+
+    if num_periods == 0:
+        return _resultado(initial_stock, demands, factor, [])
+
+    # Producción acumulada requerida al cierre de cada período:
+    # stock_inicial + factor * acumulada_t - demanda_acumulada_t >= stock_seguridad_t
+    demanda_acumulada = []
+    acumulado = 0
+    for d in demands:
+        acumulado += d
+        demanda_acumulada.append(acumulado)
+
+    requerida = [(demanda_acumulada[t] + safety_stocks[t] - initial_stock) / factor for t in range(num_periods)]
+
+    requerida_final = None
+    if final_stock is not None:
+        requerida_final = (demanda_acumulada[-1] + final_stock - initial_stock) / factor
+
+    # Maximizar sin stock final fijo: producir siempre al máximo es óptimo
+    # y es además el plan con más holgura en todos los períodos.
+    if objective == "max" and final_stock is None:
+        for t in range(num_periods):
+            if max_productivity * (t + 1) < requerida[t] - _tolerancia(requerida[t]):
+                return {'status': 'Infeasible'}
+        return _resultado(initial_stock, demands, factor, [max_productivity] * num_periods)
+
+    # Pasada hacia atrás: acumulado mínimo en t para poder cumplir lo que falta
+    # produciendo a lo sumo max_productivity por período.
+    limite = [0.0] * num_periods
+    siguiente = requerida[-1] if requerida_final is None else max(requerida[-1], requerida_final)
+    limite[-1] = siguiente
+    for t in range(num_periods - 2, -1, -1):
+        siguiente = max(requerida[t], siguiente - max_productivity)
+        limite[t] = siguiente
+
+    # Pasada hacia adelante: producir solo lo necesario para alcanzar el límite.
+    # Con stock final fijo el total es el mismo para "min" y "max".
+    production_levels = []
+    acumulado = 0.0
+    for t in range(num_periods):
+        objetivo_t = max(acumulado, limite[t])
+        produccion = objetivo_t - acumulado
+        if produccion > max_productivity + _tolerancia(max_productivity, objetivo_t):
+            return {'status': 'Infeasible'}
+        production_levels.append(min(produccion, max_productivity))
+        acumulado = objetivo_t
+
+    if requerida_final is not None and acumulado > requerida_final + _tolerancia(
+            requerida_final, (demanda_acumulada[-1] + abs(final_stock) + abs(initial_stock)) / factor):
+        # Los stocks de seguridad obligan a producir más de lo que permite el stock final fijado
+        return {'status': 'Infeasible'}
+
+    return _resultado(initial_stock, demands, factor, production_levels)
+
+
+def comparar_resultados(resultado_rapido, resultado_cbc, tolerancia=1e-6):
+    """
+    Compara el resultado del solucionador rápido con el de CBC.
+    Retorna (coinciden, mensaje).
+    """
+    if resultado_rapido['status'] != resultado_cbc['status']:
+        return False, (f"Estados distintos: rápido={resultado_rapido['status']}, "
+                       f"CBC={resultado_cbc['status']}")
+
+    if resultado_rapido['status'] != 'Optimal':
+        return True, "Ambos solucionadores coinciden en que no hay solución óptima."
+
+    valor_rapido = resultado_rapido['optimal_value']
+    valor_cbc = resultado_cbc['optimal_value']
+    if abs(valor_rapido - valor_cbc) > tolerancia * max(1.0, abs(valor_cbc)):
+        return False, f"Valores óptimos distintos: rápido={valor_rapido}, CBC={valor_cbc}"
+
+    return True, "El solucionador rápido coincide con CBC."
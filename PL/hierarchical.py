@@ -0,0 +1,196 @@
+"""
+Planificación jerárquica para horizontes largos: agregado y luego desagregado.
+
+1. Se resuelve un modelo agregado por bloques de `aggregation` semanas (4 ~ mensual,
+   13 ~ trimestral) con la capacidad del bloque y el stock al cierre de cada bloque.
+2. Cada bloque se desagrega a semanas como un problema independiente de
+   optimize_production con el stock inicial del plan agregado y su stock de
+   cierre como stock final mínimo. Los bloques se resuelven en paralelo.
+
+Para que todo plan agregado se pueda desagregar, el stock al cierre del bloque b
+tiene como cota inferior, además del stock de seguridad de su última semana:
+    - el stock que exige la peor semana del propio bloque (la acumulada no decrece)
+    - el stock necesario para que el bloque b+1 llegue a tiempo a sus semanas
+      produciendo al máximo desde su inicio
+Con estas cotas el modelo agregado es la proyección exacta del semanal sobre los
+cierres de bloque, así que la diferencia con el óptimo semanal completo
+(calculado en O(T) con el voraz) sale solo de la tolerancia numérica.
+
+Una sub-ventana que el plan agregado lleva a su borde (toda a capacidad para
+llegar a un stock de seguridad o al cierre) no tiene holgura, y el solucionador
+puede declararla infactible por redondeo (CBC lee el modelo de un archivo MPS
+con 12 cifras significativas). Por eso el modelo agregado deja un margen
+relativo TOLERANCIA por bloque: las cotas de cierre suben en el margen y, con
+"min", la capacidad del bloque baja en él. Las sub-ventanas toman el cierre
+como stock final mínimo; con "min" terminan en él y con "max", donde todo va a
+capacidad, el mínimo se rebaja en el margen.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from backends import get_backend
+from greedy import TOLERANCIA, optimize_production_greedy
+from lp_model import build_production_lp
+from solver_config import ESTADO_INCUMBENTE, ESTADOS_CON_SOLUCION
+
+
+def _bloques(num_periods, aggregation):
+    return [(inicio, min(inicio + aggregation, num_periods)) for inicio in range(0, num_periods, aggregation)]
+
+
+def _resolver_bloque(argumentos):
+    optimizer, posicionales, opciones = argumentos
+    return optimizer(*posicionales, **opciones)
+
+
+def plan_hierarchical(
+        initial_stock,
+        demands,
+        yield_percentage,
+        density,
+        max_productivity,
+        safety_stocks=None,
+        aggregation=4,
+        objective="min",
+        backend="highs",
+        optimizer=None,
+        parallel=True,
+        max_workers=None,
+        compare_full=True,
+        debug=False,
+        config=None,
+        **optimizer_kwargs
+):
+    """
+    Planifica el horizonte con un modelo agregado y sub-ventanas semanales.
+
+    aggregation: semanas por bloque del modelo agregado.
+    backend: solucionador del modelo agregado (ver backends.py).
+    optimizer: función con la firma de optimize_production para las sub-ventanas
+    (por defecto la de PL6); optimizer_kwargs se le pasan tal cual (engine, ...).
+    parallel: resolver las sub-ventanas en un pool de procesos.
+    compare_full: calcular el óptimo semanal completo y la brecha relativa.
+    config: SolverConfig del modelo agregado y de las sub-ventanas; si alguna
+    solución queda interrumpida por el límite de tiempo el plan tiene estado 'Incumbent'.
+
+    Retorna el diccionario de optimize_production más 'aggregate_value',
+    'windows', 'aggregation' y, con compare_full, 'full_optimal_value' y 'gap'.
+    Si una sub-ventana no tiene solución se retorna su estado con 'failed_window'.
+    """
+    if optimizer is None:
+        from PL6 import optimize_production as optimizer
+
+    num_periods = len(demands)
+    if safety_stocks is None:
+        safety_stocks = [0] * num_periods
+    elif len(safety_stocks) != num_periods:
+        raise ValueError("La longitud de stocks_seguridad debe ser igual al número de períodos.")
+    if aggregation < 1:
+        raise ValueError("aggregation debe ser al menos 1.")
+
+    factor = yield_percentage * density
+    demandas = np.asarray(demands, dtype=float)
+    seguridad = np.asarray(safety_stocks, dtype=float)
+    bloques = _bloques(num_periods, aggregation)
+
+    # Las cotas se calculan con sumas locales de cada bloque: restar acumuladas de
+    # todo el horizonte (del orden de 1e11 con los datos reales) pierde precisión
+    # y deja sub-ventanas infactibles por diferencias de 1e-5
+    restantes = []
+    for inicio, fin in bloques:
+        local = np.cumsum(demandas[inicio:fin])
+        restantes.append(local[-1] - local)
+
+    # Cotas inferiores del stock al cierre de cada bloque
+    cotas = []
+    for b, (inicio, fin) in enumerate(bloques):
+        cota = (seguridad[inicio:fin] - restantes[b]).max()
+        if b + 1 < len(bloques):
+            inicio_sig, fin_sig = bloques[b + 1]
+            semanas = np.arange(1, fin_sig - inicio_sig + 1)
+            local = np.cumsum(demandas[inicio_sig:fin_sig])
+            cota = max(cota, (local + seguridad[inicio_sig:fin_sig] - factor * max_productivity * semanas).max())
+        cotas.append(cota)
+
+    demandas_agregadas = [float(demandas[inicio:fin].sum()) for inicio, fin in bloques]
+    # Margen de cada bloque (en stock) relativo a su magnitud, ver la descripción del módulo
+    margenes = [TOLERANCIA * max(1.0, demandas_agregadas[b] + abs(cotas[b])) for b in range(len(bloques))]
+    cotas = [cota + margen for cota, margen in zip(cotas, margenes)]
+    capacidades = [max_productivity * (fin - inicio) for inicio, fin in bloques]
+    if objective == "min":
+        capacidades = [max(capacidad - margen / factor, 0.0) for capacidad, margen in zip(capacidades, margenes)]
+
+    lp = build_production_lp(initial_stock, demandas_agregadas, factor, capacidades, cotas, objective=objective)
+    solucion = get_backend(backend, config=config).solve(lp)
+    if solucion['status'] not in ESTADOS_CON_SOLUCION:
+        return {'status': solucion['status'], 'aggregation': aggregation}
+
+    # Producción de cada bloque corregida dentro de sus cotas para que el redondeo
+    # del solucionador no deje sub-ventanas fuera del borde
+    stock = initial_stock
+    stocks_cierre = []
+    for b in range(len(bloques)):
+        minima = (cotas[b] + demandas_agregadas[b] - stock) / factor
+        produccion = min(max(solucion['x'][b], minima, 0.0), capacidades[b])
+        stock = max(stock + factor * produccion - demandas_agregadas[b], cotas[b])
+        stocks_cierre.append(stock)
+
+    if debug:
+        print(f"Modelo agregado: {len(bloques)} bloques de {aggregation} semanas, "
+              f"valor {solucion['objective']:.2f}")
+
+    opciones = dict(optimizer_kwargs, objective=objective)
+    if config is not None:
+        opciones['config'] = config
+    tareas = []
+    for b, (inicio, fin) in enumerate(bloques):
+        stock_inicial = initial_stock if b == 0 else stocks_cierre[b - 1]
+        # Stock de cierre como mínimo de la última semana
+        pisos = list(safety_stocks[inicio:fin])
+        pisos[-1] = max(pisos[-1], stocks_cierre[b] - (margenes[b] if objective == "max" else 0.0))
+        posicionales = (stock_inicial, demands[inicio:fin], yield_percentage, density, max_productivity, pisos)
+        tareas.append((optimizer, posicionales, opciones))
+
+    if parallel and len(tareas) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            resultados = list(executor.map(_resolver_bloque, tareas, chunksize=max(1, len(tareas) // 64)))
+    else:
+        resultados = [_resolver_bloque(tarea) for tarea in tareas]
+
+    production_levels = []
+    ending_stocks = []
+    estados = {solucion['status']}
+    for b, resultado in enumerate(resultados):
+        estados.add(resultado['status'])
+        if resultado['status'] not in ESTADOS_CON_SOLUCION:
+            return {
+                'status': resultado['status'],
+                'failed_window': b + 1,
+                'aggregation': aggregation,
+                'windows': len(bloques)
+            }
+        production_levels.extend(resultado['production_levels'])
+        ending_stocks.extend(resultado['ending_stocks'])
+
+    plan = {
+        'optimal_value': float(sum(production_levels)),
+        'production_levels': production_levels,
+        'ending_stocks': ending_stocks,
+        'status': ESTADO_INCUMBENTE if ESTADO_INCUMBENTE in estados else 'Optimal',
+        'aggregate_value': float(solucion['objective']),
+        'windows': len(bloques),
+        'aggregation': aggregation
+    }
+
+    if compare_full:
+        completo = optimize_production_greedy(initial_stock, demands, yield_percentage, density,
+                                              max_productivity, safety_stocks, objective=objective)
+        if completo['status'] == 'Optimal':
+            plan['full_optimal_value'] = completo['optimal_value']
+            plan['gap'] = (plan['optimal_value'] - completo['optimal_value']) / max(1.0, abs(completo['optimal_value']))
+            if debug:
+                print(f"Brecha respecto al óptimo semanal completo: {plan['gap']:.2e}")
+
+    return plan
@@ -0,0 +1,194 @@
+"""
+Planificación en obleas enteras (wafer starts) sin ramificación y acotamiento.
+
+La producción real se programa en obleas completas (hojas "Wafer Plan" y
+"Density per Wafer"), pero declarar enteras las variables de PL6 convierte a CBC
+en un branch-and-bound lento. Este módulo obtiene planes enteros en tiempo de LP:
+
+1. Relajación lineal: el modelo de optimize_production con la producción
+   continua (backend matricial o el voraz). Su valor es la cota de la brecha.
+2. Redondeo: se redondea hacia arriba la producción acumulada de la relajación,
+   no la de cada período, así que el stock nunca queda por debajo del de la
+   relajación y se respetan los stocks de seguridad.
+3. Reparación y búsqueda local, ambas O(T):
+    - hacia adelante: si la capacidad entera (piso de max_productivity) recortó
+      obleas y algún período queda bajo su stock de seguridad, se agregan obleas
+      en los períodos anteriores con capacidad libre, lo más tarde posible
+    - hacia atrás: se quitan las obleas cuya eliminación no deja ningún período
+      posterior bajo su stock de seguridad (con objective="max", se agregan hasta
+      la capacidad)
+
+Como la producción total es entera, ceil(cota LP) también es cota del óptimo
+entero (floor con "max"); 'proven_optimal' indica si el plan la alcanza. Como en
+CBC (que marca 'Optimal' las soluciones enteras detenidas por brecha), el estado
+es 'Optimal' en ambos casos: ESTADO_INCUMBENTE queda para las resoluciones
+interrumpidas por el límite de tiempo (relajación 'Incumbent' en modo anytime).
+
+Con obleas enteras un stock final exacto en general no es alcanzable, así que
+final_stock se trata como stock final mínimo.
+"""
+
+import math
+
+import numpy as np
+
+from backends import get_backend
+from greedy import TOLERANCIA, optimize_production_greedy
+from lp_model import build_production_lp, production_result
+from solver_config import ESTADOS_CON_SOLUCION
+
+
+def _relajacion(initial_stock, demands, factor, max_productivity, pisos, objective, backend, scaling, config):
+    """
+    Resuelve la relajación lineal con el stock final mínimo incluido en los pisos.
+    """
+    if backend == "greedy":
+        return optimize_production_greedy(initial_stock, demands, factor, 1.0, max_productivity,
+                                          list(pisos), objective=objective)
+    lp = build_production_lp(initial_stock, demands, factor, max_productivity, pisos, objective=objective)
+    solucion = get_backend(backend, scaling=scaling, config=config).solve(lp)
+    return production_result(solucion, len(demands))
+
+
+def _redondear(production_levels, capacidad, tolerancia):
+    """
+    Redondea hacia arriba la producción acumulada y la recorta a la capacidad entera.
+    """
+    acumulada = np.ceil(np.cumsum(production_levels) - tolerancia)
+    obleas = np.diff(acumulada, prepend=0.0)
+    return np.clip(obleas, 0, capacidad).astype(np.int64)
+
+
+def _reparar(obleas, holgura_inicial, factor, capacidad, tolerancia):
+    """
+    Pasada hacia adelante: agrega obleas donde la holgura (stock - piso) es negativa,
+    en el período más tardío con capacidad libre. Modifica obleas en el lugar y
+    retorna False si no hay capacidad suficiente.
+    """
+    libres = []
+    agregado = 0.0
+    for t in range(len(obleas)):
+        if obleas[t] < capacidad:
+            libres.append(t)
+        holgura = holgura_inicial[t] + agregado
+        while holgura < -tolerancia:
+            if not libres:
+                return False
+            u = libres[-1]
+            k = min(capacidad - obleas[u], math.ceil(-holgura / factor - tolerancia / factor))
+            obleas[u] += k
+            agregado += k * factor
+            holgura += k * factor
+            if obleas[u] >= capacidad:
+                libres.pop()
+    return True
+
+
+def _quitar_sobrantes(obleas, holgura, factor, tolerancia):
+    """
+    Pasada hacia atrás: quitar k obleas del período t baja en k * factor el stock
+    de t en adelante, así que basta con la holgura mínima del sufijo. Modifica
+    obleas en el lugar.
+    """
+    minima = np.inf
+    for t in range(len(obleas) - 1, -1, -1):
+        minima = min(minima, holgura[t])
+        k = min(int(obleas[t]), int(math.floor((minima + tolerancia) / factor)))
+        if k > 0:
+            obleas[t] -= k
+            minima -= k * factor
+
+
+def optimize_production_integer(
+        initial_stock,
+        demands,
+        yield_percentage,
+        density,
+        max_productivity,
+        safety_stocks=None,
+        objective="min",
+        final_stock=None,  # Stock final mínimo (además del último stock de seguridad)
+        backend="highs",  # Solucionador de la relajación: nombre, SolverBackend o "greedy"
+        scaling=True,
+        config=None,
+        debug=False
+):
+    """
+    Plan de producción en obleas enteras: relajación lineal, redondeo de la
+    acumulada y búsqueda local de reparación y mejora.
+
+    max_productivity: obleas por período; se usa su parte entera, también en la relajación.
+
+    Retorna el diccionario de optimize_production ('production_levels' en obleas
+    enteras) más 'lp_bound' (valor de la relajación), 'integer_bound' (cota del
+    óptimo entero), 'gap' (brecha relativa respecto a la cota LP) y
+    'proven_optimal' (el plan alcanza la cota entera). El estado es el de la
+    relajación; si no tiene solución se retorna solo su estado.
+    """
+    num_periods = len(demands)
+    if safety_stocks is None:
+        safety_stocks = [0] * num_periods
+    elif len(safety_stocks) != num_periods:
+        raise ValueError("La longitud de stocks_seguridad debe ser igual al número de períodos.")
+    if objective not in ("min", "max"):
+        raise ValueError("Objetivo inválido. Use 'min' o 'max'.")
+
+    factor = yield_percentage * density
+    if factor <= 0:
+        raise ValueError("El factor de producción efectiva (rendimiento x densidad) debe ser positivo.")
+
+    demandas = np.asarray(demands, dtype=float)
+    pisos = np.asarray(safety_stocks, dtype=float).copy()
+    if num_periods > 0 and final_stock is not None:
+        pisos[-1] = max(pisos[-1], final_stock)
+
+    # La relajación usa la capacidad entera: es la relajación del problema en obleas
+    capacidad = int(math.floor(max_productivity * (1 + TOLERANCIA)))
+    relajacion = _relajacion(initial_stock, demandas, factor, capacidad, pisos, objective,
+                             backend, scaling, config)
+    if relajacion['status'] not in ESTADOS_CON_SOLUCION:
+        return {'status': relajacion['status']}
+
+    # Tolerancias en obleas y en stock, relativas a la magnitud del horizonte
+    escala = float(np.abs(demandas).sum() + np.abs(pisos).max(initial=0.0) + abs(initial_stock))
+    tolerancia_stock = TOLERANCIA * max(1.0, escala)
+    tolerancia_obleas = tolerancia_stock / factor
+
+    obleas = _redondear(relajacion['production_levels'], capacidad, tolerancia_obleas)
+    holgura = initial_stock + factor * np.cumsum(obleas) - np.cumsum(demandas) - pisos
+    if not _reparar(obleas, holgura, factor, capacidad, tolerancia_stock):
+        if debug:
+            print("La capacidad entera no alcanza para cubrir los stocks de seguridad.")
+        return {'status': 'Infeasible'}
+
+    if objective == "min":
+        holgura = initial_stock + factor * np.cumsum(obleas) - np.cumsum(demandas) - pisos
+        _quitar_sobrantes(obleas, holgura, factor, tolerancia_stock)
+    else:
+        # Sin cotas superiores de stock, agregar obleas nunca viola una restricción
+        obleas[:] = capacidad
+
+    production_levels = [int(p) for p in obleas]
+    valor = int(obleas.sum())
+    cota_lp = float(relajacion['optimal_value'])
+    if objective == "min":
+        cota_entera = math.ceil(cota_lp - tolerancia_obleas)
+    else:
+        cota_entera = math.floor(cota_lp + tolerancia_obleas)
+    gap = abs(valor - cota_lp) / max(1.0, abs(cota_lp))
+
+    if debug:
+        print(f"Relajación LP: {cota_lp:.4f}, cota entera: {cota_entera}, plan entero: {valor} "
+              f"obleas, brecha: {gap:.2e}")
+
+    ending_stocks = (initial_stock + factor * np.cumsum(obleas) - np.cumsum(demandas)).tolist()
+    return {
+        'optimal_value': valor,
+        'production_levels': production_levels,
+        'ending_stocks': ending_stocks,
+        'status': relajacion['status'],
+        'lp_bound': cota_lp,
+        'integer_bound': cota_entera,
+        'gap': gap,
+        'proven_optimal': valor == cota_entera
+    }
@@ -0,0 +1,268 @@
+"""
+Descomposición lagrangiana por productos para la planificación con capacidad compartida.
+
+El modelo conjunto de multiproduct.py acopla los productos solo por la capacidad
+total de cada período (sum_i P[i,t] <= capacidad_total_t). Al relajar esa fila
+con multiplicadores lambda_t >= 0 el problema se separa por producto:
+
+    L(lambda) = sum_i min { sum_t (1 + lambda_t) P[i,t] : plan factible del producto i }
+                - sum_t lambda_t capacidad_total_t
+
+Cada subproblema es el modelo de un solo producto (build_production_lp) con un
+costo por período y se resuelve en un pool de procesos. L(lambda) es una cota
+inferior del óptimo conjunto y se maximiza con el método del subgradiente
+(paso de Polyak con la mejor cota superior conocida).
+
+Para obtener planes factibles, cada RECUPERAR_CADA iteraciones la capacidad
+total se reparte entre productos según el promedio ergódico de las soluciones
+de los subproblemas (recortado a la capacidad y con el sobrante repartido según
+la holgura de cada producto) y cada producto se resuelve con su parte. El mejor
+de esos planes es la cota superior; la brecha de dualidad reportada es la
+diferencia relativa entre ambas cotas.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from backends import get_backend
+from lp_model import build_production_lp
+from solver_config import ESTADO_INCUMBENTE, ESTADOS_CON_SOLUCION
+
+# Iteraciones entre recuperaciones de un plan factible
+RECUPERAR_CADA = 5
+
+# Rondas de reparación del reparto de capacidad en cada recuperación
+RONDAS_REPARACION = 5
+
+# Paso relativo theta_k = PASO_INICIAL / sqrt(k): decreciente pero de suma divergente,
+# como exige la convergencia del promedio ergódico
+PASO_INICIAL = 1.0
+
+
+def _por_producto_periodo(valor, num_productos, num_periodos, nombre):
+    arreglo = np.asarray(valor, dtype=float)
+    if arreglo.ndim == 1:
+        arreglo = arreglo[:, None]
+    try:
+        return np.broadcast_to(arreglo, (num_productos, num_periodos))
+    except ValueError:
+        raise ValueError(f"'{nombre}' no es compatible con ({num_productos} productos x {num_periodos} períodos).")
+
+
+def _resolver_producto(argumentos):
+    """
+    Subproblema de un producto: retorna (estado, producción, stocks).
+    """
+    stock_inicial, demandas, factor, capacidad, seguridad, costos, backend, config = argumentos
+    lp = build_production_lp(stock_inicial, demandas, factor, capacidad, seguridad, production_costs=costos)
+    solucion = get_backend(backend, scaling=True, config=config).solve(lp)
+    if solucion['status'] not in ESTADOS_CON_SOLUCION:
+        return solucion['status'], None, None
+    num_periodos = len(demandas)
+    return solucion['status'], solucion['x'][:num_periodos], solucion['x'][num_periodos:2 * num_periodos]
+
+
+class _Subproblemas:
+    """
+    Resuelve los subproblemas de todos los productos, en paralelo o en serie.
+    """
+
+    def __init__(self, stocks_iniciales, demandas, factores, capacidades, seguridad, backend, config,
+                 executor=None, max_workers=None):
+        self.datos = (stocks_iniciales, demandas, factores, capacidades, seguridad)
+        self.backend = backend
+        self.config = config
+        self.executor = executor
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def resolver(self, costos, capacidades=None, productos=None):
+        """
+        costos: vector por período común a todos los productos. capacidades: matriz
+        (productos x períodos) que reemplaza a la de cada producto (recuperación).
+        productos: índices a resolver (todos por defecto).
+        Retorna una lista de (estado, producción, stocks) por producto.
+        """
+        stocks_iniciales, demandas, factores, propias, seguridad = self.datos
+        capacidades = propias if capacidades is None else capacidades
+        productos = range(len(demandas)) if productos is None else productos
+        tareas = [
+            (stocks_iniciales[i], demandas[i], factores[i], capacidades[i], seguridad[i], costos,
+             self.backend, self.config)
+            for i in productos
+        ]
+        if self.executor is not None:
+            chunksize = max(1, len(tareas) // (4 * self.max_workers))
+            return list(self.executor.map(_resolver_producto, tareas, chunksize=chunksize))
+        return [_resolver_producto(tarea) for tarea in tareas]
+
+
+def _repartir_capacidad(promedio, capacidades, capacidad_total):
+    """
+    Reparte la capacidad total según el uso promedio de cada producto: se recorta
+    a la capacidad total y el sobrante se reparte según la holgura de cada producto.
+    """
+    uso = promedio.sum(axis=0)
+    escala = np.divide(capacidad_total, uso, out=np.ones_like(uso), where=uso > capacidad_total)
+    asignada = np.minimum(promedio * escala, capacidades)
+    holgura = capacidades - asignada
+    total_holgura = holgura.sum(axis=0)
+    sobrante = np.maximum(capacidad_total - asignada.sum(axis=0), 0.0)
+    fraccion = np.divide(sobrante, total_holgura, out=np.zeros_like(sobrante), where=total_holgura > 0)
+    return asignada + holgura * np.minimum(fraccion, 1.0)
+
+
+def _recuperar_plan(subproblemas, promedio, capacidades, capacidad_total, costos):
+    """
+    Plan factible a partir del promedio ergódico: reparte la capacidad total y,
+    mientras algún producto no tenga solución con su parte, los que sí la tienen
+    se quedan solo con la capacidad que usan y la liberada se reparte entre los
+    demás según su holgura. Retorna (producción, stocks) o None.
+    """
+    asignada = _repartir_capacidad(promedio, capacidades, capacidad_total)
+    num_productos, num_periodos = promedio.shape
+    produccion = np.zeros((num_productos, num_periodos))
+    stocks = np.zeros((num_productos, num_periodos))
+    pendientes = list(range(num_productos))
+
+    for _ in range(RONDAS_REPARACION):
+        resultados = subproblemas.resolver(costos, asignada, pendientes)
+        resueltos = [(i, plan, stock) for i, (_, plan, stock) in zip(pendientes, resultados) if plan is not None]
+        for i, plan, stock in resueltos:
+            produccion[i], stocks[i] = plan, stock
+            asignada[i] = plan
+        pendientes = [i for i, (_, plan, _) in zip(pendientes, resultados) if plan is None]
+        if not pendientes:
+            return produccion, stocks
+        if not resueltos:
+            return None
+
+        sobrante = np.maximum(capacidad_total - asignada.sum(axis=0), 0.0)
+        holgura = capacidades[pendientes] - asignada[pendientes]
+        total_holgura = holgura.sum(axis=0)
+        fraccion = np.divide(sobrante, total_holgura, out=np.zeros_like(sobrante), where=total_holgura > 0)
+        asignada[pendientes] += holgura * np.minimum(fraccion, 1.0)
+
+    return None
+
+
+def optimize_production_lagrangian(
+        initial_stocks,
+        demands,
+        factors,
+        capacities,
+        total_capacity,
+        safety_stocks=None,
+        backend="highs",
+        tolerance=1e-4,
+        max_iterations=200,
+        parallel=True,
+        max_workers=None,
+        config=None,
+        debug=False
+):
+    """
+    Resuelve el modelo conjunto de optimize_production_joint (mismos argumentos)
+    por descomposición lagrangiana sobre la capacidad total compartida.
+
+    tolerance: brecha de dualidad relativa con la que se detiene.
+    parallel, max_workers: resolver los subproblemas en un pool de procesos.
+    config: SolverConfig de cada subproblema.
+
+    Retorna el diccionario de optimize_production_joint (el mejor plan factible
+    encontrado) más 'lower_bound', 'gap' e 'iterations'; 'capacity_duals' son
+    los multiplicadores de la mejor cota inferior. El estado es 'Optimal' si la
+    brecha queda por debajo de tolerance y ESTADO_INCUMBENTE si no. Sin ningún
+    plan factible se retorna 'Not Solved' con 'lower_bound', o 'Infeasible' si la
+    cota inferior supera la producción total posible.
+    """
+    demandas = np.atleast_2d(np.asarray(demands, dtype=float))
+    num_productos, num_periodos = demandas.shape
+    stocks_iniciales = np.broadcast_to(np.asarray(initial_stocks, dtype=float), (num_productos,))
+    factores = np.broadcast_to(np.asarray(factors, dtype=float), (num_productos,))
+    capacidades = _por_producto_periodo(capacities, num_productos, num_periodos, 'capacities')
+    seguridad = (np.zeros((num_productos, num_periodos)) if safety_stocks is None
+                 else _por_producto_periodo(safety_stocks, num_productos, num_periodos, 'safety_stocks'))
+    capacidad_total = np.broadcast_to(np.asarray(total_capacity, dtype=float), (num_periodos,))
+
+    executor = ProcessPoolExecutor(max_workers=max_workers) if parallel and num_productos > 1 else None
+    try:
+        subproblemas = _Subproblemas(stocks_iniciales, demandas, factores, capacidades, seguridad,
+                                     backend, config, executor, max_workers)
+        maxima = float(np.minimum(capacidades.sum(axis=0), capacidad_total).sum())
+        multiplicadores = np.zeros(num_periodos)
+        mejores_multiplicadores = multiplicadores
+        cota_inferior = -np.inf
+        cota_superior = np.inf
+        mejor_plan = None
+        promedio = np.zeros((num_productos, num_periodos))
+        peso_total = 0.0
+        iteracion = 0
+
+        while iteracion < max_iterations:
+            iteracion += 1
+            resultados = subproblemas.resolver(1.0 + multiplicadores)
+            fallidos = [estado for estado, plan, _ in resultados if plan is None]
+            if fallidos:
+                # Un producto sin solución propia hace infactible al modelo conjunto
+                return {'status': fallidos[0], 'iterations': iteracion}
+            produccion = np.array([plan for _, plan, _ in resultados])
+
+            uso = produccion.sum(axis=0)
+            valor = float(((1.0 + multiplicadores) * uso).sum() - multiplicadores @ capacidad_total)
+            if valor > maxima * (1 + tolerance):
+                # La cota inferior supera la producción total posible: el modelo conjunto no tiene solución
+                return {'status': 'Infeasible', 'lower_bound': valor, 'iterations': iteracion}
+            if valor > cota_inferior:
+                cota_inferior = valor
+                mejores_multiplicadores = multiplicadores.copy()
+
+            # Promedio ergódico de las soluciones de los subproblemas, ponderado por el paso
+            theta = PASO_INICIAL / np.sqrt(iteracion)
+            peso_total += theta
+            promedio += (produccion - promedio) * (theta / peso_total)
+
+            if iteracion == 1 or iteracion % RECUPERAR_CADA == 0:
+                recuperado = _recuperar_plan(subproblemas, promedio, capacidades, capacidad_total,
+                                             1.0 + multiplicadores)
+                if recuperado is not None and recuperado[0].sum() < cota_superior:
+                    cota_superior = float(recuperado[0].sum())
+                    mejor_plan = recuperado
+
+            gap = max(cota_superior - cota_inferior, 0.0) / max(1.0, abs(cota_superior))
+            if debug:
+                print(f"Iteración {iteracion}: cota inferior {cota_inferior:.6g}, "
+                      f"cota superior {cota_superior:.6g}, brecha {gap:.2e}")
+            if gap <= tolerance:
+                break
+
+            # Paso de Polyak sobre el subgradiente proyectado (lambda >= 0); sin cota
+            # superior se apunta a un 1 % sobre la mejor cota inferior
+            subgradiente = uso - capacidad_total
+            subgradiente[(multiplicadores <= 0) & (subgradiente < 0)] = 0.0
+            norma = float(subgradiente @ subgradiente)
+            if norma == 0:
+                break
+            objetivo = cota_superior if np.isfinite(cota_superior) else cota_inferior + 0.01 * abs(cota_inferior)
+            distancia = max(objetivo - valor, tolerance * abs(objetivo))
+            multiplicadores = np.maximum(multiplicadores + theta * distancia / norma * subgradiente, 0.0)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if mejor_plan is None:
+        return {'status': 'Not Solved', 'lower_bound': cota_inferior, 'iterations': iteracion}
+
+    plan, stocks = mejor_plan
+    gap = max(cota_superior - cota_inferior, 0.0) / max(1.0, abs(cota_superior))
+    return {
+        'optimal_value': cota_superior,
+        'production_levels': plan,
+        'ending_stocks': stocks,
+        'status': 'Optimal' if gap <= tolerance else ESTADO_INCUMBENTE,
+        'capacity_duals': mejores_multiplicadores,
+        'lower_bound': cota_inferior,
+        'gap': gap,
+        'iterations': iteracion
+    }
@@ -0,0 +1,354 @@
+"""
+Construcción del modelo de programación lineal de producción compartida por PL1-PL6.
+
+Formulaciones disponibles:
+    - "cumulative": el stock de cada período es una expresión afín que arrastra
+      todas las variables de producción anteriores (formulación original).
+      La restricción del período t tiene t+1 coeficientes, O(T^2) en total.
+    - "balance": una variable de stock por período y una igualdad de balance
+      stock_t = stock_{t-1} + factor * P_t - demanda_t. El stock de seguridad
+      pasa a ser la cota inferior de la variable de stock, O(T) en total.
+
+build_production_lp arma la formulación "balance" directamente como matrices
+dispersas (LinearProgram) para los solucionadores de backends.py, sin pasar por PuLP.
+"""
+
+import random
+import time
+
+import numpy as np
+import pulp as pl
+from scipy import sparse
+
+from solver_config import ESTADOS_CON_SOLUCION
+
+FORMULACIONES = ("cumulative", "balance")
+
+
+def build_production_model(
+        initial_stock,
+        demands,
+        yield_percentage,
+        density,
+        max_productivity,
+        safety_stocks=None,
+        objective="min",
+        formulation="cumulative",
+        final_stock=None,
+        name="Optimizacion_Produccion"
+):
+    """
+    Construye el modelo de producción.
+
+    Con final_stock=None el stock final debe ser al menos el último stock de
+    seguridad (PL6); con un número, el stock final debe ser exactamente ese
+    valor (PL1-PL5 usan 0).
+
+    Retorna (prob, production_vars, stock_terms), donde stock_terms son las
+    expresiones (cumulative) o variables (balance) de stock final por período.
+    """
+    num_periods = len(demands)
+
+    if safety_stocks is None:
+        safety_stocks = [0] * num_periods
+    elif len(safety_stocks) != num_periods:
+        raise ValueError("La longitud de stocks_seguridad debe ser igual al número de períodos.")
+
+    if formulation not in FORMULACIONES:
+        raise ValueError(f"Formulación inválida. Use una de: {', '.join(FORMULACIONES)}.")
+
+    factor = yield_percentage * density
+
+    direction = pl.LpMinimize if objective == "min" else pl.LpMaximize
+    prob = pl.LpProblem(name, direction)
+
+    production_vars = [pl.LpVariable(f"P_{t}", 0, max_productivity) for t in range(num_periods)]
+    prob += pl.lpSum(production_vars), "Produccion_Total"
+
+    if formulation == "cumulative":
+        stock = initial_stock
+        stock_terms = []
+        for t in range(num_periods):
+            stock = stock + (production_vars[t] * factor) - demands[t]
+            prob += stock >= safety_stocks[t], f"Stock_Seguridad_{t}"
+            stock_terms.append(stock)
+    else:
+        stock_terms = [pl.LpVariable(f"S_{t}", lowBound=safety_stocks[t]) for t in range(num_periods)]
+        for t in range(num_periods):
+            anterior = stock_terms[t - 1] if t > 0 else initial_stock
+            prob += stock_terms[t] == anterior + factor * production_vars[t] - demands[t], f"Balance_{t}"
+
+    if num_periods > 0:
+        if final_stock is None:
+            prob += stock_terms[-1] >= safety_stocks[-1], "Stock_Final_Minimo"
+        else:
+            prob += stock_terms[-1] == final_stock, "Stock_Final"
+
+    return prob, production_vars, stock_terms
+
+
+def model_size(prob):
+    """
+    Retorna (filas, columnas, no_ceros) del modelo.
+    """
+    rows = len(prob.constraints)
+    columns = len(prob.variables())
+    nonzeros = sum(len(constraint) for constraint in prob.constraints.values())
+    return rows, columns, nonzeros
+
+
+class LinearProgram:
+    """
+    Programa lineal en forma matricial:
+
+        min (o max) c @ x   s.a.   A_ub @ x <= b_ub,   A_eq @ x == b_eq,   lower <= x <= upper
+
+    integrality: None o arreglo con 1 en las variables enteras.
+    """
+
+    def __init__(self, c, A_ub=None, b_ub=None, A_eq=None, b_eq=None, lower=None, upper=None,
+                 sense="min", integrality=None):
+        self.c = np.asarray(c, dtype=float)
+        n = len(self.c)
+        self.A_ub = None if A_ub is None else sparse.csr_matrix(A_ub)
+        self.b_ub = None if b_ub is None else np.asarray(b_ub, dtype=float)
+        self.A_eq = None if A_eq is None else sparse.csr_matrix(A_eq)
+        self.b_eq = None if b_eq is None else np.asarray(b_eq, dtype=float)
+        self.lower = np.zeros(n) if lower is None else np.asarray(lower, dtype=float)
+        self.upper = np.full(n, np.inf) if upper is None else np.asarray(upper, dtype=float)
+        self.sense = sense
+        self.integrality = None if integrality is None else np.asarray(integrality)
+
+    @property
+    def num_columns(self):
+        return len(self.c)
+
+    @property
+    def num_rows(self):
+        return sum(A.shape[0] for A in (self.A_ub, self.A_eq) if A is not None)
+
+    @property
+    def nonzeros(self):
+        return sum(A.nnz for A in (self.A_ub, self.A_eq) if A is not None)
+
+    def primal_residual(self, x):
+        """
+        Mayor violación de las restricciones, cotas e integralidad en x, relativa a
+        la magnitud de los lados derechos y las cotas.
+        """
+        violaciones = [np.maximum(self.lower - x, 0.0), np.maximum(x - self.upper, 0.0)]
+        lados = [self.lower[np.isfinite(self.lower)], self.upper[np.isfinite(self.upper)]]
+        if self.A_eq is not None:
+            violaciones.append(np.abs(self.A_eq @ x - self.b_eq))
+            lados.append(self.b_eq)
+        if self.A_ub is not None:
+            violaciones.append(np.maximum(self.A_ub @ x - self.b_ub, 0.0))
+            lados.append(self.b_ub)
+        if self.integrality is not None:
+            enteras = np.asarray(self.integrality, dtype=bool)
+            violaciones.append(np.abs(x[enteras] - np.round(x[enteras])))
+        escala = 1.0 + max((np.abs(lado).max(initial=0.0) for lado in lados), default=0.0)
+        return float(max(v.max(initial=0.0) for v in violaciones)) / escala
+
+
+def build_production_lp(
+        initial_stock,
+        demands,
+        factor,
+        capacity,
+        safety_stocks=None,
+        objective="min",
+        final_stock=None,
+        stock_floor=None,
+        safety_slack_penalty=None,
+        capacity_slack_penalty=None,
+        production_costs=None
+):
+    """
+    Arma la formulación "balance" como LinearProgram con variables [P (T), S (T)],
+    seguidas de las holguras elásticas que correspondan:
+        - stock de seguridad: un bloque [E_k (T)] por nivel de penalización
+        - capacidad: [X (T)], producción por encima de la capacidad
+
+    factor: rendimiento x densidad (o solo rendimiento, como en ML3).
+    capacity: cota superior de la producción (escalar o por período).
+    stock_floor: piso duro del stock (escalar o por período); None = sin piso adicional.
+    Sin holguras, la cota inferior de S_t es max(stock_seguridad_t, piso_t). Con holguras,
+    S_t + sum_k E_k,t >= stock_seguridad_t.
+    safety_slack_penalty: un número (un solo nivel sin tope) o una secuencia de
+    (fracción, penalización): E_k,t cubre a lo sumo fracción_k del stock de seguridad
+    y cada unidad cuesta penalización_k. Ordenar las penalizaciones de menor a mayor
+    hace que los niveles se relajen en ese orden.
+    capacity_slack_penalty: si no es None, P_t - X_t <= capacidad_t y cada unidad de X_t
+    cuesta capacity_slack_penalty.
+    production_costs: costo por unidad producida (escalar o por período); None = 1,
+    es decir, producción total.
+    """
+    demandas = np.asarray(demands, dtype=float)
+    num_periods = len(demandas)
+    if num_periods == 0:
+        raise ValueError("El modelo requiere al menos un período de demanda.")
+    seguridad = np.zeros(num_periods) if safety_stocks is None else np.asarray(safety_stocks, dtype=float)
+    if len(seguridad) != num_periods:
+        raise ValueError("La longitud de stocks_seguridad debe ser igual al número de períodos.")
+
+    piso = np.full(num_periods, -np.inf) if stock_floor is None else np.broadcast_to(
+        np.asarray(stock_floor, dtype=float), (num_periods,))
+    capacidad = np.broadcast_to(np.asarray(capacity, dtype=float), (num_periods,))
+
+    if safety_slack_penalty is None:
+        niveles = []
+    elif np.isscalar(safety_slack_penalty):
+        niveles = [(None, float(safety_slack_penalty))]
+    else:
+        niveles = [(float(fraccion), float(penalizacion)) for fraccion, penalizacion in safety_slack_penalty]
+    elastica_capacidad = capacity_slack_penalty is not None
+    num_columns = (2 + len(niveles) + elastica_capacidad) * num_periods
+    signo = 1.0 if objective == "min" else -1.0
+
+    # Balance: S_t - S_{t-1} - factor * P_t = -demanda_t (+ stock inicial en t = 0)
+    t = np.arange(num_periods)
+    filas = np.concatenate([t, t, t[1:]])
+    columnas = np.concatenate([num_periods + t, t, num_periods + t[1:] - 1])
+    valores = np.concatenate([np.ones(num_periods), np.full(num_periods, -float(factor)), -np.ones(num_periods - 1)])
+    b_eq = -demandas.copy()
+    if num_periods > 0:
+        b_eq[0] += initial_stock
+
+    if final_stock is not None and num_periods > 0:
+        filas = np.append(filas, num_periods)
+        columnas = np.append(columnas, 2 * num_periods - 1)
+        valores = np.append(valores, 1.0)
+        b_eq = np.append(b_eq, final_stock)
+
+    A_eq = sparse.csr_matrix((valores, (filas, columnas)), shape=(len(b_eq), num_columns))
+
+    lower = np.zeros(num_columns)
+    upper = np.full(num_columns, np.inf)
+    upper[:num_periods] = capacidad
+
+    c = np.zeros(num_columns)
+    c[:num_periods] = 1.0 if production_costs is None else production_costs
+    bloques_ub = []
+    b_ub = []
+
+    if niveles:
+        lower[num_periods:2 * num_periods] = piso
+        # -S_t - sum_k E_k,t <= -stock_seguridad_t
+        filas_ub = [t]
+        columnas_ub = [num_periods + t]
+        for k, (fraccion, penalizacion) in enumerate(niveles):
+            inicio = (2 + k) * num_periods
+            filas_ub.append(t)
+            columnas_ub.append(inicio + t)
+            c[inicio:inicio + num_periods] = signo * penalizacion
+            if fraccion is not None:
+                upper[inicio:inicio + num_periods] = fraccion * np.maximum(seguridad, 0.0)
+        filas_ub = np.concatenate(filas_ub)
+        bloques_ub.append(sparse.csr_matrix(
+            (-np.ones(len(filas_ub)), (filas_ub, np.concatenate(columnas_ub))),
+            shape=(num_periods, num_columns)
+        ))
+        b_ub.append(-seguridad)
+    else:
+        lower[num_periods:2 * num_periods] = np.maximum(seguridad, piso)
+
+    if elastica_capacidad:
+        # P_t - X_t <= capacidad_t
+        inicio = (2 + len(niveles)) * num_periods
+        upper[:num_periods] = np.inf
+        c[inicio:] = signo * capacity_slack_penalty
+        bloques_ub.append(sparse.csr_matrix(
+            (np.concatenate([np.ones(num_periods), -np.ones(num_periods)]),
+             (np.concatenate([t, t]), np.concatenate([t, inicio + t]))),
+            shape=(num_periods, num_columns)
+        ))
+        b_ub.append(capacidad)
+
+    A_ub = sparse.vstack(bloques_ub, format='csr') if bloques_ub else None
+    b_ub = np.concatenate(b_ub) if b_ub else None
+
+    return LinearProgram(c, A_ub, b_ub, A_eq, b_eq, lower, upper, sense=objective)
+
+
+def production_result(solucion, num_periods):
+    """
+    Convierte la solución de un backend para build_production_lp en el
+    diccionario de resultados de optimize_production.
+    """
+    if solucion['status'] not in ESTADOS_CON_SOLUCION:
+        return {'status': solucion['status']}
+
+    x = solucion['x']
+    production_levels = x[:num_periods].tolist()
+    return {
+        'optimal_value': float(sum(production_levels)),
+        'production_levels': production_levels,
+        'ending_stocks': x[num_periods:2 * num_periods].tolist(),
+        'status': solucion['status']
+    }
+
+
+def compare_formulations(horizons=(52, 104, 260, 520), yield_percentage=0.8, density=0.9,
+                         max_productivity=300, initial_stock=100, seed=0):
+    """
+    Compara tiempos de construcción y resolución de ambas formulaciones sobre
+    instancias sintéticas y verifica que den el mismo valor óptimo.
+    Retorna una lista de diccionarios, uno por horizonte y formulación.
+    """
+    rng = random.Random(seed)
+    filas = []
+
+    for num_periods in horizons:
+        demands = [rng.uniform(100, 220) for _ in range(num_periods)]
+        safety_stocks = [rng.uniform(0, 40) for _ in range(num_periods)]
+
+        valores = {}
+        for formulation in FORMULACIONES:
+            inicio = time.perf_counter()
+            prob, _, _ = build_production_model(
+                initial_stock, demands, yield_percentage, density, max_productivity,
+                safety_stocks, formulation=formulation
+            )
+            tiempo_construccion = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            prob.solve(pl.PULP_CBC_CMD(msg=False))
+            tiempo_resolucion = time.perf_counter() - inicio
+
+            rows, columns, nonzeros = model_size(prob)
+            status = pl.LpStatus[prob.status]
+            valores[formulation] = pl.value(prob.objective) if status == 'Optimal' else None
+
+            filas.append({
+                'periodos': num_periods,
+                'formulacion': formulation,
+                'filas': rows,
+                'columnas': columns,
+                'no_ceros': nonzeros,
+                'construccion_s': tiempo_construccion,
+                'resolucion_s': tiempo_resolucion,
+                'estado': status,
+                'valor_optimo': valores[formulation]
+            })
+
+        a, b = valores["cumulative"], valores["balance"]
+        equivalentes = (a is None and b is None) or (
+            a is not None and b is not None and abs(a - b) <= 1e-6 * max(1.0, abs(a)))
+        for fila in filas[-len(FORMULACIONES):]:
+            fila['equivalentes'] = equivalentes
+
+    return filas
+
+
+if __name__ == "__main__":
+    print("Comparación de formulaciones (acumulada vs. balance con variables de stock)")
+    print("=" * 100)
+    print(f"{'Periodos':<10} {'Formulación':<12} {'No ceros':<10} {'Construcción (s)':<18} "
+          f"{'Resolución (s)':<16} {'Estado':<10} {'Equivalentes':<12}")
+    print("-" * 100)
+
+    for fila in compare_formulations():
+        print(f"{fila['periodos']:<10} {fila['formulacion']:<12} {fila['no_ceros']:<10} "
+              f"{fila['construccion_s']:<18.4f} {fila['resolucion_s']:<16.4f} "
+              f"{fila['estado']:<10} {str(fila['equivalentes']):<12}")
@@ -0,0 +1,227 @@
+"""
+Planificación conjunta de varios productos con capacidad total compartida.
+
+Un solo modelo disperso sobre productos x semanas:
+    P[i,t] en [0, capacidad_i]              producción
+    S[i,t] >= stock_seguridad[i,t]          stock final
+    S[i,t] = S[i,t-1] + factor_i * P[i,t] - demanda[i,t]
+    sum_i P[i,t] <= capacidad_total_t       capacidad compartida de la fábrica
+
+Como el modelo de ML3 (build_production_lp), admite una versión elástica en la
+que el stock de seguridad, la capacidad de cada producto y la capacidad
+compartida se pueden violar con penalizaciones.
+
+Las matrices se arman directamente con índices de NumPy (sin bucles de Python
+sobre productos ni períodos) y se resuelven con una sola llamada al backend
+(HiGHS en proceso por defecto).
+"""
+
+import time
+
+import numpy as np
+from scipy import sparse
+
+from backends import get_backend
+from lp_model import LinearProgram
+from solver_config import ESTADOS_CON_SOLUCION
+from solver_stats import stats_record
+
+
+def _matriz(valor, num_productos, num_periodos, nombre):
+    arreglo = np.asarray(valor, dtype=float)
+    if arreglo.ndim == 1:
+        arreglo = arreglo[:, None]
+    try:
+        return np.broadcast_to(arreglo, (num_productos, num_periodos))
+    except ValueError:
+        raise ValueError(f"'{nombre}' no es compatible con ({num_productos} productos x {num_periodos} períodos).")
+
+
+def _niveles(safety_slack_penalty):
+    """
+    Niveles de holgura del stock de seguridad como en build_production_lp: lista de
+    (fracción o None, penalización).
+    """
+    if safety_slack_penalty is None:
+        return []
+    if np.isscalar(safety_slack_penalty):
+        return [(None, float(safety_slack_penalty))]
+    return [(float(fraccion), float(penalizacion)) for fraccion, penalizacion in safety_slack_penalty]
+
+
+def build_joint_model(initial_stocks, demands, factors, capacities, total_capacity=None, safety_stocks=None,
+                      stock_floor=None, safety_slack_penalty=None, capacity_slack_penalty=None):
+    """
+    Arma el modelo conjunto como LinearProgram; las variables están ordenadas
+    como [P (N*T), S (N*T)] por producto y período, seguidas de las holguras
+    elásticas que correspondan (mismas reglas que build_production_lp):
+        - stock de seguridad: un bloque [E_k (N*T)] por nivel de safety_slack_penalty
+        - capacidad: [X (N*T)], producción por encima de la capacidad de cada producto,
+          y [Z (T)], producción total por encima de total_capacity (si se indica)
+
+    stock_floor: piso duro del stock (escalar, por producto o matriz).
+    """
+    demandas = np.atleast_2d(np.asarray(demands, dtype=float))
+    num_productos, num_periodos = demandas.shape
+    n = num_productos * num_periodos
+
+    stock_inicial = np.broadcast_to(np.asarray(initial_stocks, dtype=float), (num_productos,))
+    factor = np.broadcast_to(np.asarray(factors, dtype=float), (num_productos,))
+    capacidad = _matriz(capacities, num_productos, num_periodos, 'capacities')
+    seguridad = (np.zeros((num_productos, num_periodos)) if safety_stocks is None
+                 else _matriz(safety_stocks, num_productos, num_periodos, 'safety_stocks'))
+    piso = (np.full((num_productos, num_periodos), -np.inf) if stock_floor is None
+            else _matriz(stock_floor, num_productos, num_periodos, 'stock_floor'))
+
+    niveles = _niveles(safety_slack_penalty)
+    elastica_capacidad = capacity_slack_penalty is not None
+    compartida = total_capacity is not None
+    num_columnas = (2 + len(niveles) + elastica_capacidad) * n + (num_periodos if elastica_capacidad and compartida
+                                                                  else 0)
+
+    # Balance: una fila por (producto, período)
+    filas = np.arange(n)
+    indice_stock = n + filas
+    anteriores = filas.reshape(num_productos, num_periodos)[:, 1:].ravel()
+
+    filas_eq = np.concatenate([filas, filas, anteriores])
+    columnas_eq = np.concatenate([indice_stock, filas, n + anteriores - 1])
+    valores_eq = np.concatenate([
+        np.ones(n),
+        -np.repeat(factor, num_periodos),
+        -np.ones(len(anteriores))
+    ])
+    A_eq = sparse.csr_matrix((valores_eq, (filas_eq, columnas_eq)), shape=(n, num_columnas))
+
+    b_eq = -demandas.copy()
+    b_eq[:, 0] += stock_inicial
+    b_eq = b_eq.ravel()
+
+    c = np.zeros(num_columnas)
+    c[:n] = 1.0
+    cotas_inferiores = np.zeros(num_columnas)
+    cotas_superiores = np.full(num_columnas, np.inf)
+    cotas_superiores[:n] = capacidad.ravel()
+    bloques_ub = []
+    b_ub = []
+
+    if niveles:
+        cotas_inferiores[n:2 * n] = piso.ravel()
+        # -S[i,t] - sum_k E_k[i,t] <= -stock_seguridad[i,t]
+        filas_ub = [filas]
+        columnas_ub = [indice_stock]
+        for k, (fraccion, penalizacion) in enumerate(niveles):
+            inicio = (2 + k) * n
+            filas_ub.append(filas)
+            columnas_ub.append(inicio + filas)
+            c[inicio:inicio + n] = penalizacion
+            if fraccion is not None:
+                cotas_superiores[inicio:inicio + n] = fraccion * np.maximum(seguridad, 0.0).ravel()
+        filas_ub = np.concatenate(filas_ub)
+        bloques_ub.append(sparse.csr_matrix(
+            (-np.ones(len(filas_ub)), (filas_ub, np.concatenate(columnas_ub))),
+            shape=(n, num_columnas)
+        ))
+        b_ub.append(-seguridad.ravel())
+    else:
+        cotas_inferiores[n:2 * n] = np.maximum(seguridad, piso).ravel()
+
+    if elastica_capacidad:
+        # P[i,t] - X[i,t] <= capacidad[i,t]
+        inicio = (2 + len(niveles)) * n
+        cotas_superiores[:n] = np.inf
+        c[inicio:inicio + n] = capacity_slack_penalty
+        bloques_ub.append(sparse.csr_matrix(
+            (np.concatenate([np.ones(n), -np.ones(n)]), (np.concatenate([filas, filas]),
+                                                         np.concatenate([filas, inicio + filas]))),
+            shape=(n, num_columnas)
+        ))
+        b_ub.append(capacidad.ravel())
+
+    # Capacidad compartida: una fila por período, sum_i P[i,t] (- Z_t) <= capacidad_total_t
+    if compartida:
+        periodos = np.tile(np.arange(num_periodos), num_productos)
+        valores, filas_ub, columnas_ub = np.ones(n), periodos, filas
+        if elastica_capacidad:
+            inicio = (3 + len(niveles)) * n
+            c[inicio:] = capacity_slack_penalty
+            valores = np.concatenate([valores, -np.ones(num_periodos)])
+            filas_ub = np.concatenate([filas_ub, np.arange(num_periodos)])
+            columnas_ub = np.concatenate([columnas_ub, inicio + np.arange(num_periodos)])
+        bloques_ub.append(sparse.csr_matrix((valores, (filas_ub, columnas_ub)), shape=(num_periodos, num_columnas)))
+        b_ub.append(np.broadcast_to(np.asarray(total_capacity, dtype=float), (num_periodos,)))
+
+    A_ub = sparse.vstack(bloques_ub, format='csr') if bloques_ub else None
+    b_ub = np.concatenate(b_ub) if b_ub else None
+
+    return LinearProgram(c, A_ub, b_ub, A_eq, b_eq, cotas_inferiores, cotas_superiores)
+
+
+def optimize_production_joint(initial_stocks, demands, factors, capacities, total_capacity=None,
+                              safety_stocks=None, backend="highs", config=None, scaling=True, stats_sink=None,
+                              stock_floor=None, safety_slack_penalty=None, capacity_slack_penalty=None):
+    """
+    Minimiza la producción total de todos los productos con una sola llamada al solucionador.
+
+    demands y safety_stocks son matrices (productos x períodos); initial_stocks y
+    factors (rendimiento x densidad) son vectores por producto; capacities acepta
+    un vector por producto o una matriz; total_capacity un escalar o un vector por período.
+
+    config: SolverConfig del backend; en modo anytime el estado puede ser 'Incumbent'.
+    scaling: resolver el modelo escalado (ScaledBackend, ver scaling.py).
+    stats_sink: StatsSink opcional; recibe un registro de estadísticas de la resolución.
+    stock_floor, safety_slack_penalty, capacity_slack_penalty: modelo elástico, como en
+    build_production_lp; con capacity_slack_penalty también se puede exceder total_capacity,
+    así que con ambas penalizaciones (y stock_floor) el modelo siempre tiene solución.
+
+    Retorna el diccionario de optimize_production con matrices por producto, más
+    'capacity_duals' (precio sombra de la capacidad compartida por período). En el
+    modelo elástico 'optimal_value' sigue siendo la producción total y se agregan
+    'safety_slack' (niveles x productos x períodos), 'capacity_slack' (productos x
+    períodos) y 'shared_capacity_slack' (por período, con total_capacity).
+    """
+    num_productos, num_periodos = np.atleast_2d(np.asarray(demands, dtype=float)).shape
+    n = num_productos * num_periodos
+
+    inicio = time.perf_counter()
+    lp = build_joint_model(initial_stocks, demands, factors, capacities, total_capacity, safety_stocks,
+                           stock_floor, safety_slack_penalty, capacity_slack_penalty)
+    solver = get_backend(backend, scaling=scaling, config=config)
+    tiempo_construccion = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    solucion = solver.solve(lp)
+    tiempo_resolucion = time.perf_counter() - inicio
+
+    if stats_sink is not None:
+        stats_sink.emit(stats_record(
+            "multiproduct.optimize_production_joint", solver.name, num_periodos, lp.num_rows, lp.num_columns,
+            lp.nonzeros, tiempo_construccion, solucion.get('write_s', 0.0),
+            tiempo_resolucion - solucion.get('write_s', 0.0), 0.0, solucion.get('iterations'), solucion['status']
+        ))
+
+    if solucion['status'] not in ESTADOS_CON_SOLUCION:
+        return {'status': solucion['status']}
+
+    x = solucion['x']
+    produccion = x[:n].reshape(num_productos, num_periodos)
+    resultado = {
+        'optimal_value': float(produccion.sum()),
+        'production_levels': produccion,
+        'ending_stocks': x[n:2 * n].reshape(num_productos, num_periodos),
+        'status': solucion['status']
+    }
+    if total_capacity is not None and solucion.get('ub_duals') is not None:
+        # Las filas de la capacidad compartida son las últimas de A_ub
+        resultado['capacity_duals'] = -solucion['ub_duals'][-num_periodos:]
+
+    niveles = len(_niveles(safety_slack_penalty))
+    if niveles:
+        resultado['safety_slack'] = x[2 * n:(2 + niveles) * n].reshape(niveles, num_productos, num_periodos)
+    if capacity_slack_penalty is not None:
+        inicio = (2 + niveles) * n
+        resultado['capacity_slack'] = x[inicio:inicio + n].reshape(num_productos, num_periodos)
+        if total_capacity is not None:
+            resultado['shared_capacity_slack'] = x[inicio + n:]
+
+    return resultado
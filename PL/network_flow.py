@@ -0,0 +1,289 @@
+"""
+Motor de flujo en redes generalizadas para la planificación de inventario con rendimiento.
+
+El balance stock_t = stock_{t-1} + rendimiento x densidad * P_t - demanda_t es un
+flujo en red con ganancias: cada período tiene un nodo de inventario por etapa, los
+arcos de arrastre (t-1 -> t) tienen ganancia 1 y los de producción tienen la
+ganancia de la etapa. Las cadenas de varias etapas (fab -> probe -> assembly)
+encadenan los inventarios: producir una unidad en la etapa k consume una unidad
+del inventario de la etapa k-1 y agrega ganancia_k unidades al de la etapa k,
+disponibles lead_time períodos después.
+
+Sin capacidad compartida entre productos y minimizando, la red es una cadena por
+producto y se resuelve sin solucionador: la producción acumulada mínima de cada
+etapa se calcula de la última a la primera con las pasadas hacia atrás y hacia
+adelante del voraz (greedy.py), vectorizadas sobre productos y períodos con NumPy
+(O(productos x etapas x períodos)). La producción acumulada mínima punto a punto
+de una etapa es la que menos exige a la anterior, así que la cadena resultante es
+óptima para cualquier costo no negativo por etapa.
+
+Con capacidad compartida entre productos (o maximizando) la red se arma como
+LinearProgram disperso sobre los mismos nodos y arcos y se resuelve con un backend.
+"""
+
+import numpy as np
+from scipy import sparse
+
+from backends import get_backend
+from greedy import TOLERANCIA
+from lp_model import LinearProgram
+from solver_config import ESTADOS_CON_SOLUCION
+
+
+def _por_producto(valor, num_productos, nombre):
+    try:
+        return np.broadcast_to(np.asarray(valor, dtype=float), (num_productos,))
+    except ValueError:
+        raise ValueError(f"'{nombre}' no es compatible con {num_productos} productos.")
+
+
+def _por_producto_periodo(valor, num_productos, num_periodos, nombre):
+    arreglo = np.asarray(valor, dtype=float)
+    if arreglo.ndim == 1 and len(arreglo) == num_productos and num_productos != num_periodos:
+        arreglo = arreglo[:, None]
+    try:
+        return np.broadcast_to(arreglo, (num_productos, num_periodos))
+    except ValueError:
+        raise ValueError(f"'{nombre}' no es compatible con ({num_productos} productos x {num_periodos} períodos).")
+
+
+def _normalizar_etapas(stages, safety_stocks, num_productos, num_periodos):
+    """
+    Convierte la lista de etapas en arreglos por producto (y período).
+    """
+    if not stages:
+        raise ValueError("Se requiere al menos una etapa.")
+
+    etapas = []
+    for k, etapa in enumerate(stages):
+        seguridad = etapa.get('safety_stock', 0.0)
+        if k == len(stages) - 1 and safety_stocks is not None:
+            seguridad = safety_stocks
+        lead_time = int(etapa.get('lead_time', 0))
+        if lead_time < 0:
+            raise ValueError("lead_time debe ser no negativo.")
+        ganancia = _por_producto(etapa['gain'], num_productos, 'gain')
+        if np.any(ganancia <= 0):
+            raise ValueError("La ganancia (rendimiento x densidad) de cada etapa debe ser positiva.")
+        etapas.append({
+            'name': etapa.get('name', f"etapa_{k + 1}"),
+            'gain': ganancia,
+            'capacity': _por_producto_periodo(etapa['capacity'], num_productos, num_periodos, 'capacity'),
+            'initial_stock': _por_producto(etapa.get('initial_stock', 0.0), num_productos, 'initial_stock'),
+            'safety_stock': _por_producto_periodo(seguridad, num_productos, num_periodos, 'safety_stock'),
+            'lead_time': lead_time,
+            'cost': _por_producto(etapa.get('cost', 1.0), num_productos, 'cost')
+        })
+    return etapas
+
+
+def _acumulada_minima(requerida, capacidad):
+    """
+    Producción acumulada mínima punto a punto que cumple requerida (productos x
+    períodos, -inf donde no hay requisito) con producción por período en [0, capacidad].
+    Retorna (acumulada, factible por producto).
+    """
+    capacidad_acumulada = np.cumsum(capacidad, axis=1)
+    # Pasada hacia atrás: L_t = max_{s >= t} (R_s - C_s) + C_t
+    limite = np.maximum.accumulate((requerida - capacidad_acumulada)[:, ::-1], axis=1)[:, ::-1]
+    limite = limite + capacidad_acumulada
+    # Pasada hacia adelante: no decreciente y no negativa
+    acumulada = np.maximum.accumulate(np.maximum(limite, 0.0), axis=1)
+
+    produccion = np.diff(acumulada, axis=1, prepend=0.0)
+    tolerancia = TOLERANCIA * np.maximum(1.0, np.maximum(np.abs(acumulada), capacidad))
+    factible = np.all(produccion <= capacidad + tolerancia, axis=1)
+    return acumulada, factible
+
+
+def _resolver_cadena(demandas, etapas, final_stock):
+    """
+    Resuelve cada cadena de producto de la última etapa a la primera.
+    Retorna (producción, stocks) con forma (productos, etapas, períodos) o None si es infactible.
+    """
+    num_productos, num_periodos = demandas.shape
+    num_etapas = len(etapas)
+    produccion = np.zeros((num_productos, num_etapas, num_periodos))
+    stocks = np.zeros((num_productos, num_etapas, num_periodos))
+
+    # Salida acumulada del inventario de la etapa: la demanda en la última etapa,
+    # la producción de la etapa siguiente en las demás
+    salida = np.cumsum(demandas, axis=1)
+    for k in range(num_etapas - 1, -1, -1):
+        etapa = etapas[k]
+        ganancia = etapa['gain'][:, None]
+        inicial = etapa['initial_stock'][:, None]
+        lead_time = etapa['lead_time']
+
+        # Inventario_t = inicial + ganancia * acumulada_{t - lead} - salida_t >= seguridad_t
+        necesidad = salida + etapa['safety_stock'] - inicial
+        escala = TOLERANCIA * np.maximum(1.0, np.abs(salida) + np.abs(inicial))
+        if lead_time and np.any(necesidad[:, :lead_time] > escala[:, :lead_time]):
+            return None
+
+        requerida = np.full((num_productos, num_periodos), -np.inf)
+        requerida[:, :num_periodos - lead_time] = necesidad[:, lead_time:] / ganancia
+
+        final = None
+        if k == num_etapas - 1 and final_stock is not None and lead_time < num_periodos:
+            final = (salida[:, -1] + _por_producto(final_stock, num_productos, 'final_stock')
+                     - inicial[:, 0]) / ganancia[:, 0]
+            requerida[:, -1 - lead_time] = np.maximum(requerida[:, -1 - lead_time], final)
+
+        acumulada, factible = _acumulada_minima(requerida, etapa['capacity'])
+        if not np.all(factible):
+            return None
+        if final is not None:
+            exceso = acumulada[:, -1 - lead_time] - final
+            if np.any(exceso > TOLERANCIA * np.maximum(1.0, np.abs(salida[:, -1]) / ganancia[:, 0])):
+                return None
+
+        produccion[:, k] = np.diff(acumulada, axis=1, prepend=0.0)
+        llegadas = np.zeros_like(acumulada)
+        llegadas[:, lead_time:] = acumulada[:, :num_periodos - lead_time]
+        stocks[:, k] = inicial + ganancia * llegadas - salida
+        salida = acumulada
+
+    return produccion, stocks
+
+
+def build_network_model(demands, stages, safety_stocks=None, shared_capacity=None, objective="min",
+                        final_stock=None):
+    """
+    Arma la red como LinearProgram con variables [P (productos x etapas x períodos),
+    I (productos x etapas x períodos)] y una fila de balance por nodo de inventario.
+    shared_capacity: {índice o nombre de etapa: capacidad total por período}.
+    """
+    demandas = np.atleast_2d(np.asarray(demands, dtype=float))
+    num_productos, num_periodos = demandas.shape
+    etapas = _normalizar_etapas(stages, safety_stocks, num_productos, num_periodos)
+    num_etapas = len(etapas)
+    n = num_productos * num_etapas * num_periodos
+    indice = np.arange(n).reshape(num_productos, num_etapas, num_periodos)
+
+    filas, columnas, valores = [], [], []
+    b_eq = np.zeros((num_productos, num_etapas, num_periodos))
+    lower = np.zeros(2 * n)
+    upper = np.full(2 * n, np.inf)
+    c = np.zeros(2 * n)
+
+    for k, etapa in enumerate(etapas):
+        nodos = indice[:, k, :]
+        lead_time = etapa['lead_time']
+
+        # I_t - I_{t-1} - ganancia * P_{t-lead} + P^{siguiente}_t = -demanda_t (+ inicial en t = 0)
+        filas += [nodos.ravel(), nodos[:, 1:].ravel()]
+        columnas += [n + nodos.ravel(), n + nodos[:, :-1].ravel()]
+        valores += [np.ones(nodos.size), -np.ones(nodos[:, 1:].size)]
+        if lead_time < num_periodos:
+            filas.append(nodos[:, lead_time:].ravel())
+            columnas.append(nodos[:, :num_periodos - lead_time].ravel())
+            valores.append(-np.repeat(etapa['gain'], num_periodos - lead_time))
+        if k + 1 < num_etapas:
+            filas.append(nodos.ravel())
+            columnas.append(indice[:, k + 1, :].ravel())
+            valores.append(np.ones(nodos.size))
+        else:
+            b_eq[:, k, :] -= demandas
+        b_eq[:, k, 0] += etapa['initial_stock']
+
+        upper[nodos.ravel()] = etapa['capacity'].ravel()
+        lower[n + nodos.ravel()] = etapa['safety_stock'].ravel()
+        c[nodos.ravel()] = np.repeat(etapa['cost'], num_periodos)
+
+    if final_stock is not None:
+        ultimos = n + indice[:, -1, -1]
+        final = _por_producto(final_stock, num_productos, 'final_stock')
+        lower[ultimos] = np.maximum(lower[ultimos], final)
+        upper[ultimos] = final
+
+    A_eq = sparse.csr_matrix(
+        (np.concatenate(valores), (np.concatenate(filas), np.concatenate(columnas))), shape=(n, 2 * n))
+
+    A_ub = None
+    b_ub = None
+    if shared_capacity:
+        nombres = [etapa['name'] for etapa in etapas]
+        bloques = []
+        lados = []
+        for clave, capacidad in shared_capacity.items():
+            k = nombres.index(clave) if isinstance(clave, str) else int(clave)
+            bloques.append(sparse.csr_matrix(
+                (np.ones(num_productos * num_periodos),
+                 (np.tile(np.arange(num_periodos), num_productos), indice[:, k, :].ravel())),
+                shape=(num_periodos, 2 * n)
+            ))
+            lados.append(np.broadcast_to(np.asarray(capacidad, dtype=float), (num_periodos,)))
+        A_ub = sparse.vstack(bloques, format='csr')
+        b_ub = np.concatenate(lados)
+
+    return LinearProgram(c, A_ub, b_ub, A_eq, b_eq.ravel(), lower, upper, sense=objective), etapas
+
+
+def optimize_production_network(demands, stages, safety_stocks=None, shared_capacity=None, objective="min",
+                                final_stock=None, backend="highs", method="auto", config=None):
+    """
+    Planifica la producción de una o varias cadenas de etapas.
+
+    demands: vector (un producto) o matriz (productos x períodos), en la última etapa.
+    stages: lista de etapas en el orden del flujo; cada una es un diccionario con
+        'gain' (rendimiento x densidad), 'capacity' y opcionalmente 'initial_stock',
+        'safety_stock' (piso del inventario de la etapa), 'lead_time' (períodos hasta
+        que la producción está disponible, 0 por defecto), 'cost' (por unidad
+        producida, 1 por defecto) y 'name'. Los valores pueden ser escalares, por
+        producto o (capacidad y stock de seguridad) por producto y período.
+    safety_stocks: stock de seguridad de la última etapa (reemplaza su 'safety_stock').
+    shared_capacity: {etapa: capacidad total por período} compartida entre productos.
+    final_stock: stock final exacto de la última etapa (None: solo el stock de seguridad).
+    method: "chain" (sin solucionador), "lp" o "auto" (chain cuando se puede).
+
+    Retorna el diccionario de optimize_production con 'production_levels' y
+    'ending_stocks' de forma (productos, etapas, períodos), 'optimal_value' (costo
+    total) y 'method'. Con un solo producto y una sola etapa, 'production_levels'
+    y 'ending_stocks' son listas, igual que en optimize_production.
+    """
+    demandas = np.atleast_2d(np.asarray(demands, dtype=float))
+    num_productos, num_periodos = demandas.shape
+    un_producto = np.ndim(demands) == 1
+
+    cadena_posible = not shared_capacity and objective == "min"
+    if method == "chain" and not cadena_posible:
+        raise ValueError("El método 'chain' requiere objective='min' y sin capacidad compartida.")
+    if method not in ("auto", "chain", "lp"):
+        raise ValueError("Método inválido. Use 'auto', 'chain' o 'lp'.")
+
+    if method != "lp" and cadena_posible:
+        etapas = _normalizar_etapas(stages, safety_stocks, num_productos, num_periodos)
+        solucion = _resolver_cadena(demandas, etapas, final_stock)
+        if solucion is None:
+            return {'status': 'Infeasible', 'method': 'chain'}
+        produccion, stocks = solucion
+        status = 'Optimal'
+        metodo = 'chain'
+    else:
+        lp, etapas = build_network_model(demandas, stages, safety_stocks, shared_capacity, objective, final_stock)
+        if np.any(lp.lower > lp.upper):
+            return {'status': 'Infeasible', 'method': 'lp'}
+        resultado = get_backend(backend, scaling=True, config=config).solve(lp)
+        status = resultado['status']
+        if status not in ESTADOS_CON_SOLUCION:
+            return {'status': status, 'method': 'lp'}
+        n = num_productos * len(etapas) * num_periodos
+        forma = (num_productos, len(etapas), num_periodos)
+        produccion = resultado['x'][:n].reshape(forma)
+        stocks = resultado['x'][n:].reshape(forma)
+        metodo = 'lp'
+
+    costos = np.stack([etapa['cost'] for etapa in etapas], axis=1)
+    plan = {
+        'optimal_value': float((costos[:, :, None] * produccion).sum()),
+        'production_levels': produccion,
+        'ending_stocks': stocks,
+        'status': status,
+        'method': metodo,
+        'stages': [etapa['name'] for etapa in etapas]
+    }
+    if un_producto and len(etapas) == 1:
+        plan['production_levels'] = produccion[0, 0].tolist()
+        plan['ending_stocks'] = stocks[0, 0].tolist()
+    return plan
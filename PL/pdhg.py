@@ -0,0 +1,215 @@
+"""
+Solucionador de primer orden (PDHG) para LinearProgram, sin factorizar matrices.
+
+Con productos x semanas x fábricas del orden de millones de variables, el simplex
+(CBC o HiGHS) deja de caber en memoria o en tiempo. PDHG (primal-dual hybrid
+gradient, como PDLP) solo usa productos matriz-vector dispersos con A y A^T:
+memoria lineal en los no ceros y tiempo por iteración predecible, a cambio de
+una solución con la tolerancia pedida en lugar de una exacta.
+
+Las filas se escriben como K x >= q (igualdades con dual libre, desigualdades
+-A_ub x >= -b_ub con dual y >= 0) y cada iteración es
+
+    x' = proy_[lower, upper](x - tau * (c - K^T y))
+    y' = proy_Y(y + sigma * (q - K (2 x' - x)))
+
+con tau = eta / omega, sigma = eta * omega, eta < 1 / ||K||_2 y omega el peso
+primal. Cada CADA_VERIFICACION iteraciones se mide el error KKT relativo
+(residuos primal y dual y brecha de dualidad) del iterado actual y del promedio
+desde el último reinicio; se reinicia desde el mejor de los dos cuando su error
+baja lo suficiente respecto al del último reinicio (reinicios adaptativos) y en
+cada reinicio se ajusta el peso primal. También se reinicia si el promedio ya
+acumula más del REINICIO_ARTIFICIAL de todas las iteraciones.
+
+PDHG es sensible a la escala del modelo: conviene usarlo a través de
+ScaledBackend (get_backend("pdhg", scaling=True)). No certifica infactibilidad:
+un modelo sin solución agota el límite de iteraciones con estado 'Not Solved'.
+"""
+
+import time
+
+import numpy as np
+from scipy import sparse
+
+# Iteraciones entre evaluaciones del error KKT (y posibles reinicios)
+CADA_VERIFICACION = 64
+
+# Umbrales de los reinicios adaptativos (los de PDLP)
+REINICIO_SUFICIENTE = 0.2
+REINICIO_NECESARIO = 0.8
+REINICIO_ARTIFICIAL = 0.36
+
+# Iteraciones de la estimación de ||K||_2 por el método de la potencia
+ITERACIONES_NORMA = 30
+
+
+def _norma_espectral(K, KT, iteraciones=ITERACIONES_NORMA, semilla=0):
+    v = np.random.default_rng(semilla).standard_normal(K.shape[1])
+    norma = 0.0
+    for _ in range(iteraciones):
+        w = KT @ (K @ v)
+        norma = np.linalg.norm(w)
+        if norma == 0:
+            return 0.0
+        v = w / norma
+    return float(np.sqrt(norma))
+
+
+class _Problema:
+    """
+    LinearProgram en forma K x >= q, min c @ x, lower <= x <= upper.
+    """
+
+    def __init__(self, lp):
+        signo = 1.0 if lp.sense == "min" else -1.0
+        self.c = signo * lp.c
+        bloques, lados = [], []
+        self.num_eq = 0 if lp.A_eq is None else lp.A_eq.shape[0]
+        if lp.A_eq is not None:
+            bloques.append(lp.A_eq)
+            lados.append(lp.b_eq)
+        if lp.A_ub is not None:
+            bloques.append(-lp.A_ub)
+            lados.append(-lp.b_ub)
+        n = lp.num_columns
+        self.K = sparse.vstack(bloques, format='csr') if bloques else sparse.csr_matrix((0, n))
+        self.KT = self.K.T.tocsr()
+        self.q = np.concatenate(lados) if lados else np.zeros(0)
+        self.lower = lp.lower
+        self.upper = lp.upper
+        self.con_inferior = np.isfinite(lp.lower)
+        self.con_superior = np.isfinite(lp.upper)
+        self.norma_c = np.linalg.norm(self.c)
+        self.norma_q = np.linalg.norm(self.q)
+
+    def proyectar_x(self, x):
+        return np.clip(x, self.lower, self.upper)
+
+    def proyectar_y(self, y):
+        y[self.num_eq:] = np.maximum(y[self.num_eq:], 0.0)
+        return y
+
+    def errores(self, x, y):
+        """
+        Retorna el error KKT: el mayor entre los residuos primal y dual y la brecha, todos relativos.
+        """
+        Kx = self.K @ x
+        residuo = self.q - Kx
+        residuo[self.num_eq:] = np.maximum(residuo[self.num_eq:], 0.0)
+        primal = np.linalg.norm(residuo) / (1.0 + self.norma_q)
+
+        # Costo reducido: la parte positiva la explica la cota inferior y la negativa la superior
+        reducido = self.c - self.KT @ y
+        positivo = np.maximum(reducido, 0.0)
+        negativo = np.minimum(reducido, 0.0)
+        sin_explicar = np.where(self.con_inferior, 0.0, positivo) + np.where(self.con_superior, 0.0, negativo)
+        dual = np.linalg.norm(sin_explicar) / (1.0 + self.norma_c)
+
+        objetivo_primal = float(self.c @ x)
+        objetivo_dual = float(self.q @ y
+                              + self.lower[self.con_inferior] @ positivo[self.con_inferior]
+                              + self.upper[self.con_superior] @ negativo[self.con_superior])
+        brecha = abs(objetivo_primal - objetivo_dual) / (1.0 + abs(objetivo_primal) + abs(objetivo_dual))
+        return max(primal, dual, brecha)
+
+
+def solve_pdhg(lp, tolerance=1e-6, max_iterations=100000, time_limit=None, restarts=True):
+    """
+    Resuelve un LinearProgram continuo con PDHG.
+
+    tolerance: error KKT relativo (residuos y brecha) con el que se declara 'Optimal'.
+    max_iterations, time_limit: al agotarse cualquiera se retorna el último punto
+    con estado 'Not Solved' (con 'x'); 'time_limit_reached' indica si se detuvo por tiempo.
+    restarts: activar los reinicios adaptativos desde el promedio.
+
+    Retorna un diccionario con las claves de los backends (ver backends.py) más
+    'kkt_error'; los duales siguen la convención de HiGHS (derivada del objetivo
+    respecto a los lados derechos y a las cotas superiores).
+    """
+    if lp.integrality is not None and np.any(lp.integrality):
+        raise ValueError("PDHG solo resuelve programas lineales continuos.")
+
+    inicio = time.perf_counter()
+    problema = _Problema(lp)
+    n, m = lp.num_columns, problema.K.shape[0]
+
+    norma = _norma_espectral(problema.K, problema.KT) if m else 0.0
+    eta = 0.9 / norma if norma > 0 else 1.0
+    if problema.norma_c > 0 and problema.norma_q > 0:
+        omega = problema.norma_c / problema.norma_q
+    else:
+        omega = 1.0
+
+    x = problema.proyectar_x(np.zeros(n))
+    y = np.zeros(m)
+    x_reinicio, y_reinicio = x.copy(), y.copy()
+    suma_x, suma_y, pasos = np.zeros(n), np.zeros(m), 0
+    error_reinicio = np.inf
+    error_anterior = np.inf
+    error = np.inf
+    estado = 'Not Solved'
+    por_tiempo = False
+
+    iteracion = 0
+    while iteracion < max_iterations:
+        tau, sigma = eta / omega, eta * omega
+        for _ in range(CADA_VERIFICACION):
+            x_nuevo = problema.proyectar_x(x - tau * (problema.c - problema.KT @ y))
+            y = problema.proyectar_y(y + sigma * (problema.q - problema.K @ (2.0 * x_nuevo - x)))
+            x = x_nuevo
+            suma_x += x
+            suma_y += y
+        pasos += CADA_VERIFICACION
+        iteracion += CADA_VERIFICACION
+
+        # Candidato: iterado actual o promedio desde el último reinicio, el de menor error
+        x_prom, y_prom = suma_x / pasos, problema.proyectar_y(suma_y / pasos)
+        error_actual = problema.errores(x, y)
+        error_prom = problema.errores(x_prom, y_prom)
+        if error_prom < error_actual:
+            candidato_x, candidato_y, error = x_prom, y_prom, error_prom
+        else:
+            candidato_x, candidato_y, error = x, y, error_actual
+
+        if error <= tolerance:
+            x, y = candidato_x, candidato_y
+            estado = 'Optimal'
+            break
+        if time_limit is not None and time.perf_counter() - inicio >= time_limit:
+            x, y = candidato_x, candidato_y
+            por_tiempo = True
+            break
+
+        if restarts:
+            reiniciar = (error <= REINICIO_SUFICIENTE * error_reinicio
+                         or (error <= REINICIO_NECESARIO * error_reinicio and error > error_anterior)
+                         or pasos >= REINICIO_ARTIFICIAL * iteracion)
+            error_anterior = error
+            if reiniciar:
+                # Peso primal: media geométrica suavizada del cociente entre los desplazamientos
+                delta_x = np.linalg.norm(candidato_x - x_reinicio)
+                delta_y = np.linalg.norm(candidato_y - y_reinicio)
+                if delta_x > 0 and delta_y > 0:
+                    omega = float(np.exp(0.5 * np.log(delta_y / delta_x) + 0.5 * np.log(omega)))
+                x, y = candidato_x.copy(), candidato_y.copy()
+                x_reinicio, y_reinicio = x.copy(), y.copy()
+                suma_x[:], suma_y[:], pasos = 0.0, 0.0, 0
+                error_reinicio = error
+                error_anterior = np.inf
+
+    signo = 1.0 if lp.sense == "min" else -1.0
+    reducido = problema.c - problema.KT @ y
+    upper_duals = np.where(problema.con_superior, np.minimum(reducido, 0.0), 0.0)
+    num_eq = problema.num_eq
+    return {
+        'status': estado,
+        'x': x,
+        'objective': float(lp.c @ x),
+        'eq_duals': signo * y[:num_eq] if lp.A_eq is not None else None,
+        'ub_duals': -signo * y[num_eq:] if lp.A_ub is not None else None,
+        'upper_duals': signo * upper_duals,
+        'iterations': iteracion,
+        'kkt_error': float(error),
+        'time_limit_reached': por_tiempo,
+        'write_s': 0.0
+    }
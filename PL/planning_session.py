@@ -0,0 +1,169 @@
+"""
+Sesión de planificación: el modelo de producción se construye una sola vez y
+entre intentos solo se actualizan cotas, coeficientes y lados derechos.
+
+Usa la formulación "balance" de lp_model.py, en la que cada parámetro vive en
+un solo lugar del modelo:
+    - productividad máxima: cota superior de P_t
+    - rendimiento x densidad: coeficiente de P_t en Balance_t
+    - stock de seguridad: cota inferior de S_t
+    - stock inicial y demandas: lado derecho de Balance_t
+"""
+
+import time
+
+import pulp as pl
+
+from feasibility import check_feasibility
+from lp_model import build_production_model, model_size
+from solver_config import ESTADOS_CON_SOLUCION, get_config
+from solver_stats import solve_cbc_with_stats, stats_record
+
+
+class PlanningSession:
+    """
+    Modelo de producción mutable y reutilizable entre resoluciones.
+
+    Con warm_start=True cada resolución parte de la solución anterior. A través
+    de los archivos de PuLP, CBC solo acepta soluciones iniciales (no bases), por
+    lo que el arranque en caliente es efectivo cuando el modelo tiene variables
+    enteras y se ignora sin costo en el caso continuo.
+
+    Con stats_sink cada resolución emite un registro de estadísticas; el tiempo de
+    construcción es el del modelo en la primera resolución y el de la actualización después.
+
+    config (SolverConfig) fija hilos, límite de tiempo, brechas, presolve y modo anytime.
+    """
+
+    def __init__(self, initial_stock, demands, yield_percentage, density, max_productivity,
+                 safety_stocks=None, objective="min", final_stock=None, warm_start=True, debug=False,
+                 stats_sink=None, config=None):
+        num_periods = len(demands)
+        if safety_stocks is None:
+            safety_stocks = [0] * num_periods
+
+        self.base = {
+            'initial_stock': initial_stock,
+            'demands': list(demands),
+            'yield_percentage': yield_percentage,
+            'density': density,
+            'max_productivity': max_productivity,
+            'safety_stocks': list(safety_stocks)
+        }
+        self.params = dict(self.base)
+        self.final_stock = final_stock
+        self.warm_start = warm_start
+        self.debug = debug
+        self.solves = 0
+        self.stats_sink = stats_sink
+        self.config = get_config(config)
+        self._solved = False
+
+        inicio = time.perf_counter()
+        self.prob, self.production_vars, self.stock_vars = build_production_model(
+            initial_stock, demands, yield_percentage, density, max_productivity,
+            safety_stocks, objective=objective, formulation="balance", final_stock=final_stock
+        )
+        self._tiempo_construccion = time.perf_counter() - inicio
+
+    def update(self, initial_stock=None, demands=None, yield_percentage=None, density=None,
+               max_productivity=None, safety_stocks=None):
+        """
+        Actualiza en sitio los parámetros indicados; los omitidos conservan su valor actual.
+        """
+        inicio = time.perf_counter()
+        nuevos = dict(self.params)
+        for nombre, valor in (('initial_stock', initial_stock), ('demands', demands),
+                              ('yield_percentage', yield_percentage), ('density', density),
+                              ('max_productivity', max_productivity), ('safety_stocks', safety_stocks)):
+            if valor is not None:
+                nuevos[nombre] = list(valor) if nombre in ('demands', 'safety_stocks') else valor
+
+        num_periods = len(self.production_vars)
+        if len(nuevos['demands']) != num_periods or len(nuevos['safety_stocks']) != num_periods:
+            raise ValueError("No se puede cambiar el número de períodos de una sesión.")
+
+        if num_periods == 0:
+            self.params = nuevos
+            self._tiempo_construccion = time.perf_counter() - inicio
+            return
+
+        if nuevos['max_productivity'] != self.params['max_productivity']:
+            for var in self.production_vars:
+                var.upBound = nuevos['max_productivity']
+
+        factor = nuevos['yield_percentage'] * nuevos['density']
+        if factor != self.params['yield_percentage'] * self.params['density']:
+            for t, var in enumerate(self.production_vars):
+                self.prob.constraints[f"Balance_{t}"].expr[var] = -factor
+
+        for t in range(num_periods):
+            if nuevos['safety_stocks'][t] != self.params['safety_stocks'][t]:
+                self.stock_vars[t].lowBound = nuevos['safety_stocks'][t]
+
+        if self.final_stock is None and nuevos['safety_stocks'][-1] != self.params['safety_stocks'][-1]:
+            self.prob.constraints["Stock_Final_Minimo"].changeRHS(nuevos['safety_stocks'][-1])
+
+        if nuevos['initial_stock'] != self.params['initial_stock'] or nuevos['demands'][0] != self.params['demands'][0]:
+            self.prob.constraints["Balance_0"].changeRHS(nuevos['initial_stock'] - nuevos['demands'][0])
+        for t in range(1, num_periods):
+            if nuevos['demands'][t] != self.params['demands'][t]:
+                self.prob.constraints[f"Balance_{t}"].changeRHS(-nuevos['demands'][t])
+
+        self.params = nuevos
+        self._tiempo_construccion = time.perf_counter() - inicio
+
+    def solve_with(self, attempt=None, **overrides):
+        """
+        Resuelve con los parámetros base modificados solo por overrides
+        (los parámetros de intentos anteriores se restauran).
+        """
+        parametros = dict(self.base)
+        parametros.update(overrides)
+        self.update(**parametros)
+        return self.solve(attempt=attempt)
+
+    def solve(self, attempt=None):
+        """
+        Resuelve el modelo actual y retorna el mismo diccionario que optimize_production.
+        Los parámetros infactibles se descartan con check_feasibility sin invocar a CBC.
+        attempt: número de intento que se anota en el registro de estadísticas.
+        """
+        reporte = check_feasibility(
+            self.params['initial_stock'], self.params['demands'], self.params['yield_percentage'],
+            self.params['density'], self.params['max_productivity'], self.params['safety_stocks'],
+            final_stock=self.final_stock
+        )
+        if not reporte['feasible']:
+            return {'status': 'Infeasible', 'feasibility': reporte}
+
+        warm_start = self.warm_start and self._solved
+        opciones = dict(self.config.cbc_options(), warmStart=warm_start)
+        if self.stats_sink is None:
+            self.prob.solve(pl.PULP_CBC_CMD(msg=self.debug, **opciones))
+        else:
+            estadisticas = solve_cbc_with_stats(self.prob, msg=self.debug, **opciones)
+        status = self.config.cbc_status(self.prob)
+        self.solves += 1
+
+        inicio = time.perf_counter()
+        if status not in ESTADOS_CON_SOLUCION:
+            resultado = {'status': status}
+        else:
+            self._solved = True
+            resultado = {
+                'optimal_value': pl.value(self.prob.objective),
+                'production_levels': [var.value() for var in self.production_vars],
+                'ending_stocks': [var.value() for var in self.stock_vars],
+                'status': status
+            }
+
+        if self.stats_sink is not None:
+            rows, columns, nonzeros = model_size(self.prob)
+            self.stats_sink.emit(stats_record(
+                "PlanningSession.solve", "cbc", len(self.production_vars), rows, columns, nonzeros,
+                self._tiempo_construccion, estadisticas['write_s'], estadisticas['solve_s'],
+                time.perf_counter() - inicio, estadisticas['iterations'], status, attempt=attempt
+            ))
+
+        return resultado
@@ -0,0 +1,183 @@
+"""
+Caché persistente de resultados de optimización direccionada por contenido.
+
+La clave es un SHA-256 de la representación canónica de las entradas numéricas
+(demandas, stocks, rendimiento, densidad, productividad, ...), de la
+configuración del solucionador y de la versión de la formulación, así que
+cambiar el modelo invalida automáticamente las entradas anteriores.
+Los resultados se guardan como JSON en disco, con desalojo LRU por tamaño total.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from backends import SolverBackend
+from solver_config import ESTADO_INCUMBENTE, SolverConfig
+
+# Incrementar cuando cambie la formulación del modelo para invalidar la caché
+FORMULATION_VERSION = 4
+
+
+def _canonico(valor):
+    """
+    Normaliza un valor para que entradas equivalentes produzcan la misma clave
+    (100 y 100.0, listas y arreglos de NumPy, tuplas y listas). Una SolverConfig
+    se representa por sus parámetros y un SolverBackend por su clase y sus
+    atributos (opciones, configuración y, en ScaledBackend, el backend envuelto y
+    las pasadas), así que dos instancias con opciones distintas no comparten clave.
+    """
+    if isinstance(valor, SolverConfig):
+        return _canonico(valor.to_dict())
+    if isinstance(valor, SolverBackend):
+        return _canonico(dict(vars(valor), backend_class=type(valor).__name__))
+    if isinstance(valor, dict):
+        return {str(k): _canonico(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple, np.ndarray)):
+        return [_canonico(v) for v in valor]
+    if isinstance(valor, (bool, np.bool_)) or valor is None or isinstance(valor, str):
+        return valor.item() if isinstance(valor, np.bool_) else valor
+    if isinstance(valor, (int, float, np.integer, np.floating)):
+        return repr(float(valor))
+    raise TypeError(f"Tipo no soportado en la clave de caché: {type(valor).__name__}")
+
+
+def _serializable(valor):
+    if isinstance(valor, dict):
+        return {k: _serializable(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_serializable(v) for v in valor]
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    if isinstance(valor, np.generic):
+        return valor.item()
+    return valor
+
+
+class ResultCache:
+    """
+    Almacén en disco de resultados, un archivo JSON por clave.
+
+    max_bytes: tamaño total máximo; al excederlo se eliminan las entradas usadas
+    hace más tiempo (la fecha de modificación del archivo se actualiza en cada acierto).
+    """
+
+    def __init__(self, directory=".cache_optimizacion", max_bytes=64 * 1024 * 1024, version=FORMULATION_VERSION):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._total_bytes = sum(os.path.getsize(ruta) for ruta in self._entradas())
+
+    def key(self, namespace, *args, **kwargs):
+        """
+        Calcula la clave de un llamado: espacio de nombres, argumentos y versión.
+        """
+        contenido = {
+            'namespace': namespace,
+            'version': self.version,
+            'args': _canonico(args),
+            'kwargs': _canonico(kwargs)
+        }
+        texto = json.dumps(contenido, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+    def _ruta(self, clave):
+        return os.path.join(self.directory, clave[:2], f"{clave}.json")
+
+    def _entradas(self):
+        for raiz, _, archivos in os.walk(self.directory):
+            for archivo in archivos:
+                if archivo.endswith('.json'):
+                    yield os.path.join(raiz, archivo)
+
+    def get(self, clave):
+        """
+        Retorna el resultado guardado o None si no existe.
+        """
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, encoding='utf-8') as f:
+                resultado = json.load(f)
+            os.utime(ruta)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return resultado
+
+    def put(self, clave, resultado):
+        """
+        Guarda un resultado (escritura atómica) y aplica el desalojo LRU.
+        """
+        ruta = self._ruta(clave)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+
+        anterior = os.path.getsize(ruta) if os.path.exists(ruta) else 0
+        descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix='.tmp')
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+            json.dump(_serializable(resultado), f)
+        os.replace(temporal, ruta)
+
+        self._total_bytes += os.path.getsize(ruta) - anterior
+        if self._total_bytes > self.max_bytes:
+            self._desalojar()
+
+    def _desalojar(self):
+        entradas = sorted(self._entradas(), key=os.path.getmtime)
+        for ruta in entradas:
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                tamano = os.path.getsize(ruta)
+                os.remove(ruta)
+            except OSError:
+                continue
+            self._total_bytes -= tamano
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Elimina todas las entradas.
+        """
+        for ruta in list(self._entradas()):
+            os.remove(ruta)
+        self._total_bytes = 0
+
+    def stats(self):
+        """
+        Retorna los contadores de aciertos, fallos y desalojos.
+        """
+        consultas = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / consultas if consultas else 0.0,
+            'bytes': self._total_bytes
+        }
+
+
+def cached_call(cache, namespace, funcion, *args, **kwargs):
+    """
+    Ejecuta funcion(*args, **kwargs) a través de la caché (si cache no es None).
+    """
+    if cache is None:
+        return funcion(*args, **kwargs)
+
+    clave = cache.key(namespace, *args, **kwargs)
+    resultado = cache.get(clave)
+    if resultado is None:
+        resultado = funcion(*args, **kwargs)
+        # Una solución interrumpida por el límite de tiempo no se guarda como definitiva
+        if not (isinstance(resultado, dict) and resultado.get('status') == ESTADO_INCUMBENTE):
+            cache.put(clave, resultado)
+    return resultado
@@ -0,0 +1,123 @@
+"""
+Planificación con horizonte rodante para horizontes largos.
+
+Se resuelven ventanas solapadas de `window` períodos; de cada ventana se
+fijan solo los primeros `commit` períodos y su stock final pasa a ser el
+stock inicial de la siguiente. El solapamiento (window - commit) da a cada
+ventana visibilidad de la demanda que viene, y el stock de cada período se
+acota por abajo con el mínimo que exige el resto del horizonte (ver
+feasibility.minimum_carry_stocks), así que un cuello de botella de capacidad
+posterior a la ventana no la deja sin stock para cubrirlo. El tamaño del modelo queda
+acotado por la ventana y el tiempo total crece casi linealmente con el horizonte.
+"""
+
+from feasibility import minimum_carry_stocks
+from solver_config import ESTADO_INCUMBENTE, ESTADOS_CON_SOLUCION
+
+
+def plan_rolling_horizon(
+        initial_stock,
+        demands,
+        yield_percentage,
+        density,
+        max_productivity,
+        safety_stocks=None,
+        window=52,
+        commit=None,
+        overlap=None,
+        objective="min",
+        final_stock=None,
+        optimizer=None,
+        debug=False,
+        **optimizer_kwargs
+):
+    """
+    Planifica todo el horizonte por ventanas y retorna el mismo diccionario que
+    optimize_production, más 'windows' (número de ventanas resueltas).
+
+    window: períodos de cada ventana.
+    commit: períodos que se fijan de cada ventana (avance entre ventanas).
+    overlap: alternativa a commit; si se indica, commit = window - overlap.
+    Si no se indica ninguno de los dos, se fija la mitad de cada ventana.
+    final_stock: stock final exacto del horizonte completo; solo se aplica a la última ventana.
+    optimizer: función con la firma de optimize_production (por defecto la de PL6).
+    optimizer_kwargs: argumentos adicionales para optimizer (engine, formulation, ...).
+
+    Si una ventana es infactible se retorna su estado junto con 'failed_window'
+    y el plan fijado hasta ese momento. Si alguna ventana retorna una solución
+    interrumpida por el límite de tiempo ('Incumbent'), el plan completo tiene ese estado.
+    """
+    if optimizer is None:
+        from PL6 import optimize_production as optimizer
+
+    num_periods = len(demands)
+    if safety_stocks is None:
+        safety_stocks = [0] * num_periods
+    elif len(safety_stocks) != num_periods:
+        raise ValueError("La longitud de stocks_seguridad debe ser igual al número de períodos.")
+
+    if overlap is not None:
+        if commit is not None and commit != window - overlap:
+            raise ValueError("commit y overlap son incompatibles: commit debe ser window - overlap.")
+        commit = window - overlap
+    elif commit is None:
+        commit = max(1, window // 2)
+
+    if window < 1 or commit < 1 or commit > window:
+        raise ValueError("Se requiere 1 <= commit <= window.")
+
+    # Stock de seguridad de cada período elevado al mínimo que necesita el resto del horizonte
+    pisos = minimum_carry_stocks(demands, yield_percentage, density, max_productivity, safety_stocks,
+                                 final_stock=final_stock)
+
+    production_levels = []
+    ending_stocks = []
+    stock = initial_stock
+    inicio = 0
+    ventanas = 0
+    estado = 'Optimal'
+
+    while inicio < num_periods:
+        fin = min(inicio + window, num_periods)
+        # La última ventana fija todo lo que queda
+        fijar = fin - inicio if fin == num_periods else commit
+
+        if debug:
+            print(f"Ventana {ventanas + 1}: períodos {inicio + 1}-{fin} (se fijan {fijar}), stock inicial {stock:.2f}")
+
+        resultado = optimizer(
+            stock,
+            demands[inicio:fin],
+            yield_percentage,
+            density,
+            max_productivity,
+            pisos[inicio:fin],
+            objective=objective,
+            final_stock=final_stock if fin == num_periods else None,
+            **optimizer_kwargs
+        )
+        ventanas += 1
+        if resultado['status'] == ESTADO_INCUMBENTE:
+            estado = ESTADO_INCUMBENTE
+
+        if resultado['status'] not in ESTADOS_CON_SOLUCION:
+            return {
+                'status': resultado['status'],
+                'failed_window': ventanas,
+                'production_levels': production_levels,
+                'ending_stocks': ending_stocks,
+                'windows': ventanas
+            }
+
+        production_levels.extend(resultado['production_levels'][:fijar])
+        ending_stocks.extend(resultado['ending_stocks'][:fijar])
+        stock = ending_stocks[-1]
+        inicio += fijar
+
+    return {
+        'optimal_value': sum(production_levels),
+        'production_levels': production_levels,
+        'ending_stocks': ending_stocks,
+        'status': estado,
+        'windows': ventanas
+    }
@@ -0,0 +1,135 @@
+"""
+Escalado numérico de los programas lineales (LinearProgram) antes de resolver.
+
+Las demandas de Supply_Demand.csv son del orden de 1e9-1e10 mientras que los
+coeficientes de la matriz (rendimiento, densidad) son cercanos a 1 y las
+penalizaciones del modelo elástico van de 1 a 1e5. Con esas magnitudes las
+tolerancias absolutas del solucionador (~1e-7 a 1e-9) pierden sentido: se
+gastan iteraciones de más y aparecen infactibilidades falsas.
+
+El escalado tiene tres partes, todas en potencias de 2 (exactas en punto flotante):
+    - equilibrado geométrico de filas y columnas de la matriz (R A D)
+    - una unidad común para lados derechos y cotas (unidades de demanda,
+      stock y producción), de modo que queden cerca de 1
+    - una unidad para el objetivo (media geométrica de sus coeficientes)
+
+Con x = unidad * D x', el modelo escalado es
+
+    c' = D c / unidad_objetivo,   A' = R A D,   b' = R b / unidad,   cotas' = cotas / (unidad * D)
+
+y la solución se desescala con x = unidad * D x', duales de filas = unidad_objetivo * R y'
+y duales de cotas = unidad_objetivo * z' / D.
+"""
+
+import numpy as np
+from scipy import sparse
+
+from lp_model import LinearProgram
+
+# Pasadas del equilibrado geométrico de filas y columnas
+PASADAS_ESCALADO = 4
+
+
+def _potencia_de_2(valores):
+    return np.exp2(np.round(np.log2(valores)))
+
+
+def _media_geometrica_extremos(indptr, datos):
+    """
+    Para cada fila de una matriz comprimida (indptr, valores absolutos) retorna
+    sqrt(máximo * mínimo) de sus no ceros (1 en las filas vacías).
+    """
+    resultado = np.ones(len(indptr) - 1)
+    no_vacias = np.flatnonzero(np.diff(indptr))
+    if len(no_vacias):
+        inicios = indptr[no_vacias]
+        resultado[no_vacias] = np.sqrt(np.maximum.reduceat(datos, inicios) * np.minimum.reduceat(datos, inicios))
+    return resultado
+
+
+def _unidad(valores):
+    valores = np.abs(np.asarray(valores, dtype=float))
+    valores = valores[np.isfinite(valores) & (valores > 0)]
+    if len(valores) == 0:
+        return 1.0
+    return float(_potencia_de_2(np.sqrt(valores.max() * valores.min())))
+
+
+def compute_scaling(lp, passes=PASADAS_ESCALADO):
+    """
+    Calcula los factores de escala de un LinearProgram. Retorna un diccionario con
+    'rows_ub', 'rows_eq' (R), 'columns' (D), 'rhs' (unidad de lados derechos y cotas)
+    y 'objective' (unidad del objetivo).
+    """
+    matrices = [A for A in (lp.A_ub, lp.A_eq) if A is not None]
+    num_ub = 0 if lp.A_ub is None else lp.A_ub.shape[0]
+    filas = np.ones(lp.num_rows)
+    columnas = np.ones(lp.num_columns)
+
+    if matrices:
+        # Misma matriz en CSR y CSC; en cada pasada solo cambian los factores
+        por_filas = abs(sparse.vstack(matrices, format='csr'))
+        por_filas.eliminate_zeros()
+        filas_nnz = np.repeat(np.arange(por_filas.shape[0]), np.diff(por_filas.indptr))
+        por_columnas = por_filas.tocsc()
+        filas_csc = por_columnas.indices
+        columnas_csc = np.repeat(np.arange(por_columnas.shape[1]), np.diff(por_columnas.indptr))
+        for _ in range(passes):
+            datos = por_filas.data * filas[filas_nnz] * columnas[por_filas.indices]
+            filas = filas / _potencia_de_2(_media_geometrica_extremos(por_filas.indptr, datos))
+            datos = por_columnas.data * filas[filas_csc] * columnas[columnas_csc]
+            columnas = columnas / _potencia_de_2(_media_geometrica_extremos(por_columnas.indptr, datos))
+
+    lados = [b * filas[:num_ub] for b in (lp.b_ub,) if b is not None]
+    lados += [b * filas[num_ub:] for b in (lp.b_eq,) if b is not None]
+    rhs = _unidad(np.concatenate(lados + [lp.lower / columnas, lp.upper / columnas]))
+
+    return {
+        'rows_ub': filas[:num_ub],
+        'rows_eq': filas[num_ub:],
+        'columns': columnas,
+        'rhs': rhs,
+        'objective': _unidad(lp.c * columnas)
+    }
+
+
+def scale_program(lp, escalas):
+    """
+    Retorna el LinearProgram escalado con los factores de compute_scaling.
+    """
+    columnas = escalas['columns']
+    unidad = escalas['rhs']
+    D = sparse.diags(columnas)
+
+    def escalar(A, b, filas):
+        if A is None:
+            return None, None
+        return sparse.diags(filas) @ A @ D, filas * b / unidad
+
+    A_ub, b_ub = escalar(lp.A_ub, lp.b_ub, escalas['rows_ub'])
+    A_eq, b_eq = escalar(lp.A_eq, lp.b_eq, escalas['rows_eq'])
+
+    return LinearProgram(
+        columnas * lp.c / escalas['objective'], A_ub, b_ub, A_eq, b_eq,
+        lp.lower / (unidad * columnas), lp.upper / (unidad * columnas),
+        sense=lp.sense, integrality=lp.integrality
+    )
+
+
+def unscale_solution(solucion, escalas):
+    """
+    Lleva la solución de un backend para el modelo escalado a las unidades originales.
+    """
+    if solucion.get('x') is None:
+        return solucion
+
+    resultado = dict(solucion)
+    unidad_objetivo = escalas['objective']
+    resultado['x'] = escalas['rhs'] * escalas['columns'] * solucion['x']
+    resultado['objective'] = escalas['rhs'] * unidad_objetivo * solucion['objective']
+    for clave, filas in (('ub_duals', escalas['rows_ub']), ('eq_duals', escalas['rows_eq'])):
+        if solucion.get(clave) is not None:
+            resultado[clave] = unidad_objetivo * filas * solucion[clave]
+    if solucion.get('upper_duals') is not None:
+        resultado['upper_duals'] = unidad_objetivo * solucion['upper_duals'] / escalas['columns']
+    return resultado
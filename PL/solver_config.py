@@ -0,0 +1,117 @@
+"""
+Configuración común de los solucionadores (CBC vía PuLP y HiGHS vía SciPy).
+
+SolverConfig reúne hilos, límite de tiempo, brechas relativa/absoluta, presolve
+y el modo "anytime". En modo anytime, si el límite de tiempo se alcanza con una
+solución factible pero no demostrada óptima, esa solución se retorna con estado
+ESTADO_INCUMBENTE ('Incumbent'); sin el modo, el mismo caso se reporta como
+'Not Solved'. Esto importa sobre todo para los modelos con variables enteras.
+
+Soporte por solucionador:
+    - CBC: todas las opciones (-threads, -sec, -ratioGap, -allowableGap, -presolve).
+    - HiGHS a través de scipy.optimize.linprog: límite de tiempo, presolve y
+      brecha relativa (mip_rel_gap); linprog no expone hilos ni brecha absoluta,
+      así que esas opciones se ignoran.
+    - PDHG (pdhg.py): límite de tiempo y modo anytime; la tolerancia se fija en el backend.
+
+En HiGHS y PDHG solo se retorna como ESTADO_INCUMBENTE un punto que cumple las
+restricciones (LinearProgram.primal_residual dentro de la tolerancia).
+"""
+
+import pulp as pl
+
+ESTADO_INCUMBENTE = "Incumbent"
+
+# Estados cuyo resultado trae un plan utilizable
+ESTADOS_CON_SOLUCION = ("Optimal", ESTADO_INCUMBENTE)
+
+
+class SolverConfig:
+    """
+    Parámetros del solucionador compartidos por todos los planificadores.
+
+    threads: hilos de CBC (None = valor por defecto del solucionador).
+    time_limit: segundos por resolución (None = sin límite).
+    rel_gap, abs_gap: brechas de optimalidad con que se detiene la búsqueda entera.
+    presolve: activar (True) o desactivar (False) el presolve; None = por defecto.
+    anytime: retornar la mejor solución encontrada al vencer time_limit.
+    """
+
+    def __init__(self, threads=None, time_limit=None, rel_gap=None, abs_gap=None, presolve=None, anytime=False):
+        self.threads = threads
+        self.time_limit = time_limit
+        self.rel_gap = rel_gap
+        self.abs_gap = abs_gap
+        self.presolve = presolve
+        self.anytime = anytime
+
+    def __repr__(self):
+        return (f"SolverConfig(threads={self.threads}, time_limit={self.time_limit}, rel_gap={self.rel_gap}, "
+                f"abs_gap={self.abs_gap}, presolve={self.presolve}, anytime={self.anytime})")
+
+    def to_dict(self):
+        """
+        Parámetros como diccionario (por ejemplo, para las claves de la caché de resultados).
+        """
+        return {
+            'threads': self.threads,
+            'time_limit': self.time_limit,
+            'rel_gap': self.rel_gap,
+            'abs_gap': self.abs_gap,
+            'presolve': self.presolve,
+            'anytime': self.anytime
+        }
+
+    def cbc_options(self):
+        """
+        Argumentos de PULP_CBC_CMD correspondientes a la configuración.
+        """
+        opciones = {
+            'threads': self.threads,
+            'timeLimit': self.time_limit,
+            'gapRel': self.rel_gap,
+            'gapAbs': self.abs_gap,
+            'presolve': self.presolve
+        }
+        return {clave: valor for clave, valor in opciones.items() if valor is not None}
+
+    def highs_options(self):
+        """
+        Opciones de scipy.optimize.linprog(method='highs') correspondientes a la configuración.
+        """
+        opciones = {
+            'time_limit': self.time_limit,
+            'presolve': self.presolve,
+            'mip_rel_gap': self.rel_gap
+        }
+        return {clave: valor for clave, valor in opciones.items() if valor is not None}
+
+    def cbc_status(self, prob):
+        """
+        Estado de un modelo de PuLP resuelto con CBC. Cuando CBC se detiene por un
+        límite (tiempo, que en CBC es de CPU, o nodos) con una solución entera, PuLP
+        lo marca como 'Optimal' con sol_status = LpSolutionIntegerFeasible; al
+        detenerse por brecha el sol_status es LpSolutionOptimal.
+        """
+        status = pl.LpStatus[prob.status]
+        if status == 'Optimal' and prob.sol_status == pl.LpSolutionIntegerFeasible:
+            return ESTADO_INCUMBENTE if self.anytime else 'Not Solved'
+        return status
+
+    def highs_status(self, status, factible):
+        """
+        Estado de HiGHS (o PDHG) para una resolución detenida por límite (status
+        'Not Solved'). factible: el punto retornado cumple las restricciones; un
+        iterado simplex, de punto interior o de PDHG sin terminar en general no
+        las cumple y no es una solución utilizable.
+        """
+        if status == 'Not Solved' and factible:
+            return ESTADO_INCUMBENTE if self.anytime else status
+        return status
+
+
+def get_config(config):
+    """
+    Retorna la configuración indicada o una por defecto si config es None.
+    """
+    return SolverConfig() if config is None else config
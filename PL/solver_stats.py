@@ -0,0 +1,157 @@
+"""
+Estadísticas de cada programa lineal resuelto.
+
+Cada resolución produce un registro con el tamaño del modelo (filas, columnas,
+no ceros), los tiempos de construcción, escritura del archivo MPS, resolución y
+extracción de la solución, las iteraciones del solucionador, el estado y el
+intento de la escalera de alternativas que lo produjo. Así se distingue si una
+ejecución lenta viene de PuLP, del disco o del solucionador.
+
+Los registros se entregan a un destino intercambiable:
+    - MemorySink: lista en memoria
+    - JsonLinesSink: un objeto JSON por línea
+    - SQLiteSink: tabla en un archivo SQLite local
+"""
+
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+import pulp as pl
+
+CAMPOS = (
+    'timestamp', 'source', 'engine', 'num_periods', 'rows', 'columns', 'nonzeros',
+    'build_s', 'write_s', 'solve_s', 'extract_s', 'iterations', 'status', 'attempt', 'configuration'
+)
+
+# Última línea de resumen de CBC, p. ej. "Optimal objective 2387.5 - 30 iterations time 0.002"
+_ITERACIONES_CBC = re.compile(r"(\d+) iterations")
+
+
+class StatsSink:
+    """
+    Destino de registros: emit(registro) recibe un diccionario con los campos de CAMPOS.
+    """
+
+    def emit(self, registro):
+        raise NotImplementedError
+
+
+class MemorySink(StatsSink):
+    def __init__(self):
+        self.records = []
+
+    def emit(self, registro):
+        self.records.append(registro)
+
+
+class JsonLinesSink(StatsSink):
+    def __init__(self, path):
+        self.path = path
+
+    def emit(self, registro):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(registro, default=str) + '\n')
+
+
+class SQLiteSink(StatsSink):
+    """
+    Agrega cada registro como una fila; 'configuration' se guarda como JSON.
+    """
+
+    def __init__(self, path, table="solver_stats"):
+        if not re.fullmatch(r"\w+", table):
+            raise ValueError("Nombre de tabla inválido.")
+        self.path = path
+        self.table = table
+        with sqlite3.connect(path) as conexion:
+            conexion.execute(f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(CAMPOS)})")
+
+    def emit(self, registro):
+        valores = [registro.get(campo) for campo in CAMPOS]
+        valores[CAMPOS.index('configuration')] = json.dumps(registro.get('configuration'))
+        with sqlite3.connect(self.path) as conexion:
+            conexion.execute(
+                f"INSERT INTO {self.table} ({', '.join(CAMPOS)}) VALUES ({', '.join('?' * len(CAMPOS))})",
+                valores
+            )
+
+
+def stats_record(source, engine, num_periods, rows, columns, nonzeros, build_s, write_s, solve_s,
+                 extract_s, iterations, status, attempt=None, configuration=None):
+    """
+    Arma un registro con todos los campos de CAMPOS.
+    """
+    return {
+        'timestamp': datetime.now().isoformat(timespec='milliseconds'),
+        'source': source,
+        'engine': engine,
+        'num_periods': num_periods,
+        'rows': rows,
+        'columns': columns,
+        'nonzeros': nonzeros,
+        'build_s': build_s,
+        'write_s': write_s,
+        'solve_s': solve_s,
+        'extract_s': extract_s,
+        'iterations': iterations,
+        'status': status,
+        'attempt': attempt,
+        'configuration': configuration
+    }
+
+
+def solve_cbc_with_stats(prob, msg=False, **opciones):
+    """
+    Resuelve prob con PULP_CBC_CMD separando el tiempo de escritura del archivo MPS
+    del tiempo del solucionador, y lee las iteraciones del registro de CBC.
+
+    Retorna {'write_s', 'solve_s', 'iterations'}.
+    """
+    tiempos = {'write_s': 0.0}
+    escribir_mps = prob.writeMPS
+
+    def escribir_cronometrado(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return escribir_mps(*args, **kwargs)
+        finally:
+            tiempos['write_s'] += time.perf_counter() - inicio
+
+    descriptor, ruta_log = tempfile.mkstemp(suffix='.log')
+    os.close(descriptor)
+    prob.writeMPS = escribir_cronometrado
+    try:
+        inicio = time.perf_counter()
+        prob.solve(pl.PULP_CBC_CMD(msg=False, logPath=ruta_log, **opciones))
+        total = time.perf_counter() - inicio
+
+        with open(ruta_log, encoding='utf-8', errors='replace') as f:
+            registro_cbc = f.read()
+    finally:
+        del prob.writeMPS
+        os.remove(ruta_log)
+
+    if msg:
+        print(registro_cbc)
+
+    iteraciones = _ITERACIONES_CBC.findall(registro_cbc)
+    return {
+        'write_s': tiempos['write_s'],
+        'solve_s': total - tiempos['write_s'],
+        'iterations': int(iteraciones[-1]) if iteraciones else None
+    }
+
+
+def summarize(registros):
+    """
+    Totales por etapa de una lista de registros (p. ej. MemorySink.records).
+    """
+    resumen = {'solves': len(registros)}
+    for campo in ('build_s', 'write_s', 'solve_s', 'extract_s'):
+        resumen[campo] = sum(r[campo] or 0.0 for r in registros)
+    return resumen
@@ -0,0 +1,120 @@
+"""
+Resolución de muchos planes independientes en una sola llamada al solucionador.
+
+Cada plan es el modelo de optimize_production de un producto o escenario. Los
+modelos se arman como matrices (build_production_lp) y se apilan en un único
+programa lineal diagonal por bloques; como los bloques no comparten variables
+ni restricciones, el óptimo conjunto es el óptimo de cada bloque por separado.
+Así el costo fijo por resolución (construcción, archivos, proceso de CBC) se
+paga una sola vez.
+
+Los planes infactibles se identifican antes de apilar con check_feasibility
+(exacto y O(T) por plan), de modo que un bloque infactible no invalida a los demás.
+"""
+
+import time
+
+import numpy as np
+from scipy import sparse
+
+from backends import get_backend
+from feasibility import check_feasibility
+from lp_model import LinearProgram, build_production_lp, production_result
+from solver_config import ESTADOS_CON_SOLUCION
+from solver_stats import stats_record
+
+
+def _parametros(plan):
+    return (plan['initial_stock'], plan['demands'], plan['yield_percentage'], plan['density'],
+            plan['max_productivity'], plan.get('safety_stocks'))
+
+
+def stack_programs(programas):
+    """
+    Apila programas lineales (todos con el mismo sentido) en uno diagonal por bloques.
+    Retorna (programa, desplazamientos de columnas).
+    """
+    desplazamientos = np.concatenate([[0], np.cumsum([lp.num_columns for lp in programas])]).astype(int)
+
+    def apilar(matrices, vectores):
+        if all(A is None for A in matrices):
+            return None, None
+        bloques = [A if A is not None else sparse.csr_matrix((0, lp.num_columns))
+                   for A, lp in zip(matrices, programas)]
+        lados = [b if b is not None else np.zeros(0) for b in vectores]
+        return sparse.block_diag(bloques, format='csr'), np.concatenate(lados)
+
+    A_ub, b_ub = apilar([lp.A_ub for lp in programas], [lp.b_ub for lp in programas])
+    A_eq, b_eq = apilar([lp.A_eq for lp in programas], [lp.b_eq for lp in programas])
+
+    programa = LinearProgram(
+        np.concatenate([lp.c for lp in programas]),
+        A_ub, b_ub, A_eq, b_eq,
+        np.concatenate([lp.lower for lp in programas]),
+        np.concatenate([lp.upper for lp in programas]),
+        sense=programas[0].sense
+    )
+    return programa, desplazamientos
+
+
+def optimize_production_stacked(plans, objective="min", backend="highs", config=None, scaling=True,
+                                stats_sink=None):
+    """
+    Resuelve una lista de planes independientes con una sola llamada al backend.
+
+    Cada plan es un diccionario con 'initial_stock', 'demands', 'yield_percentage',
+    'density', 'max_productivity' y, opcionalmente, 'safety_stocks' y 'final_stock'
+    (los horizontes pueden diferir entre planes).
+
+    Retorna una lista con el diccionario de optimize_production de cada plan, en
+    el mismo orden; los infactibles traen 'status': 'Infeasible' y su diagnóstico
+    en 'feasibility'. config (SolverConfig) se aplica a la resolución conjunta y con
+    scaling=True el programa apilado se resuelve escalado (ScaledBackend).
+    stats_sink: StatsSink opcional; recibe un registro de la resolución conjunta.
+    """
+    inicio = time.perf_counter()
+    resultados = [None] * len(plans)
+    factibles = []
+    programas = []
+
+    for i, plan in enumerate(plans):
+        reporte = check_feasibility(*_parametros(plan), final_stock=plan.get('final_stock'))
+        if not reporte['feasible']:
+            resultados[i] = {'status': 'Infeasible', 'feasibility': reporte}
+            continue
+
+        stock_inicial, demandas, rendimiento, densidad, capacidad, seguridad = _parametros(plan)
+        programas.append(build_production_lp(stock_inicial, demandas, rendimiento * densidad, capacidad,
+                                             seguridad, objective=objective, final_stock=plan.get('final_stock')))
+        factibles.append(i)
+
+    if not programas:
+        return resultados
+
+    solver = get_backend(backend, scaling=scaling, config=config)
+    programa, desplazamientos = stack_programs(programas)
+    tiempo_construccion = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    solucion = solver.solve(programa)
+    tiempo_resolucion = time.perf_counter() - inicio
+
+    if stats_sink is not None:
+        stats_sink.emit(stats_record(
+            "stacked_solver.optimize_production_stacked", solver.name,
+            max(len(plans[i]['demands']) for i in factibles), programa.num_rows, programa.num_columns,
+            programa.nonzeros, tiempo_construccion, solucion.get('write_s', 0.0), tiempo_resolucion - solucion.get('write_s', 0.0), 0.0,
+            solucion.get('iterations'), solucion['status']
+        ))
+
+    if solucion['status'] not in ESTADOS_CON_SOLUCION:
+        # Caso límite numérico: resolver cada bloque por separado para aislar el que falla
+        for i, lp in zip(factibles, programas):
+            resultados[i] = production_result(solver.solve(lp), len(plans[i]['demands']))
+        return resultados
+
+    for k, i in enumerate(factibles):
+        bloque = {'status': solucion['status'], 'x': solucion['x'][desplazamientos[k]:desplazamientos[k + 1]]}
+        resultados[i] = production_result(bloque, len(plans[i]['demands']))
+
+    return resultados
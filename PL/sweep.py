@@ -0,0 +1,228 @@
+"""
+Barrido paramétrico de productividad máxima, rendimiento y densidad.
+
+Rendimiento y densidad solo entran al modelo como el factor rendimiento x densidad,
+así que los puntos con el mismo factor comparten modelo. Para cada factor:
+
+    - El modelo se construye una sola vez (build_production_lp) y entre puntos
+      solo cambia la cota superior de la producción.
+    - La verificación de factibilidad da la productividad mínima factible, así
+      que los puntos por debajo se descartan sin resolver.
+    - El valor óptimo es lineal por tramos en la productividad máxima (convexo al
+      minimizar, cóncavo al maximizar). Se resuelven los extremos del rango y, si la
+      cuerda coincide con la recta que da el dual de la capacidad en un extremo, el
+      valor es lineal en todo el intervalo: los puntos interiores se responden sin
+      resolver y su plan es la combinación convexa de los planes de los extremos.
+      Si no coinciden, se resuelve el punto medio y se repite en cada mitad.
+
+Una curva de capacidad de 1000 puntos se responde con unas pocas resoluciones
+por factor en lugar de 1000 llamadas a CBC.
+"""
+
+from itertools import product
+
+import numpy as np
+
+from backends import get_backend
+from feasibility import check_feasibility
+from greedy import TOLERANCIA
+from lp_model import build_production_lp
+
+
+def _resolver(backend, lp, num_periods, capacidad):
+    lp.upper[:num_periods] = capacidad
+    solucion = backend.solve(lp)
+    if solucion['status'] != 'Optimal':
+        return None
+
+    duales = solucion.get('upper_duals')
+    return {
+        'x': solucion['x'][:2 * num_periods],
+        'optimal_value': float(solucion['x'][:num_periods].sum()),
+        # Derivada del objetivo respecto a la capacidad (común a todos los períodos)
+        'capacity_dual': None if duales is None else float(np.sum(duales[:num_periods]))
+    }
+
+
+def _es_lineal(a, b, capacidad_a, capacidad_b, tolerancia):
+    """
+    Certificado de linealidad: para una función convexa (o cóncava) la cuerda
+    entre a y b coincide con la recta tangente en a solo si la función es lineal en [a, b].
+    """
+    if a['capacity_dual'] is None:
+        return False
+    estimado = a['optimal_value'] + a['capacity_dual'] * (capacidad_b - capacidad_a)
+    return abs(estimado - b['optimal_value']) <= tolerancia * max(1.0, abs(b['optimal_value']))
+
+
+def _barrer_factor(backend, lp, num_periods, capacidades, tolerancia):
+    """
+    Resuelve las capacidades ordenadas (todas factibles) y retorna, por capacidad,
+    (solución, origen) con origen 'solve' o 'ranging'; también el número de resoluciones.
+    """
+    soluciones = {}
+    resoluciones = 0
+
+    def resolver(i):
+        nonlocal resoluciones
+        if i not in soluciones:
+            soluciones[i] = (_resolver(backend, lp, num_periods, capacidades[i]), 'solve')
+            resoluciones += 1
+        return soluciones[i][0]
+
+    pendientes = [(0, len(capacidades) - 1)]
+    while pendientes:
+        i, j = pendientes.pop()
+        a, b = resolver(i), resolver(j)
+        if j - i <= 1:
+            continue
+        if a is None or b is None:
+            # No debería ocurrir sobre capacidades factibles; se resuelve cada punto
+            for k in range(i + 1, j):
+                resolver(k)
+            continue
+
+        if _es_lineal(a, b, capacidades[i], capacidades[j], tolerancia):
+            ancho = capacidades[j] - capacidades[i]
+            for k in range(i + 1, j):
+                peso = (capacidades[k] - capacidades[i]) / ancho if ancho > 0 else 0.0
+                soluciones[k] = ({
+                    'x': (1 - peso) * a['x'] + peso * b['x'],
+                    'optimal_value': (1 - peso) * a['optimal_value'] + peso * b['optimal_value'],
+                    'capacity_dual': a['capacity_dual']
+                }, 'ranging')
+        else:
+            medio = (i + j) // 2
+            pendientes.append((i, medio))
+            pendientes.append((medio, j))
+
+    return soluciones, resoluciones
+
+
+def sweep_parameters(
+        initial_stock,
+        demands,
+        max_productivities,
+        yield_percentages=(0.8,),
+        densities=(0.9,),
+        safety_stocks=None,
+        objective="min",
+        final_stock=None,
+        backend="highs",
+        return_plans=True,
+        tolerance=1e-7
+):
+    """
+    Evalúa todos los puntos de la grilla productividad x rendimiento x densidad.
+
+    Retorna un diccionario con:
+        - 'points': una fila por punto (en el orden de la grilla: rendimiento,
+          densidad, productividad) con 'yield_percentage', 'density',
+          'max_productivity', 'status', 'optimal_value', 'capacity_dual'
+          (variación del valor óptimo por unidad de capacidad), 'source'
+          ('solve', 'ranging' o 'feasibility') y, con return_plans=True,
+          'production_levels' y 'ending_stocks'.
+        - 'ranges': tramos lineales por factor, cada uno con 'factor', 'from',
+          'to', 'optimal_value_from' y 'capacity_dual'.
+        - 'solves': número de llamadas al solucionador.
+    """
+    num_periods = len(demands)
+    if safety_stocks is None:
+        safety_stocks = [0] * num_periods
+    elif len(safety_stocks) != num_periods:
+        raise ValueError("La longitud de stocks_seguridad debe ser igual al número de períodos.")
+
+    solver = get_backend(backend)
+    capacidades_grilla = sorted(set(float(m) for m in max_productivities))
+    puntos_factor = {}
+    for rendimiento, densidad in product(yield_percentages, densities):
+        puntos_factor.setdefault(rendimiento * densidad, []).append((rendimiento, densidad))
+
+    por_factor = {}
+    rangos = []
+    resoluciones = 0
+
+    for factor, combinaciones in puntos_factor.items():
+        rendimiento, densidad = combinaciones[0]
+        reporte = check_feasibility(initial_stock, demands, rendimiento, densidad, capacidades_grilla[-1],
+                                    safety_stocks, final_stock=final_stock)
+        minima = reporte['min_max_productivity']
+        if minima is None:
+            factibles = []
+        else:
+            umbral = minima - TOLERANCIA * max(1.0, minima)
+            factibles = [m for m in capacidades_grilla if m >= umbral]
+
+        soluciones = {}
+        if factibles:
+            lp = build_production_lp(initial_stock, demands, factor, factibles[-1], safety_stocks,
+                                     objective=objective, final_stock=final_stock)
+            soluciones, usadas = _barrer_factor(solver, lp, num_periods, factibles, tolerance)
+            resoluciones += usadas
+
+            # Tramos lineales entre puntos resueltos consecutivos
+            resueltos = sorted(i for i, (_, origen) in soluciones.items() if origen == 'solve')
+            for i, j in zip(resueltos, resueltos[1:]):
+                inicial = soluciones[i][0]
+                if inicial is not None and soluciones[j][0] is not None and _es_lineal(
+                        inicial, soluciones[j][0], factibles[i], factibles[j], tolerance):
+                    rangos.append({
+                        'factor': factor,
+                        'from': factibles[i],
+                        'to': factibles[j],
+                        'optimal_value_from': inicial['optimal_value'],
+                        'capacity_dual': inicial['capacity_dual']
+                    })
+
+        por_factor[factor] = (factibles, soluciones)
+
+    puntos = []
+    for rendimiento, densidad in product(yield_percentages, densities):
+        factibles, soluciones = por_factor[rendimiento * densidad]
+        indice = {m: i for i, m in enumerate(factibles)}
+        for capacidad in max_productivities:
+            fila = {
+                'yield_percentage': rendimiento,
+                'density': densidad,
+                'max_productivity': capacidad
+            }
+            i = indice.get(float(capacidad))
+            solucion, origen = soluciones.get(i, (None, 'solve')) if i is not None else (None, 'feasibility')
+            if solucion is None:
+                fila.update({'status': 'Infeasible', 'optimal_value': None, 'capacity_dual': None, 'source': origen})
+            else:
+                fila.update({
+                    'status': 'Optimal',
+                    'optimal_value': solucion['optimal_value'],
+                    'capacity_dual': solucion['capacity_dual'],
+                    'source': origen
+                })
+                if return_plans:
+                    fila['production_levels'] = solucion['x'][:num_periods].tolist()
+                    fila['ending_stocks'] = solucion['x'][num_periods:].tolist()
+            puntos.append(fila)
+
+    return {'points': puntos, 'ranges': rangos, 'solves': resoluciones}
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    rng = random.Random(0)
+    demandas = [rng.uniform(100, 220) for _ in range(52)]
+    stocks_seguridad = [rng.uniform(0, 40) for _ in range(52)]
+    capacidades = np.linspace(150, 450, 1000)
+
+    for objetivo in ("min", "max"):
+        inicio = time.perf_counter()
+        barrido = sweep_parameters(100, demandas, capacidades, yield_percentages=(0.8, 0.85),
+                                   densities=(0.9,), safety_stocks=stocks_seguridad, objective=objetivo)
+        duracion = time.perf_counter() - inicio
+
+        estados = [p['status'] for p in barrido['points']]
+        print(f"Objetivo {objetivo}: {len(estados)} puntos en {duracion:.3f} s con {barrido['solves']} resoluciones "
+              f"({estados.count('Optimal')} factibles)")
+        for rango in barrido['ranges']:
+            print(f"  factor {rango['factor']:.3f}: capacidad {rango['from']:.2f}-{rango['to']:.2f}, "
+                  f"valor {rango['optimal_value_from']:.2f} + {rango['capacity_dual']:.2f} x Δcapacidad")
@@ -0,0 +1,30 @@
+import random
+
+
+def instancia_aleatoria(semilla, num_periods=24, factible=True):
+    """
+    Instancia de un producto con la capacidad entre 1.05 y 1.5 veces la mínima
+    factible (o entre 0.5 y 0.95 veces si no es factible).
+    """
+    rng = random.Random(semilla)
+    demandas = [rng.uniform(50, 250) for _ in range(num_periods)]
+    seguridad = [rng.uniform(0, 40) for _ in range(num_periods)]
+    stock_inicial = rng.uniform(0, 300)
+    rendimiento = rng.uniform(0.7, 0.95)
+    densidad = rng.uniform(0.8, 1.0)
+
+    factor = rendimiento * densidad
+    acumulada = 0.0
+    minima = 0.0
+    for t in range(num_periods):
+        acumulada += demandas[t]
+        minima = max(minima, (acumulada + seguridad[t] - stock_inicial) / factor / (t + 1))
+    holgura = rng.uniform(1.05, 1.5) if factible else rng.uniform(0.5, 0.95)
+    return {
+        'initial_stock': stock_inicial,
+        'demands': demandas,
+        'yield_percentage': rendimiento,
+        'density': densidad,
+        'max_productivity': max(minima, 1.0) * holgura,
+        'safety_stocks': seguridad
+    }
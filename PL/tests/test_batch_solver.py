@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+import batch_solver
+from backends import HighsBackend
+from batch_solver import optimize_production_batch, plan_percentiles
+from greedy import optimize_production_greedy
+from lp_model import build_production_lp
+from instancias import instancia_aleatoria
+
+
+def _escenarios(semillas, infactibles=()):
+    instancias = [instancia_aleatoria(semilla, factible=semilla not in infactibles) for semilla in semillas]
+    argumentos = {
+        clave: np.array([i[clave] for i in instancias])
+        for clave in ('initial_stock', 'demands', 'yield_percentage', 'density', 'max_productivity', 'safety_stocks')
+    }
+    return instancias, (argumentos['initial_stock'], argumentos['demands'], argumentos['yield_percentage'],
+                        argumentos['density'], argumentos['max_productivity'], argumentos['safety_stocks'])
+
+
+def _referencia(instancia, objective="min", final_stock=None):
+    lp = build_production_lp(instancia['initial_stock'], instancia['demands'],
+                             instancia['yield_percentage'] * instancia['density'], instancia['max_productivity'],
+                             instancia['safety_stocks'], objective=objective, final_stock=final_stock)
+    return HighsBackend().solve(lp)
+
+
+@pytest.mark.parametrize("objective", ["min", "max"])
+def test_coincide_con_highs_por_escenario(objective):
+    instancias, argumentos = _escenarios(range(10))
+    lote = optimize_production_batch(*argumentos, objective=objective)
+    assert lote['feasible'].all()
+    for k, instancia in enumerate(instancias):
+        referencia = _referencia(instancia, objective)
+        assert referencia['status'] == 'Optimal'
+        assert lote['optimal_value'][k] == pytest.approx(referencia['objective'], rel=1e-6)
+
+
+def test_coincide_con_el_voraz_plan_a_plan():
+    instancias, argumentos = _escenarios(range(10))
+    lote = optimize_production_batch(*argumentos)
+    for k, instancia in enumerate(instancias):
+        voraz = optimize_production_greedy(**instancia)
+        np.testing.assert_allclose(lote['production_levels'][k], voraz['production_levels'], rtol=1e-9, atol=1e-9)
+        np.testing.assert_allclose(lote['ending_stocks'][k], voraz['ending_stocks'], rtol=1e-9, atol=1e-9)
+
+
+def test_stock_final_exacto():
+    instancias, argumentos = _escenarios(range(6))
+    finales = optimize_production_batch(*argumentos)['ending_stocks'][:, -1] + 10
+    lote = optimize_production_batch(*argumentos, final_stocks=finales)
+    assert lote['feasible'].all()
+    np.testing.assert_allclose(lote['ending_stocks'][:, -1], finales, rtol=1e-9)
+    for k, instancia in enumerate(instancias):
+        referencia = _referencia(instancia, final_stock=finales[k])
+        assert lote['optimal_value'][k] == pytest.approx(referencia['objective'], rel=1e-6)
+
+
+def test_escenarios_infactibles_quedan_en_nan():
+    instancias, argumentos = _escenarios(range(8), infactibles={1, 4})
+    lote = optimize_production_batch(*argumentos)
+    np.testing.assert_array_equal(lote['feasible'], [k not in (1, 4) for k in range(8)])
+    assert np.isnan(lote['production_levels'][[1, 4]]).all()
+    assert _referencia(instancias[1])['status'] == 'Infeasible'
+    assert not np.isnan(lote['production_levels'][[0, 2, 3, 5, 6, 7]]).any()
+
+
+def test_bloques_no_cambian_el_resultado(monkeypatch):
+    _, argumentos = _escenarios(range(10), infactibles={3})
+    completo = optimize_production_batch(*argumentos)
+    monkeypatch.setattr(batch_solver, 'ESCENARIOS_POR_BLOQUE', 3)
+    por_bloques = optimize_production_batch(*argumentos)
+    np.testing.assert_array_equal(por_bloques['feasible'], completo['feasible'])
+    np.testing.assert_allclose(por_bloques['production_levels'], completo['production_levels'])
+
+
+def test_percentiles_sobre_los_factibles():
+    _, argumentos = _escenarios(range(10), infactibles={0, 5})
+    lote = optimize_production_batch(*argumentos)
+    resumen = plan_percentiles(lote, percentiles=(0, 50, 100))
+    assert resumen['feasible_fraction'] == pytest.approx(0.8)
+    factibles = lote['optimal_value'][lote['feasible']]
+    assert resumen['optimal_value'][0] == pytest.approx(factibles.min())
+    assert resumen['optimal_value'][2] == pytest.approx(factibles.max())
+
+
+def test_argumento_con_longitud_incorrecta():
+    _, argumentos = _escenarios(range(3))
+    with pytest.raises(ValueError):
+        optimize_production_batch(argumentos[0][:2], *argumentos[1:])
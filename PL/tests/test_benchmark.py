@@ -0,0 +1,20 @@
+import pytest
+
+from benchmark import MOTORES_CONJUNTOS, run_case
+
+
+@pytest.mark.parametrize("engine", sorted(MOTORES_CONJUNTOS))
+def test_motores_conjuntos_resuelven_todos_los_productos(engine):
+    fila = run_case(engine, 26, 10, infeasible_fraction=0.2)
+    assert fila['status'] == 'ok'
+    assert fila['target'] == MOTORES_CONJUNTOS[engine]
+    # Una sola resolución para todos los productos, con las infactibles aisladas
+    assert fila['solves'] == 1
+    assert fila['statuses'] == {'Infeasible': 2, 'Optimal': 8}
+    assert fila['classified_correctly'] == 10
+
+
+def test_modelo_conjunto_con_tamano():
+    fila = run_case('joint', 26, 10, infeasible_fraction=0.0)
+    assert fila['columns'] == 2 * 26 * 10
+    assert fila['rows'] == 26 * 10 + 26
@@ -0,0 +1,64 @@
+import pytest
+
+import PL6
+from capacity_finder import MARGEN, bisect_threshold, find_thresholds
+from feasibility import check_feasibility
+from PL6 import optimize_production
+from instancias import instancia_aleatoria
+
+
+def _factible(instancia, **cambios):
+    return check_feasibility(**dict(instancia, **cambios))['feasible']
+
+
+@pytest.mark.parametrize("semilla", range(10))
+def test_forma_cerrada_coincide_con_la_biseccion(semilla):
+    instancia = instancia_aleatoria(semilla, factible=False)
+    umbrales = find_thresholds(**instancia)
+    biseccion, _ = bisect_threshold(lambda m: _factible(instancia, max_productivity=m), 0.0, None)
+    assert umbrales['min_max_productivity'] == pytest.approx(biseccion * (1 + MARGEN), rel=1e-8)
+
+
+@pytest.mark.parametrize("semilla", range(10))
+def test_umbrales_resuelven_con_el_solucionador(semilla):
+    instancia = instancia_aleatoria(semilla, factible=False)
+    umbrales = find_thresholds(**instancia)
+
+    capacidad = dict(instancia, max_productivity=umbrales['min_max_productivity'])
+    assert optimize_production(**capacidad, engine="highs", precheck=False)['status'] == 'Optimal'
+
+    stock = dict(instancia, initial_stock=umbrales['min_initial_stock'])
+    assert optimize_production(**stock, engine="highs", precheck=False)['status'] == 'Optimal'
+
+    fraccion = umbrales['max_safety_fraction']
+    if fraccion is not None:
+        seguridad = dict(instancia, safety_stocks=[s * fraccion for s in instancia['safety_stocks']])
+        assert optimize_production(**seguridad, engine="highs", precheck=False)['status'] == 'Optimal'
+
+
+def test_sin_solucion_por_stock_final():
+    instancia = instancia_aleatoria(0)
+    sin_demanda = dict(instancia, demands=[0.0] * 24, safety_stocks=[0.0] * 24, initial_stock=100.0)
+    umbrales = find_thresholds(**sin_demanda, final_stock=50.0)
+    assert umbrales['min_max_productivity'] is None
+    assert umbrales['min_initial_stock'] is None
+
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_escalera_incluye_rendimiento_y_densidad(semilla, monkeypatch):
+    instancia = instancia_aleatoria(semilla, factible=False)
+    monkeypatch.setattr(PL6, 'YIELD_PERCENTAGE', instancia['yield_percentage'], raising=False)
+    monkeypatch.setattr(PL6, 'DENSITY', instancia['density'], raising=False)
+    monkeypatch.setattr(PL6, 'MAX_PRODUCTIVITY', instancia['max_productivity'], raising=False)
+    datos = {
+        'stock_inicial': instancia['initial_stock'],
+        'demandas': instancia['demands'],
+        'stocks_seguridad': instancia['safety_stocks']
+    }
+
+    estrategias = PL6.estrategias_alternativas(datos)
+    parametros = [p for _, p in estrategias if 'yield_percentage' in p and p['max_productivity'] < 100000]
+    assert len(parametros) == 1
+    ajustada = dict(instancia, **parametros[0])
+    assert ajustada['yield_percentage'] > instancia['yield_percentage']
+    assert optimize_production(**ajustada, engine="highs", precheck=False)['status'] == 'Optimal'
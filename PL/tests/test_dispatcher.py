@@ -0,0 +1,56 @@
+import pytest
+
+from dispatcher import SolverDispatcher, calibration_corpus
+from multiproduct import optimize_production_joint
+from solver_stats import MemorySink
+
+
+def test_solo_registra_resoluciones_con_plan():
+    despachador = SolverDispatcher(None)
+    despachador.solve(0, [100.0] * 5, 1, 1, 50, engine='highs')
+    fila = despachador.timings['single|h13|s1']['highs']
+    assert (fila['count'], fila['failures']) == (0, 1)
+    despachador.solve(0, [10.0] * 5, 1, 1, 50, engine='highs')
+    assert despachador.timings['single|h13|s1']['highs']['count'] == 1
+
+
+def test_pasa_las_opciones_al_motor():
+    sink = MemorySink()
+    resultado = SolverDispatcher(None).solve(0, [10.0] * 5, 1, 1, 50, engine='highs', stats_sink=sink)
+    assert resultado['status'] == 'Optimal'
+    assert len(sink.records) == 1
+    with pytest.raises(ValueError):
+        SolverDispatcher(None).solve(0, [[10.0] * 5] * 3, 1, 1, 50, stats_sink=sink)
+
+
+def test_grupos_del_corpus_son_factibles():
+    grupos = [i for i in calibration_corpus(horizons=(13, 52), instances=1, products=(5,))
+              if 'total_capacity' in i]
+    for grupo in grupos:
+        factores = grupo['yield_percentage'] * grupo['density']
+        resultado = optimize_production_joint(grupo['initial_stock'], grupo['demands'], factores,
+                                              grupo['max_productivity'], grupo['total_capacity'],
+                                              grupo['safety_stocks'])
+        assert resultado['status'] == 'Optimal'
+
+
+def test_no_escribe_el_archivo_al_resolver(tmp_path):
+    ruta = tmp_path / "tiempos.json"
+    despachador = SolverDispatcher(str(ruta))
+    despachador.solve(0, [10.0] * 5, 1, 1, 50, engine='highs')
+    assert not ruta.exists()
+    despachador.save()
+    assert SolverDispatcher(str(ruta)).timings == despachador.timings
+
+    SolverDispatcher(str(ruta), autosave=True).solve(0, [10.0] * 5, 1, 1, 50, engine='greedy')
+    assert 'greedy' in SolverDispatcher(str(ruta)).timings['single|h13|s1']
+
+
+def test_motor_auto_no_escribe_en_el_directorio_de_trabajo(tmp_path, monkeypatch):
+    import dispatcher
+    from PL6 import optimize_production
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(dispatcher, '_despachador', None)
+    resultado = optimize_production(0, [10.0] * 5, 1, 1, 50, engine="auto")
+    assert resultado['status'] == 'Optimal'
+    assert list(tmp_path.iterdir()) == []
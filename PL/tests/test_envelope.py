@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from backends import HighsBackend
+from envelope import production_band, production_envelope
+from lp_model import LinearProgram, build_production_lp
+from instancias import instancia_aleatoria
+
+
+def _stock_final_alcanzable(instancia):
+    # El del plan mínimo más 50 unidades (las instancias tienen holgura de capacidad)
+    return production_envelope(**instancia, per_period=False)['min']['ending_stocks'][-1] + 50.0
+
+
+def _extremos_por_periodo(instancia, final_stock):
+    """
+    Producción mínima y máxima de cada período con 2T resoluciones (la alternativa ingenua).
+    """
+    num_periods = len(instancia['demands'])
+    base = build_production_lp(instancia['initial_stock'], instancia['demands'],
+                               instancia['yield_percentage'] * instancia['density'],
+                               instancia['max_productivity'], instancia['safety_stocks'], final_stock=final_stock)
+    minimos, maximos = [], []
+    for t in range(num_periods):
+        c = np.zeros(base.num_columns)
+        c[t] = 1.0
+        for sentido, destino in (("min", minimos), ("max", maximos)):
+            lp = LinearProgram(c, base.A_ub, base.b_ub, base.A_eq, base.b_eq, base.lower, base.upper, sense=sentido)
+            solucion = HighsBackend().solve(lp)
+            assert solucion['status'] == 'Optimal'
+            destino.append(solucion['x'][t])
+    return minimos, maximos
+
+
+@pytest.mark.parametrize("semilla", range(8))
+@pytest.mark.parametrize("con_stock_final", [False, True])
+def test_banda_coincide_con_los_extremos_del_lp(semilla, con_stock_final):
+    instancia = instancia_aleatoria(semilla, num_periods=10)
+    final_stock = _stock_final_alcanzable(instancia) if con_stock_final else None
+
+    banda = production_band(**instancia, final_stock=final_stock)
+    assert banda['feasible']
+    minimos, maximos = _extremos_por_periodo(instancia, final_stock)
+    np.testing.assert_allclose(banda['min_production'], minimos, atol=1e-6)
+    np.testing.assert_allclose(banda['max_production'], maximos, atol=1e-6)
+
+
+@pytest.mark.parametrize("semilla", range(5))
+@pytest.mark.parametrize("con_stock_final", [False, True])
+def test_highs_coincide_con_cbc(semilla, con_stock_final):
+    instancia = instancia_aleatoria(semilla)
+    final_stock = _stock_final_alcanzable(instancia) if con_stock_final else None
+    highs = production_envelope(**instancia, final_stock=final_stock)
+    cbc = production_envelope(**instancia, final_stock=final_stock, engine="cbc")
+    assert highs['status'] == cbc['status'] == 'Optimal'
+    for objetivo in ("min", "max"):
+        assert highs[objetivo]['optimal_value'] == pytest.approx(cbc[objetivo]['optimal_value'], rel=1e-6)
+    assert highs['band_min'] == cbc['band_min']
+
+
+def test_envolvente_infactible():
+    instancia = instancia_aleatoria(0, factible=False)
+    assert production_envelope(**instancia)['status'] == 'Infeasible'
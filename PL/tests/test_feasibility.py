@@ -0,0 +1,43 @@
+import pytest
+
+from feasibility import check_feasibility
+from PL6 import optimize_production
+from instancias import instancia_aleatoria
+
+
+@pytest.mark.parametrize("semilla", range(10))
+@pytest.mark.parametrize("factible", [True, False])
+@pytest.mark.parametrize("engine", ["cbc", "highs"])
+def test_oraculo_coincide_con_los_solucionadores(semilla, factible, engine):
+    instancia = instancia_aleatoria(semilla, factible=factible)
+    reporte = check_feasibility(**instancia)
+    resultado = optimize_production(**instancia, engine=engine, formulation="balance", precheck=False)
+    assert reporte['feasible'] == factible
+    assert (resultado['status'] == 'Optimal') == reporte['feasible']
+
+
+@pytest.mark.parametrize("semilla", range(10))
+def test_capacidad_minima_recomendada_es_exacta(semilla):
+    instancia = instancia_aleatoria(semilla, factible=False)
+    minima = check_feasibility(**instancia)['min_max_productivity']
+    justa = dict(instancia, max_productivity=minima * (1 + 1e-9))
+    escasa = dict(instancia, max_productivity=minima * (1 - 1e-6))
+    assert optimize_production(**justa, engine="highs", precheck=False)['status'] == 'Optimal'
+    assert optimize_production(**escasa, engine="highs", precheck=False)['status'] == 'Infeasible'
+
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_stock_final_exacto(semilla):
+    instancia = instancia_aleatoria(semilla)
+    # Un stock final por debajo del stock inicial sin demanda que lo consuma es infactible
+    sin_demanda = dict(instancia, demands=[0.0] * len(instancia['demands']),
+                       safety_stocks=[0.0] * len(instancia['demands']), initial_stock=100.0)
+    reporte = check_feasibility(**sin_demanda, final_stock=50.0)
+    assert not reporte['feasible']
+    assert reporte['final_stock_issues'][0]['issue'] == 'initial_stock_exceeds_final'
+    resultado = optimize_production(**sin_demanda, engine="cbc", final_stock=50.0, precheck=False)
+    assert resultado['status'] == 'Infeasible'
+
+    assert check_feasibility(**sin_demanda, final_stock=150.0)['feasible']
+    resultado = optimize_production(**sin_demanda, engine="cbc", final_stock=150.0, precheck=False)
+    assert resultado['status'] == 'Optimal'
@@ -0,0 +1,57 @@
+import pytest
+
+from greedy import optimize_production_greedy
+from PL6 import optimize_production
+from instancias import instancia_aleatoria
+
+SEMILLAS = range(8)
+
+
+def iguales(a, b):
+    return abs(a - b) <= 1e-6 * max(1.0, abs(b))
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+@pytest.mark.parametrize("objective", ["min", "max"])
+@pytest.mark.parametrize("engine", ["cbc", "highs"])
+def test_voraz_coincide_con_los_solucionadores(semilla, objective, engine):
+    instancia = instancia_aleatoria(semilla)
+    voraz = optimize_production_greedy(**instancia, objective=objective)
+    exacto = optimize_production(**instancia, objective=objective, engine=engine, formulation="balance",
+                                 precheck=False)
+    assert voraz['status'] == exacto['status'] == 'Optimal'
+    assert iguales(voraz['optimal_value'], exacto['optimal_value'])
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_voraz_con_stock_final_exacto(semilla):
+    instancia = instancia_aleatoria(semilla)
+    # Un stock final alcanzable: el del plan mínimo más una parte de la holgura de capacidad
+    minimo = optimize_production_greedy(**instancia)
+    final = minimo['ending_stocks'][-1] + 10
+    voraz = optimize_production_greedy(**instancia, final_stock=final)
+    exacto = optimize_production(**instancia, engine="cbc", formulation="balance", final_stock=final,
+                                 precheck=False)
+    assert voraz['status'] == exacto['status'] == 'Optimal'
+    assert iguales(voraz['optimal_value'], exacto['optimal_value'])
+    assert iguales(voraz['ending_stocks'][-1], final)
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_plan_del_voraz_es_factible(semilla):
+    instancia = instancia_aleatoria(semilla)
+    plan = optimize_production_greedy(**instancia)
+    factor = instancia['yield_percentage'] * instancia['density']
+    stock = instancia['initial_stock']
+    for t, produccion in enumerate(plan['production_levels']):
+        assert -1e-9 <= produccion <= instancia['max_productivity'] * (1 + 1e-9)
+        stock += factor * produccion - instancia['demands'][t]
+        assert stock >= instancia['safety_stocks'][t] - 1e-6
+        assert iguales(plan['ending_stocks'][t], stock)
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_ambos_declaran_infactible(semilla):
+    instancia = instancia_aleatoria(semilla, factible=False)
+    assert optimize_production_greedy(**instancia)['status'] == 'Infeasible'
+    assert optimize_production(**instancia, engine="highs", precheck=False)['status'] == 'Infeasible'
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from benchmark import generate_instance
+from hierarchical import plan_hierarchical
+
+
+def instancias(cantidad, semilla=0):
+    # Mismo generador que el barrido de escalas de demanda 1 a 1e10
+    rng = np.random.default_rng(semilla)
+    for _ in range(cantidad):
+        escala = 10 ** rng.uniform(0, 10)
+        num_periods = int(rng.integers(20, 160))
+        instancia = generate_instance(num_periods, demand_scale=escala, rng=rng)
+        instancia.pop('feasible')
+        yield instancia, int(rng.integers(1, 14))
+
+
+@pytest.mark.parametrize("engine", ["cbc", "highs"])
+def test_sub_ventanas_en_el_borde_las_resuelve_el_motor_pedido(engine):
+    # La instancia 123 lleva una sub-ventana a su borde: antes CBC la declaraba infactible
+    instancia, aggregation = list(instancias(124))[-1]
+    resultado = plan_hierarchical(**instancia, aggregation=aggregation, engine=engine, formulation="balance",
+                                  parallel=False)
+    assert resultado['status'] == 'Optimal'
+    assert 'greedy_windows' not in resultado
+    assert abs(resultado['gap']) < 1e-6
+
+
+def test_objetivo_max_a_capacidad():
+    instancia, aggregation = next(instancias(1, semilla=3))
+    resultado = plan_hierarchical(**instancia, aggregation=aggregation, objective="max", engine="highs",
+                                  parallel=False, compare_full=False)
+    assert resultado['status'] == 'Optimal'
+    assert np.allclose(resultado['production_levels'], instancia['max_productivity'], rtol=1e-9)
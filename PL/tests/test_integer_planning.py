@@ -0,0 +1,49 @@
+import integer_planning
+from integer_planning import optimize_production_integer
+from PL6 import optimize_production
+from solver_config import ESTADO_INCUMBENTE
+
+
+def test_stock_final_minimo_no_lo_rechaza_la_verificacion_previa():
+    # Con stock final exacto es infactible (el stock inicial ya lo excede); en obleas enteras es un mínimo
+    resultado = optimize_production(500, [10, 10, 10], 1.0, 10.0, 5, [0, 0, 0], engine="integer", final_stock=100)
+    assert resultado['status'] == 'Optimal'
+    assert resultado['production_levels'] == [0, 0, 0]
+
+
+def test_obleas_enteras_con_stock_final_minimo():
+    resultado = optimize_production(0, [10, 10, 10], 1.0, 10.0, 5, [0, 0, 0], engine="integer", final_stock=5)
+    assert resultado['status'] == 'Optimal'
+    assert resultado['optimal_value'] == 4
+    assert resultado['proven_optimal']
+    assert resultado['ending_stocks'][-1] >= 5
+
+
+def test_verificacion_previa_sigue_rechazando_capacidad_insuficiente():
+    resultado = optimize_production(0, [10, 10, 10], 1.0, 1.0, 5, [0, 0, 0], engine="integer", final_stock=5)
+    assert resultado['status'] == 'Infeasible'
+    assert not resultado['feasibility']['feasible']
+
+
+def test_plan_sin_demostrar_no_es_incumbente(monkeypatch):
+    original = integer_planning._relajacion
+
+    def relajacion_holgada(*argumentos):
+        # Una cota LP más baja que el plan entero: factible pero no demostrado óptimo
+        resultado = original(*argumentos)
+        return dict(resultado, optimal_value=resultado['optimal_value'] - 2)
+
+    monkeypatch.setattr(integer_planning, '_relajacion', relajacion_holgada)
+    resultado = optimize_production_integer(0, [10, 10, 10], 1.0, 10.0, 5, [0, 0, 0])
+    assert resultado['status'] == 'Optimal'
+    assert not resultado['proven_optimal']
+    assert resultado['gap'] > 0
+
+
+def test_relajacion_interrumpida_es_incumbente(monkeypatch):
+    original = integer_planning._relajacion
+    monkeypatch.setattr(integer_planning, '_relajacion',
+                        lambda *argumentos: dict(original(*argumentos), status=ESTADO_INCUMBENTE))
+    resultado = optimize_production_integer(0, [10, 10, 10], 1.0, 10.0, 5, [0, 0, 0])
+    assert resultado['status'] == ESTADO_INCUMBENTE
+    assert resultado['optimal_value'] == 3
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from feasibility import check_feasibility
+from lagrangian import optimize_production_lagrangian
+from multiproduct import optimize_production_joint
+from instancias import instancia_aleatoria
+
+
+def _conjunto(semillas, holgura, num_periods=24):
+    """
+    Argumentos de optimize_production_joint con la capacidad total igual a holgura
+    veces la suma de las productividades mínimas factibles: cerca de 1 la capacidad
+    compartida queda activa y por debajo el modelo conjunto puede ser infactible.
+    """
+    instancias = [instancia_aleatoria(semilla, num_periods) for semilla in semillas]
+    minimas = [check_feasibility(i['initial_stock'], i['demands'], i['yield_percentage'], i['density'],
+                                 i['max_productivity'], i['safety_stocks'])['min_max_productivity']
+               for i in instancias]
+    return (
+        np.array([i['initial_stock'] for i in instancias]),
+        np.array([i['demands'] for i in instancias]),
+        np.array([i['yield_percentage'] * i['density'] for i in instancias]),
+        np.array([i['max_productivity'] for i in instancias]),
+        holgura * sum(minimas),
+        np.array([i['safety_stocks'] for i in instancias])
+    )
+
+
+def _plan_factible(resultado, argumentos):
+    stocks_iniciales, demandas, factores, capacidades, total, seguridad = argumentos
+    produccion = resultado['production_levels']
+    escala = 1e-6 * np.abs(demandas).max()
+    assert np.all(produccion >= -escala)
+    assert np.all(produccion <= capacidades[:, None] + escala)
+    assert np.all(produccion.sum(axis=0) <= total + escala)
+    stocks = stocks_iniciales[:, None] + np.cumsum(factores[:, None] * produccion - demandas, axis=1)
+    np.testing.assert_allclose(resultado['ending_stocks'], stocks, atol=escala)
+    assert np.all(stocks >= seguridad - escala)
+
+
+@pytest.mark.parametrize("semilla", range(6))
+@pytest.mark.parametrize("holgura", [1.1, 1.0, 0.95, 0.9])
+def test_coincide_con_el_modelo_conjunto(semilla, holgura):
+    argumentos = _conjunto(range(semilla, semilla + 4), holgura)
+    referencia = optimize_production_joint(*argumentos)
+    lagrangiana = optimize_production_lagrangian(*argumentos, parallel=False)
+
+    if referencia['status'] == 'Infeasible':
+        assert lagrangiana['status'] in ('Infeasible', 'Not Solved')
+        return
+    assert referencia['status'] == 'Optimal'
+    # Las cotas encierran al óptimo conjunto, cualquiera sea el estado
+    optimo = referencia['optimal_value']
+    assert lagrangiana['lower_bound'] <= optimo * (1 + 1e-9)
+    if lagrangiana['status'] == 'Not Solved':
+        return
+    assert lagrangiana['optimal_value'] >= optimo * (1 - 1e-9)
+    _plan_factible(lagrangiana, argumentos)
+    if lagrangiana['status'] == 'Optimal':
+        assert lagrangiana['gap'] <= 1e-4
+        assert lagrangiana['optimal_value'] == pytest.approx(optimo, rel=1e-4)
+
+
+def test_capacidad_compartida_activa_resuelta_al_optimo():
+    activas = 0
+    for semilla in range(6):
+        argumentos = _conjunto(range(semilla, semilla + 4), 1.0)
+        resultado = optimize_production_lagrangian(*argumentos, parallel=False)
+        assert resultado['status'] == 'Optimal'
+        activas += resultado['production_levels'].sum(axis=0).max() >= argumentos[4] * (1 - 1e-6)
+    assert activas >= 3
+
+
+def test_producto_infactible():
+    argumentos = list(_conjunto(range(3), 1.0))
+    # La capacidad propia del segundo producto no cubre su demanda
+    argumentos[3] = argumentos[3].copy()
+    argumentos[3][1] *= 0.3
+    assert optimize_production_joint(*argumentos)['status'] == 'Infeasible'
+    assert optimize_production_lagrangian(*argumentos, parallel=False)['status'] == 'Infeasible'
+
+
+def test_capacidad_total_insuficiente():
+    argumentos = _conjunto(range(3), 0.5)
+    assert optimize_production_joint(*argumentos)['status'] == 'Infeasible'
+    resultado = optimize_production_lagrangian(*argumentos, parallel=False)
+    assert resultado['status'] in ('Infeasible', 'Not Solved')
+    assert 'production_levels' not in resultado
+
+
+def test_sin_plan_factible_retorna_la_cota():
+    # En la primera iteración el reparto de capacidad no alcanza para todos los productos
+    argumentos = _conjunto(range(4), 1.0)
+    resultado = optimize_production_lagrangian(*argumentos, parallel=False, max_iterations=1)
+    assert resultado['status'] == 'Not Solved'
+    assert resultado['iterations'] == 1
+    assert resultado['lower_bound'] <= optimize_production_joint(*argumentos)['optimal_value'] * (1 + 1e-9)
+
+
+def test_paralelo_coincide_con_serie():
+    argumentos = _conjunto(range(4), 1.0)
+    serie = optimize_production_lagrangian(*argumentos, parallel=False)
+    paralelo = optimize_production_lagrangian(*argumentos, parallel=True, max_workers=2)
+    assert paralelo['status'] == serie['status']
+    assert paralelo['iterations'] == serie['iterations']
+    assert paralelo['optimal_value'] == pytest.approx(serie['optimal_value'], rel=1e-12)
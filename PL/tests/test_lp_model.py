@@ -0,0 +1,90 @@
+import numpy as np
+import pulp as pl
+import pytest
+
+from backends import HighsBackend
+from lp_model import build_production_lp
+from instancias import instancia_aleatoria
+
+
+def test_horizonte_vacio():
+    with pytest.raises(ValueError, match="al menos un período"):
+        build_production_lp(10, [], 0.8, 100)
+
+
+def test_dimensiones_de_la_formulacion_balance():
+    lp = build_production_lp(10, [5, 6, 7], 0.8, 100, [1, 1, 1], final_stock=2)
+    assert lp.num_columns == 6
+    assert lp.A_eq.shape == (4, 6)
+    assert lp.nonzeros == 3 + 3 + 2 + 1
+
+
+# Penalizaciones del modelo elástico de ML3 (SAFETY_SLACK_TIERS y CAPACITY_SLACK_PENALTY)
+NIVELES = ((0.5, 1e3), (0.5, 1e4))
+PENALIZACION_CAPACIDAD = 1e5
+
+
+def _elastico(instancia, capacidad=None):
+    return build_production_lp(instancia['initial_stock'], instancia['demands'],
+                               instancia['yield_percentage'] * instancia['density'],
+                               instancia['max_productivity'] if capacidad is None else capacidad,
+                               instancia['safety_stocks'], stock_floor=0, safety_slack_penalty=NIVELES,
+                               capacity_slack_penalty=PENALIZACION_CAPACIDAD)
+
+
+def _referencia_pulp(instancia, capacidad=None):
+    """
+    El mismo modelo elástico escrito directamente en PuLP y resuelto con CBC.
+    """
+    capacidad = instancia['max_productivity'] if capacidad is None else capacidad
+    factor = instancia['yield_percentage'] * instancia['density']
+    periodos = range(len(instancia['demands']))
+    prob = pl.LpProblem("Referencia", pl.LpMinimize)
+    P = [pl.LpVariable(f"P_{t}", 0) for t in periodos]
+    S = [pl.LpVariable(f"S_{t}", 0) for t in periodos]
+    X = [pl.LpVariable(f"X_{t}", 0) for t in periodos]
+    E = [[pl.LpVariable(f"E_{k}_{t}", 0, fraccion * instancia['safety_stocks'][t]) for t in periodos]
+         for k, (fraccion, _) in enumerate(NIVELES)]
+    prob += (pl.lpSum(P) + pl.lpSum(p * pl.lpSum(E[k]) for k, (_, p) in enumerate(NIVELES))
+             + PENALIZACION_CAPACIDAD * pl.lpSum(X))
+    for t in periodos:
+        anterior = instancia['initial_stock'] if t == 0 else S[t - 1]
+        prob += S[t] == anterior + factor * P[t] - instancia['demands'][t]
+        prob += S[t] + pl.lpSum(E[k][t] for k in range(len(NIVELES))) >= instancia['safety_stocks'][t]
+        prob += P[t] - X[t] <= capacidad
+    prob.solve(pl.PULP_CBC_CMD(msg=False))
+    assert pl.LpStatus[prob.status] == 'Optimal'
+    return pl.value(prob.objective)
+
+
+@pytest.mark.parametrize("semilla", range(6))
+@pytest.mark.parametrize("factible", [True, False])
+def test_elastico_coincide_con_la_formulacion_directa(semilla, factible):
+    instancia = instancia_aleatoria(semilla, factible=factible)
+    lp = _elastico(instancia)
+    solucion = HighsBackend().solve(lp)
+    assert solucion['status'] == 'Optimal'
+    assert solucion['objective'] == pytest.approx(_referencia_pulp(instancia), rel=1e-7)
+
+    T = len(instancia['demands'])
+    holguras = solucion['x'][2 * T:4 * T].reshape(2, T)
+    if factible:
+        # Sin necesidad de relajar, el modelo elástico es el modelo original
+        assert holguras.sum() == pytest.approx(0, abs=1e-7)
+        assert solucion['x'][4 * T:].sum() == pytest.approx(0, abs=1e-7)
+    else:
+        assert holguras.sum() > 0
+        # El segundo nivel solo se usa con el primero agotado
+        tope = 0.5 * np.asarray(instancia['safety_stocks'])
+        assert np.all((holguras[1] <= 1e-7) | (holguras[0] >= tope - 1e-7))
+
+
+def test_elastico_excede_la_capacidad_solo_sin_stock():
+    # Sin capacidad de producción, la demanda solo se cubre excediendo la capacidad
+    instancia = instancia_aleatoria(0)
+    T = len(instancia['demands'])
+    solucion = HighsBackend().solve(_elastico(instancia, capacidad=0.0))
+    assert solucion['objective'] == pytest.approx(_referencia_pulp(instancia, capacidad=0.0), rel=1e-7)
+    stocks = solucion['x'][T:2 * T]
+    assert np.all(stocks >= -1e-9)
+    assert solucion['x'][4 * T:].sum() > 0
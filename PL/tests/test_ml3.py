@@ -0,0 +1,66 @@
+import os
+import sys
+
+import pytest
+
+# ML3 importa sus dependencias de ML al cargarse
+for modulo in ("xgboost", "sklearn", "seaborn", "matplotlib", "pandas"):
+    pytest.importorskip(modulo)
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                             'ML', 'V3'))
+import ML3  # noqa: E402
+
+from backends import HighsBackend  # noqa: E402
+from lp_model import build_production_lp  # noqa: E402
+from instancias import instancia_aleatoria  # noqa: E402
+
+
+def _capacidad(instancia):
+    return min(instancia['max_productivity'] * 1.1, instancia['max_productivity'] * 1.2 / instancia['density'])
+
+
+def _referencia(instancia):
+    # El modelo elástico de linear_programming_optimization (factor = solo el rendimiento)
+    lp = build_production_lp(instancia['initial_stock'], instancia['demands'], instancia['yield_percentage'],
+                             _capacidad(instancia), instancia['safety_stocks'], stock_floor=0,
+                             safety_slack_penalty=ML3.SAFETY_SLACK_TIERS,
+                             capacity_slack_penalty=ML3.CAPACITY_SLACK_PENALTY)
+    return HighsBackend().solve(lp)
+
+
+@pytest.mark.parametrize("semilla", range(4))
+def test_sin_relajar_cuando_es_factible(semilla):
+    instancia = instancia_aleatoria(semilla)
+    resultado = ML3.linear_programming_optimization(**instancia, backend="highs")
+    assert resultado['status'] == 'Optimal'
+    assert not resultado['configuration']['relaxed']
+    assert sum(resultado['production_levels']) == pytest.approx(_referencia(instancia)['objective'], rel=1e-6)
+
+
+@pytest.mark.parametrize("semilla", range(4))
+def test_relajaciones_coinciden_con_las_holguras(semilla):
+    # Una capacidad muy por debajo de la mínima obliga a relajar aun con la capacidad efectiva de ML3
+    instancia = dict(instancia_aleatoria(semilla), max_productivity=1.0)
+    resultado = ML3.linear_programming_optimization(**instancia, backend="highs")
+    referencia = _referencia(instancia)
+    T = len(instancia['demands'])
+
+    assert resultado['status'] == 'Optimal'
+    assert resultado['configuration']['relaxed']
+    relajaciones = resultado['relaxations']
+    assert relajaciones['safety_stock_total'] == pytest.approx(referencia['x'][2 * T:4 * T].sum(), rel=1e-6)
+    assert relajaciones['capacity_total'] == pytest.approx(referencia['x'][4 * T:].sum(), rel=1e-6)
+    assert all(stock >= -1e-9 for stock in resultado['ending_stocks'])
+
+
+def test_modelo_conjunto_elastico_por_producto():
+    instancias = {k: instancia_aleatoria(k) for k in range(3)}
+    instancias[1]['max_productivity'] = 1.0
+    conjunto = ML3.joint_production_optimization(instancias, elastic=True)
+    assert conjunto['status'] == 'Optimal'
+    for k, instancia in instancias.items():
+        individual = ML3.linear_programming_optimization(**instancia, backend="highs")
+        producto = conjunto['products'][k]
+        assert producto['configuration']['relaxed'] == individual['configuration']['relaxed'] == (k == 1)
+        assert sum(producto['production_levels']) == pytest.approx(sum(individual['production_levels']), rel=1e-6)
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+import multiproduct
+from backends import HighsBackend
+from lp_model import build_production_lp
+from multiproduct import optimize_production_joint
+from solver_config import ESTADO_INCUMBENTE, SolverConfig
+from instancias import instancia_aleatoria
+
+DEMANDAS = np.array([[10.0, 12.0, 8.0], [5.0, 6.0, 7.0]])
+
+
+class BackendIncumbente:
+    # Resultado de un backend interrumpido por el límite de tiempo en modo anytime
+    name = "incumbente"
+
+    def __init__(self, x):
+        self.x = x
+
+    def solve(self, lp):
+        return {'status': ESTADO_INCUMBENTE, 'x': self.x, 'objective': float(lp.c @ self.x), 'ub_duals': None}
+
+
+def test_conserva_soluciones_incumbentes(monkeypatch):
+    factores = np.array([1.0, 1.0])
+    produccion = np.array([10.0, 12.0, 8.0, 5.0, 6.0, 7.0])
+    x = np.concatenate([produccion, np.zeros(6)])
+    monkeypatch.setattr(multiproduct, 'get_backend', lambda backend, scaling=False, config=None: BackendIncumbente(x))
+    resultado = optimize_production_joint([0, 0], DEMANDAS, factores, [20, 20], 30,
+                                          config=SolverConfig(anytime=True))
+    assert resultado['status'] == ESTADO_INCUMBENTE
+    assert np.allclose(resultado['production_levels'], DEMANDAS)
+
+
+def test_capacidad_compartida():
+    resultado = optimize_production_joint([0, 0], DEMANDAS, [1.0, 1.0], [20, 20], 18)
+    assert resultado['status'] == 'Optimal'
+    assert np.all(resultado['production_levels'].sum(axis=0) <= 18 + 1e-9)
+    assert abs(resultado['optimal_value'] - DEMANDAS.sum()) < 1e-6
+
+
+# Penalizaciones del modelo elástico de ML3 (SAFETY_SLACK_TIERS y CAPACITY_SLACK_PENALTY)
+NIVELES = ((0.5, 1e3), (0.5, 1e4))
+PENALIZACION_CAPACIDAD = 1e5
+
+
+def _elastico(*argumentos, **opciones):
+    return optimize_production_joint(*argumentos, stock_floor=0, safety_slack_penalty=NIVELES,
+                                     capacity_slack_penalty=PENALIZACION_CAPACIDAD, **opciones)
+
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_elastico_coincide_con_el_modelo_de_un_producto(semilla):
+    instancia = instancia_aleatoria(semilla, factible=False)
+    factor = instancia['yield_percentage'] * instancia['density']
+    lp = build_production_lp(instancia['initial_stock'], instancia['demands'], factor,
+                             instancia['max_productivity'], instancia['safety_stocks'], stock_floor=0,
+                             safety_slack_penalty=NIVELES, capacity_slack_penalty=PENALIZACION_CAPACIDAD)
+    referencia = HighsBackend().solve(lp)
+
+    resultado = _elastico([instancia['initial_stock']], [instancia['demands']], [factor],
+                          [instancia['max_productivity']], safety_stocks=[instancia['safety_stocks']])
+    assert resultado['status'] == 'Optimal'
+    penalizacion = (sum(p * resultado['safety_slack'][k].sum() for k, (_, p) in enumerate(NIVELES))
+                    + PENALIZACION_CAPACIDAD * resultado['capacity_slack'].sum())
+    assert resultado['optimal_value'] + penalizacion == pytest.approx(referencia['objective'], rel=1e-9)
+
+
+def test_capacidad_compartida_activa_con_faltante_de_seguridad():
+    # Cada producto cabe en su capacidad, pero juntos no alcanzan a cubrir los stocks de seguridad al inicio
+    demandas = np.full((2, 6), 6.0)
+    seguridad = np.full((2, 6), 5.0)
+    assert optimize_production_joint([0, 0], demandas, [1.0, 1.0], [10, 10], 14, seguridad)['status'] == 'Infeasible'
+
+    resultado = _elastico([0, 0], demandas, [1.0, 1.0], [10, 10], 14, seguridad)
+    assert resultado['status'] == 'Optimal'
+    total = resultado['production_levels'].sum(axis=0)
+    assert np.all(total <= 14 + 1e-9)
+    assert total[0] == pytest.approx(14)
+    faltante = resultado['safety_slack'].sum(axis=(0, 1))
+    # El faltante de 8 se recupera con los 2 de holgura por período, sin exceder capacidades
+    np.testing.assert_allclose(faltante, [8, 6, 4, 2, 0, 0], atol=1e-7)
+    assert resultado['capacity_slack'].sum() == pytest.approx(0, abs=1e-9)
+    assert resultado['shared_capacity_slack'].sum() == pytest.approx(0, abs=1e-9)
+    # Con faltante, la capacidad compartida tiene precio sombra positivo
+    assert resultado['capacity_duals'][0] > 1.0
+
+
+def test_demanda_mayor_que_la_capacidad_compartida():
+    demandas = np.full((2, 4), 8.0)
+    resultado = _elastico([0, 0], demandas, [1.0, 1.0], [10, 10], 14)
+    assert resultado['status'] == 'Optimal'
+    # La demanda total excede en 2 por período la capacidad compartida (sin stock previo)
+    assert resultado['shared_capacity_slack'].sum() == pytest.approx(8.0)
+    assert np.all(resultado['production_levels'].sum(axis=0) <= 14 + resultado['shared_capacity_slack'] + 1e-7)
+    assert np.all(resultado['ending_stocks'] >= -1e-9)
+    assert resultado['capacity_slack'].sum() == pytest.approx(0, abs=1e-9)
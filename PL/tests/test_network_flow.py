@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+
+from greedy import optimize_production_greedy
+from multiproduct import optimize_production_joint
+from network_flow import build_network_model, optimize_production_network
+from instancias import instancia_aleatoria
+
+
+def _una_etapa(instancia):
+    return [{'gain': instancia['yield_percentage'] * instancia['density'],
+             'capacity': instancia['max_productivity'], 'initial_stock': instancia['initial_stock']}]
+
+
+def _cadena(semilla, num_productos=3, num_periodos=20):
+    """
+    Cadena aleatoria de 1 a 3 etapas con tiempos de espera, costos y stocks de seguridad por etapa.
+    """
+    rng = np.random.default_rng(semilla)
+    demandas = rng.uniform(50, 150, (num_productos, num_periodos))
+    etapas = []
+    for _ in range(rng.integers(1, 4)):
+        etapas.append({
+            'gain': rng.uniform(0.7, 1.0, num_productos),
+            'capacity': rng.uniform(250, 400, num_productos),
+            'initial_stock': rng.uniform(300, 600, num_productos),
+            'safety_stock': rng.uniform(0, 30),
+            'lead_time': int(rng.integers(0, 3)),
+            'cost': rng.uniform(0.5, 2.0)
+        })
+    return demandas, etapas
+
+
+@pytest.mark.parametrize("semilla", range(10))
+def test_una_etapa_coincide_con_el_voraz(semilla):
+    instancia = instancia_aleatoria(semilla)
+    voraz = optimize_production_greedy(**instancia)
+    red = optimize_production_network(instancia['demands'], _una_etapa(instancia),
+                                      safety_stocks=instancia['safety_stocks'])
+    assert red['status'] == 'Optimal' and red['method'] == 'chain'
+    np.testing.assert_allclose(red['production_levels'], voraz['production_levels'], rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(red['ending_stocks'], voraz['ending_stocks'], rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_una_etapa_con_stock_final_exacto(semilla):
+    instancia = instancia_aleatoria(semilla)
+    final = optimize_production_greedy(**instancia)['ending_stocks'][-1] + 10
+    voraz = optimize_production_greedy(**instancia, final_stock=final)
+    for method in ("chain", "lp"):
+        red = optimize_production_network(instancia['demands'], _una_etapa(instancia),
+                                          safety_stocks=instancia['safety_stocks'], final_stock=final,
+                                          method=method)
+        assert red['status'] == voraz['status'] == 'Optimal'
+        assert red['optimal_value'] == pytest.approx(voraz['optimal_value'], rel=1e-7)
+        assert red['ending_stocks'][-1] == pytest.approx(final, rel=1e-7)
+
+
+@pytest.mark.parametrize("semilla", range(20))
+def test_cadena_coincide_con_el_lp(semilla):
+    demandas, etapas = _cadena(semilla)
+    cadena = optimize_production_network(demandas, etapas, method="chain")
+    lp = optimize_production_network(demandas, etapas, method="lp")
+    assert cadena['status'] == lp['status']
+    if cadena['status'] == 'Optimal':
+        assert cadena['optimal_value'] == pytest.approx(lp['optimal_value'], rel=1e-7)
+        # El plan de la cadena cumple todas las restricciones de la red
+        programa, _ = build_network_model(demandas, etapas)
+        x = np.concatenate([cadena['production_levels'].ravel(), cadena['ending_stocks'].ravel()])
+        assert programa.primal_residual(x) <= 1e-7 * np.abs(programa.b_eq).max()
+        assert np.all(x >= programa.lower - 1e-7) and np.all(x <= programa.upper * (1 + 1e-9) + 1e-9)
+
+
+def test_cadenas_aleatorias_mayormente_factibles():
+    estados = [optimize_production_network(*_cadena(semilla))['status'] for semilla in range(20)]
+    assert estados.count('Optimal') >= 10
+
+
+def test_capacidad_compartida_coincide_con_el_modelo_conjunto():
+    instancias = [instancia_aleatoria(semilla) for semilla in range(4)]
+    factores = np.array([i['yield_percentage'] * i['density'] for i in instancias])
+    capacidades = np.array([i['max_productivity'] for i in instancias])
+    demandas = np.array([i['demands'] for i in instancias])
+    seguridad = np.array([i['safety_stocks'] for i in instancias])
+    stocks = np.array([i['initial_stock'] for i in instancias])
+    total = 0.9 * capacidades.sum()
+
+    conjunto = optimize_production_joint(stocks, demandas, factores, capacidades, total, seguridad)
+    red = optimize_production_network(demandas, [{'gain': factores, 'capacity': capacidades,
+                                                  'initial_stock': stocks}],
+                                      safety_stocks=seguridad, shared_capacity={0: total})
+    assert red['status'] == conjunto['status'] == 'Optimal'
+    assert red['method'] == 'lp'
+    assert red['optimal_value'] == pytest.approx(conjunto['optimal_value'], rel=1e-7)
+    assert np.all(red['production_levels'][:, 0].sum(axis=0) <= total * (1 + 1e-9))
+
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_maximizar_coincide_con_el_voraz(semilla):
+    instancia = instancia_aleatoria(semilla)
+    voraz = optimize_production_greedy(**instancia, objective="max")
+    red = optimize_production_network(instancia['demands'], _una_etapa(instancia),
+                                      safety_stocks=instancia['safety_stocks'], objective="max")
+    assert red['method'] == 'lp'
+    assert red['optimal_value'] == pytest.approx(voraz['optimal_value'], rel=1e-7)
+
+
+def test_infactible():
+    instancia = instancia_aleatoria(0, factible=False)
+    for method in ("chain", "lp"):
+        red = optimize_production_network(instancia['demands'], _una_etapa(instancia),
+                                          safety_stocks=instancia['safety_stocks'], method=method)
+        assert red['status'] == 'Infeasible'
+
+
+def test_argumentos_invalidos():
+    demandas, etapas = _cadena(0)
+    with pytest.raises(ValueError):
+        optimize_production_network(demandas, etapas, shared_capacity={0: 500.0}, method="chain")
+    with pytest.raises(ValueError):
+        optimize_production_network(demandas, [dict(etapas[0], lead_time=-1)])
+    with pytest.raises(ValueError):
+        optimize_production_network(demandas, [])
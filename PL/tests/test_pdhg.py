@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from backends import get_backend
+from lp_model import build_production_lp
+from multiproduct import optimize_production_joint
+from pdhg import solve_pdhg
+from instancias import instancia_aleatoria
+
+
+def _programa(instancia, production_costs=None):
+    return build_production_lp(
+        instancia['initial_stock'], instancia['demands'], instancia['yield_percentage'] * instancia['density'],
+        instancia['max_productivity'], instancia['safety_stocks'], production_costs=production_costs
+    )
+
+
+@pytest.mark.parametrize("semilla", range(8))
+def test_converge_al_optimo_de_highs(semilla):
+    instancia = instancia_aleatoria(semilla, num_periods=52)
+    lp = _programa(instancia)
+    referencia = get_backend("highs", scaling=True).solve(lp)
+    pdhg = get_backend("pdhg", scaling=True).solve(lp)
+    assert pdhg['status'] == 'Optimal'
+    assert pdhg['objective'] == pytest.approx(referencia['objective'], rel=1e-5)
+    assert lp.primal_residual(pdhg['x']) <= 1e-5
+
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_plan_coincide_con_highs(semilla):
+    # Costos crecientes en el tiempo: el óptimo (producir lo más tarde posible) es único
+    instancia = instancia_aleatoria(semilla, num_periods=26)
+    lp = _programa(instancia, production_costs=1.0 + 0.01 * np.arange(26))
+    referencia = get_backend("highs", scaling=True).solve(lp)
+    pdhg = get_backend("pdhg", scaling=True).solve(lp)
+    assert pdhg['status'] == 'Optimal'
+    escala = instancia['max_productivity']
+    np.testing.assert_allclose(pdhg['x'][:26], referencia['x'][:26], atol=1e-4 * escala)
+    np.testing.assert_allclose(pdhg['x'][26:], referencia['x'][26:], atol=1e-4 * escala)
+
+
+def test_duales_con_la_convencion_de_highs():
+    instancia = instancia_aleatoria(0, num_periods=26)
+    lp = _programa(instancia, production_costs=1.0 + 0.01 * np.arange(26))
+    referencia = get_backend("highs").solve(lp)
+    pdhg = solve_pdhg(lp, tolerance=1e-8)
+    assert pdhg['status'] == 'Optimal'
+    np.testing.assert_allclose(pdhg['eq_duals'], referencia['eq_duals'], atol=1e-4)
+
+
+def test_modelo_conjunto():
+    instancias = [instancia_aleatoria(semilla, num_periods=26) for semilla in range(5)]
+    argumentos = (
+        [i['initial_stock'] for i in instancias],
+        [i['demands'] for i in instancias],
+        [i['yield_percentage'] * i['density'] for i in instancias],
+        [i['max_productivity'] for i in instancias],
+        0.9 * sum(i['max_productivity'] for i in instancias),
+        [i['safety_stocks'] for i in instancias]
+    )
+    referencia = optimize_production_joint(*argumentos)
+    pdhg = optimize_production_joint(*argumentos, backend="pdhg")
+    assert pdhg['status'] == 'Optimal'
+    assert pdhg['optimal_value'] == pytest.approx(referencia['optimal_value'], rel=1e-5)
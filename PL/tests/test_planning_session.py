@@ -0,0 +1,89 @@
+import pytest
+
+from planning_session import PlanningSession
+from PL6 import optimize_production
+from solver_stats import MemorySink
+from instancias import instancia_aleatoria
+
+
+def _referencia(instancia, **opciones):
+    return optimize_production(**instancia, engine="highs", formulation="balance", precheck=False, **opciones)
+
+
+def _cambios(instancia):
+    # Un cambio por cada parámetro que la sesión actualiza en sitio
+    return [
+        {'max_productivity': instancia['max_productivity'] * 1.2},
+        {'yield_percentage': instancia['yield_percentage'] * 0.97},
+        {'density': instancia['density'] * 1.02},
+        {'safety_stocks': [s * 0.5 for s in instancia['safety_stocks']]},
+        {'demands': [d * 0.9 for d in instancia['demands']]},
+        {'initial_stock': instancia['initial_stock'] + 40.0}
+    ]
+
+
+@pytest.mark.parametrize("semilla", range(4))
+@pytest.mark.parametrize("objective", ["min", "max"])
+def test_actualizaciones_acumuladas_coinciden_con_modelos_nuevos(semilla, objective):
+    instancia = instancia_aleatoria(semilla)
+    sesion = PlanningSession(**instancia, objective=objective)
+    parametros = dict(instancia)
+    for cambio in _cambios(instancia):
+        sesion.update(**cambio)
+        parametros.update(cambio)
+        resultado = sesion.solve()
+        referencia = _referencia(parametros, objective=objective)
+        assert resultado['status'] == referencia['status'] == 'Optimal'
+        assert resultado['optimal_value'] == pytest.approx(referencia['optimal_value'], rel=1e-6)
+    assert sesion.solves == len(_cambios(instancia))
+
+
+@pytest.mark.parametrize("semilla", range(4))
+def test_solve_with_restaura_los_parametros_base(semilla):
+    instancia = instancia_aleatoria(semilla)
+    sesion = PlanningSession(**instancia)
+    base = sesion.solve()
+    for cambio in _cambios(instancia):
+        resultado = sesion.solve_with(**cambio)
+        referencia = _referencia(dict(instancia, **cambio))
+        assert resultado['optimal_value'] == pytest.approx(referencia['optimal_value'], rel=1e-6)
+    assert sesion.solve_with()['optimal_value'] == pytest.approx(base['optimal_value'], rel=1e-9)
+
+
+def test_stock_final_exacto():
+    instancia = instancia_aleatoria(0)
+    final = _referencia(instancia)['ending_stocks'][-1] + 10
+    sesion = PlanningSession(**instancia, final_stock=final)
+    resultado = sesion.solve_with(demands=[d * 0.95 for d in instancia['demands']])
+    referencia = _referencia(dict(instancia, demands=[d * 0.95 for d in instancia['demands']]), final_stock=final)
+    assert resultado['optimal_value'] == pytest.approx(referencia['optimal_value'], rel=1e-6)
+    assert resultado['ending_stocks'][-1] == pytest.approx(final, rel=1e-6)
+
+
+def test_infactible_se_descarta_sin_invocar_al_solucionador():
+    instancia = instancia_aleatoria(0)
+    sesion = PlanningSession(**instancia)
+    resultado = sesion.solve_with(max_productivity=instancia['max_productivity'] * 0.3)
+    assert resultado['status'] == 'Infeasible'
+    assert not resultado['feasibility']['feasible']
+    assert sesion.solves == 0
+    # La sesión sigue utilizable después del intento infactible
+    assert sesion.solve_with()['status'] == 'Optimal'
+
+
+def test_no_cambia_el_numero_de_periodos():
+    instancia = instancia_aleatoria(0)
+    sesion = PlanningSession(**instancia)
+    with pytest.raises(ValueError):
+        sesion.update(demands=instancia['demands'][:-1])
+
+
+def test_registros_de_estadisticas_por_intento():
+    instancia = instancia_aleatoria(0)
+    sink = MemorySink()
+    sesion = PlanningSession(**instancia, stats_sink=sink)
+    for intento, cambio in enumerate(_cambios(instancia)[:3], start=1):
+        sesion.solve_with(attempt=intento, **cambio)
+    assert [r['attempt'] for r in sink.records] == [1, 2, 3]
+    assert all(r['source'] == "PlanningSession.solve" and r['status'] == 'Optimal' for r in sink.records)
+    assert all(r['num_periods'] == len(instancia['demands']) for r in sink.records)
@@ -0,0 +1,77 @@
+import os
+
+from backends import HighsBackend, PdhgBackend, ScaledBackend
+from PL6 import optimize_production
+from result_cache import FORMULATION_VERSION, ResultCache
+from solver_config import SolverConfig
+
+ENTRADAS = (100, [120, 140, 90, 110], 0.8, 0.9, 300, [20, 20, 20, 20])
+
+
+def test_clave_separa_configuraciones(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    assert cache.key("ns", config=SolverConfig()) == cache.key("ns", config=SolverConfig())
+    assert cache.key("ns", config=SolverConfig()) != cache.key("ns", config=SolverConfig(rel_gap=0.1))
+    assert cache.key("ns", config=SolverConfig()) != cache.key("ns", config=SolverConfig(time_limit=5))
+
+
+def test_optimize_production_no_reutiliza_otra_configuracion(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    optimize_production(*ENTRADAS, engine="highs", cache=cache)
+    optimize_production(*ENTRADAS, engine="highs", cache=cache, config=SolverConfig())
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    optimize_production(*ENTRADAS, engine="highs", cache=cache, config=SolverConfig(time_limit=30))
+    optimize_production(*ENTRADAS, engine="highs", cache=cache, scaling=False)
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_clave_separa_backends_con_opciones_distintas(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    assert cache.key("ns", engine=HighsBackend()) == cache.key("ns", engine=HighsBackend())
+    assert cache.key("ns", engine=HighsBackend()) != cache.key("ns", engine="highs")
+    assert cache.key("ns", engine=HighsBackend()) != cache.key("ns", engine=HighsBackend(presolve=False))
+    assert cache.key("ns", engine=PdhgBackend()) != cache.key("ns", engine=PdhgBackend(tolerance=1e-4))
+    assert (cache.key("ns", engine=HighsBackend(config=SolverConfig()))
+            != cache.key("ns", engine=HighsBackend(config=SolverConfig(time_limit=5))))
+    assert (cache.key("ns", engine=ScaledBackend(HighsBackend()))
+            != cache.key("ns", engine=ScaledBackend(HighsBackend(), passes=1)))
+
+    optimize_production(*ENTRADAS, engine=PdhgBackend(), cache=cache)
+    optimize_production(*ENTRADAS, engine=PdhgBackend(tolerance=1e-4), cache=cache)
+    optimize_production(*ENTRADAS, engine=PdhgBackend(), cache=cache)
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_desalojo_lru(tmp_path):
+    resultado = {'status': 'Optimal', 'production_levels': [1.0] * 50}
+    cache = ResultCache(str(tmp_path), max_bytes=10 ** 6)
+    cache.put(cache.key("ns", 0), resultado)
+    tamano = cache.stats()['bytes']
+
+    cache = ResultCache(str(tmp_path), max_bytes=3 * tamano)
+    claves = [cache.key("ns", i) for i in range(3)]
+    for i, clave in enumerate(claves[1:], start=1):
+        # Fechas de modificación separadas: el desalojo ordena por la última consulta
+        cache.put(clave, resultado)
+        os.utime(cache._ruta(clave), (1000 + i, 1000 + i))
+    os.utime(cache._ruta(claves[0]), (1000, 1000))
+    assert cache.get(claves[0]) is not None  # la más antigua pasa a ser la más reciente
+
+    cache.put(cache.key("ns", 3), resultado)
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['bytes'] <= 3 * tamano
+    assert cache.get(claves[1]) is None
+    assert cache.get(claves[0]) is not None and cache.get(claves[2]) is not None
+
+
+def test_cambio_de_version_invalida(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    optimize_production(*ENTRADAS, engine="highs", cache=cache)
+    optimize_production(*ENTRADAS, engine="highs", cache=cache)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    nueva = ResultCache(str(tmp_path), version=FORMULATION_VERSION + 1)
+    optimize_production(*ENTRADAS, engine="highs", cache=nueva)
+    assert (nueva.hits, nueva.misses) == (0, 1)
+    assert cache.key("ns", 1) != nueva.key("ns", 1)
@@ -0,0 +1,41 @@
+from feasibility import check_feasibility, minimum_carry_stocks
+from greedy import optimize_production_greedy
+from rolling_horizon import plan_rolling_horizon
+
+
+def demanda_con_cuello_de_botella():
+    # Cuello de botella en los períodos 70-79, después de la ventana que los precede
+    demandas = [100.0] * 120
+    demandas[70:80] = [400.0] * 10
+    return demandas
+
+
+def test_cuello_de_botella_posterior_a_la_ventana():
+    demandas = demanda_con_cuello_de_botella()
+    assert check_feasibility(0, demandas, 1, 1, 200)['feasible']
+    exacto = optimize_production_greedy(0, demandas, 1, 1, 200)
+    assert exacto['status'] == 'Optimal'
+
+    resultado = plan_rolling_horizon(0, demandas, 1, 1, 200, window=52, commit=26, engine='greedy')
+    assert resultado['status'] == 'Optimal'
+    assert len(resultado['production_levels']) == 120
+    assert resultado['optimal_value'] == exacto['optimal_value']
+    assert min(resultado['ending_stocks']) >= -1e-6
+
+
+def test_stock_final_solo_al_final_del_horizonte():
+    demandas = demanda_con_cuello_de_botella()
+    resultado = plan_rolling_horizon(0, demandas, 1, 1, 200, window=52, commit=26, engine='greedy',
+                                     final_stock=50)
+    assert resultado['status'] == 'Optimal'
+    assert abs(resultado['ending_stocks'][-1] - 50) < 1e-6
+
+
+def test_minimum_carry_stocks_es_necesario():
+    demandas = demanda_con_cuello_de_botella()
+    minimos = minimum_carry_stocks(demandas, 1, 1, 200)
+    plan = optimize_production_greedy(0, demandas, 1, 1, 200)
+    assert all(s >= m - 1e-6 for s, m in zip(plan['ending_stocks'], minimos))
+    # Antes del cuello de botella hay que acumular 10 * (400 - 200) unidades
+    assert minimos[69] == 2000
+
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from backends import HighsBackend, ScaledBackend
+from lp_model import build_production_lp
+from multiproduct import optimize_production_joint
+from scaling import compute_scaling, scale_program
+from stacked_solver import optimize_production_stacked
+from instancias import instancia_aleatoria
+
+# Magnitud de las demandas de Supply_Demand.csv
+ESCALA = 1e9
+
+
+def _programa(instancia, escala=1.0):
+    return build_production_lp(
+        instancia['initial_stock'] * escala, [d * escala for d in instancia['demands']],
+        instancia['yield_percentage'] * instancia['density'], instancia['max_productivity'] * escala,
+        [s * escala for s in instancia['safety_stocks']]
+    )
+
+
+def _conjunto(semillas, escala=1.0, holgura=1.0):
+    instancias = [instancia_aleatoria(semilla) for semilla in semillas]
+    demandas = np.array([i['demands'] for i in instancias]) * escala
+    capacidades = np.array([i['max_productivity'] for i in instancias]) * escala
+    return (
+        np.array([i['initial_stock'] for i in instancias]) * escala,
+        demandas,
+        np.array([i['yield_percentage'] * i['density'] for i in instancias]),
+        capacidades,
+        holgura * capacidades.sum(),
+        np.array([i['safety_stocks'] for i in instancias]) * escala
+    )
+
+
+def test_factores_son_potencias_de_2():
+    escalas = compute_scaling(_programa(instancia_aleatoria(0), ESCALA))
+    for clave in ('rows_eq', 'columns'):
+        assert np.all(np.log2(escalas[clave]) == np.round(np.log2(escalas[clave])))
+    assert np.log2(escalas['rhs']) == np.round(np.log2(escalas['rhs']))
+
+    escalado = scale_program(_programa(instancia_aleatoria(0), ESCALA), escalas)
+    assert np.abs(escalado.b_eq).max() < 1e3
+
+
+@pytest.mark.parametrize("semilla", range(10))
+def test_solucion_desescalada_coincide(semilla):
+    lp = _programa(instancia_aleatoria(semilla))
+    referencia = HighsBackend().solve(lp)
+    escalada = ScaledBackend(HighsBackend()).solve(lp)
+    assert escalada['status'] == 'Optimal'
+    assert escalada['objective'] == pytest.approx(referencia['objective'], rel=1e-9)
+    assert lp.primal_residual(escalada['x']) <= 1e-6 * np.abs(lp.b_eq).max()
+
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_magnitudes_grandes_invariantes(semilla):
+    lp = _programa(instancia_aleatoria(semilla))
+    referencia = HighsBackend().solve(lp)
+    grande = ScaledBackend(HighsBackend()).solve(_programa(instancia_aleatoria(semilla), ESCALA))
+    assert grande['status'] == 'Optimal'
+    assert grande['objective'] / ESCALA == pytest.approx(referencia['objective'], rel=1e-7)
+
+
+def test_conjunto_escalado():
+    referencia = optimize_production_joint(*_conjunto(range(4), holgura=0.9), scaling=False)
+    grande = optimize_production_joint(*_conjunto(range(4), ESCALA, holgura=0.9))
+    assert grande['status'] == 'Optimal'
+    assert grande['optimal_value'] / ESCALA == pytest.approx(referencia['optimal_value'], rel=1e-7)
+    assert np.all(grande['production_levels'].sum(axis=0) <= 0.9 * ESCALA * _conjunto(range(4))[3].sum() * (1 + 1e-9))
+
+
+def test_apilado_escalado():
+    planes = [instancia_aleatoria(semilla) for semilla in range(4)]
+    grandes = [dict(plan, initial_stock=plan['initial_stock'] * ESCALA,
+                    demands=[d * ESCALA for d in plan['demands']],
+                    max_productivity=plan['max_productivity'] * ESCALA,
+                    safety_stocks=[s * ESCALA for s in plan['safety_stocks']]) for plan in planes]
+    referencia = optimize_production_stacked(planes, scaling=False)
+    resultados = optimize_production_stacked(grandes)
+    for base, grande in zip(referencia, resultados):
+        assert grande['status'] == 'Optimal'
+        assert grande['optimal_value'] / ESCALA == pytest.approx(base['optimal_value'], rel=1e-7)
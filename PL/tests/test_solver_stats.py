@@ -0,0 +1,99 @@
+import json
+import sqlite3
+
+import pulp as pl
+import pytest
+
+from lp_model import build_production_model, model_size
+from PL6 import optimize_production
+from solver_stats import CAMPOS, JsonLinesSink, MemorySink, SQLiteSink, solve_cbc_with_stats, stats_record, summarize
+from instancias import instancia_aleatoria
+
+
+def _registros():
+    return [
+        stats_record("prueba", "cbc", 24, 25, 48, 72, 0.1, 0.01, 0.2, 0.001, 34, 'Optimal', attempt=1,
+                     configuration={'threads': 2}),
+        stats_record("prueba", "greedy", 24, None, None, None, 0.0, 0.0, 0.05, 0.0, None, 'Infeasible')
+    ]
+
+
+def test_registro_tiene_todos_los_campos():
+    assert tuple(_registros()[0]) == CAMPOS
+
+
+def test_json_lines_conserva_los_registros(tmp_path):
+    ruta = tmp_path / "stats.jsonl"
+    registros = _registros()
+    sink = JsonLinesSink(str(ruta))
+    for registro in registros:
+        sink.emit(registro)
+    assert [json.loads(linea) for linea in ruta.read_text(encoding='utf-8').splitlines()] == registros
+
+
+def test_sqlite_conserva_los_registros(tmp_path):
+    ruta = str(tmp_path / "stats.db")
+    registros = _registros()
+    sink = SQLiteSink(ruta)
+    for registro in registros:
+        sink.emit(registro)
+    # Reabrir la misma tabla no la recrea
+    SQLiteSink(ruta).emit(registros[0])
+
+    with sqlite3.connect(ruta) as conexion:
+        filas = conexion.execute(f"SELECT {', '.join(CAMPOS)} FROM solver_stats").fetchall()
+    assert len(filas) == 3
+    leido = dict(zip(CAMPOS, filas[0]))
+    assert json.loads(leido.pop('configuration')) == {'threads': 2}
+    assert leido == {k: v for k, v in registros[0].items() if k != 'configuration'}
+    assert dict(zip(CAMPOS, filas[1]))['rows'] is None
+
+
+def test_sqlite_rechaza_nombres_de_tabla_invalidos(tmp_path):
+    with pytest.raises(ValueError):
+        SQLiteSink(str(tmp_path / "stats.db"), table="stats; DROP TABLE x")
+
+
+def test_resumen_por_etapa():
+    resumen = summarize(_registros())
+    assert resumen['solves'] == 2
+    assert resumen['build_s'] == pytest.approx(0.1)
+    assert resumen['solve_s'] == pytest.approx(0.25)
+
+
+def test_cbc_con_estadisticas_coincide_con_la_resolucion_directa():
+    instancia = instancia_aleatoria(0)
+    argumentos = (instancia['initial_stock'], instancia['demands'], instancia['yield_percentage'],
+                  instancia['density'], instancia['max_productivity'], instancia['safety_stocks'])
+    directo, _, _ = build_production_model(*argumentos, formulation="balance")
+    directo.solve(pl.PULP_CBC_CMD(msg=False))
+    medido, _, _ = build_production_model(*argumentos, formulation="balance")
+    estadisticas = solve_cbc_with_stats(medido)
+
+    assert pl.LpStatus[medido.status] == 'Optimal'
+    assert pl.value(medido.objective) == pytest.approx(pl.value(directo.objective), rel=1e-9)
+    assert estadisticas['write_s'] > 0 and estadisticas['solve_s'] > 0
+    assert isinstance(estadisticas['iterations'], int)
+    # La escritura cronometrada no queda instalada en el problema
+    assert 'writeMPS' not in vars(medido)
+
+
+@pytest.mark.parametrize("engine", ["cbc", "highs", "greedy"])
+def test_optimize_production_emite_un_registro_por_resolucion(engine):
+    instancia = instancia_aleatoria(0)
+    sink = MemorySink()
+    resultado = optimize_production(**instancia, engine=engine, formulation="balance", stats_sink=sink)
+    referencia = optimize_production(**instancia, engine="highs", formulation="balance")
+    assert resultado['optimal_value'] == pytest.approx(referencia['optimal_value'], rel=1e-6)
+
+    assert len(sink.records) == 1
+    registro = sink.records[0]
+    assert registro['source'] == "PL6.optimize_production"
+    assert registro['engine'] == engine
+    assert registro['num_periods'] == len(instancia['demands'])
+    assert registro['status'] == 'Optimal'
+    if engine == "cbc":
+        prob, _, _ = build_production_model(**instancia, formulation="balance")
+        assert (registro['rows'], registro['columns'], registro['nonzeros']) == model_size(prob)
+    elif engine == "greedy":
+        assert registro['rows'] is None
@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+import backends
+from backends import HighsBackend
+from lp_model import build_production_lp
+from solver_config import ESTADO_INCUMBENTE, SolverConfig
+
+
+def modelo():
+    return build_production_lp(50, [100, 120, 140, 110, 130], 0.72, 200, [20] * 5)
+
+
+def interrumpido(x):
+    # Resultado de linprog detenido por el límite de iteraciones o de tiempo
+    return lambda *args, **kwargs: SimpleNamespace(status=1, x=np.asarray(x, dtype=float), fun=None, nit=10)
+
+
+def test_highs_iterado_infactible_no_es_incumbente(monkeypatch):
+    lp = modelo()
+    monkeypatch.setattr(backends, 'linprog', interrumpido(np.concatenate([[100.0] * 5, [64, 58, 32, 36, 20]])))
+    solucion = HighsBackend(config=SolverConfig(anytime=True)).solve(lp)
+    assert solucion['status'] == 'Not Solved'
+    assert 'x' not in solucion
+
+
+def test_highs_punto_factible_interrumpido_es_incumbente(monkeypatch):
+    lp = modelo()
+    produccion = np.full(5, 200.0)
+    stocks = 50 + np.cumsum(0.72 * produccion - np.array([100, 120, 140, 110, 130]))
+    x = np.concatenate([produccion, stocks])
+    assert lp.primal_residual(x) < 1e-9
+    monkeypatch.setattr(backends, 'linprog', interrumpido(x))
+    assert HighsBackend(config=SolverConfig(anytime=True)).solve(lp)['status'] == ESTADO_INCUMBENTE
+    assert HighsBackend(config=SolverConfig()).solve(lp)['status'] == 'Not Solved'
+
+
+def test_pdhg_sin_converger_no_es_incumbente():
+    from PL6 import optimize_production
+    # Infactible: PDHG agota las iteraciones sin un punto que cumpla el balance
+    resultado = optimize_production(50, [100, 120, 140, 110, 130], 0.8, 0.9, 100, [20] * 5, engine='pdhg',
+                                    precheck=False, config=SolverConfig(anytime=True))
+    assert resultado['status'] == 'Not Solved'
+    assert 'production_levels' not in resultado
+
+
+def test_pdhg_por_tiempo_solo_con_punto_factible():
+    from backends import PdhgBackend
+    lp = modelo()
+    # Sin iteraciones suficientes el punto no cumple el balance
+    solucion = PdhgBackend(config=SolverConfig(anytime=True, time_limit=0.0), max_iterations=64).solve(lp)
+    assert solucion['time_limit_reached']
+    assert solucion['status'] == 'Not Solved'
+    resuelto = PdhgBackend(config=SolverConfig(anytime=True)).solve(lp)
+    assert resuelto['status'] == 'Optimal'
+    assert lp.primal_residual(resuelto['x']) <= 1e-5
+
+
+def test_cbc_usa_el_estado_de_parada_y_no_el_reloj():
+    import pulp as pl
+    # CBC detenido por su límite (de CPU) con una solución entera
+    detenido = SimpleNamespace(status=pl.LpStatusOptimal, sol_status=pl.LpSolutionIntegerFeasible)
+    assert SolverConfig(anytime=True).cbc_status(detenido) == ESTADO_INCUMBENTE
+    assert SolverConfig().cbc_status(detenido) == 'Not Solved'
+    # Detenido por brecha o terminado: óptimo aunque haya corrido más que time_limit en reloj
+    terminado = SimpleNamespace(status=pl.LpStatusOptimal, sol_status=pl.LpSolutionOptimal)
+    assert SolverConfig(time_limit=0, anytime=True).cbc_status(terminado) == 'Optimal'
+    infactible = SimpleNamespace(status=pl.LpStatusInfeasible, sol_status=pl.LpSolutionInfeasible)
+    assert SolverConfig(anytime=True).cbc_status(infactible) == 'Infeasible'
+
+
+def test_modelo_conjunto_emite_estadisticas():
+    from multiproduct import optimize_production_joint
+    from solver_stats import MemorySink
+    sink = MemorySink()
+    resultado = optimize_production_joint([0, 0], [[5, 5], [6, 6]], [1.0, 1.0], [20, 20], 30, stats_sink=sink)
+    assert resultado['status'] == 'Optimal'
+    registro, = sink.records
+    assert registro['source'] == "multiproduct.optimize_production_joint"
+    assert registro['rows'] == 6 and registro['columns'] == 8
+
+
+def test_validar_solucion_acepta_incumbentes(monkeypatch):
+    import PL6
+    monkeypatch.setattr(PL6, 'MAX_PRODUCTIVITY', 200, raising=False)
+    datos = {'stocks_seguridad': [20, 20]}
+    resultado = {'status': ESTADO_INCUMBENTE, 'production_levels': [150, 150], 'ending_stocks': [30, 25]}
+    assert PL6.validar_solucion(resultado, datos)[0]
+    assert not PL6.validar_solucion({'status': 'Not Solved'}, datos)[0]
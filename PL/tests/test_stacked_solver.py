@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+import stacked_solver
+from backends import HighsBackend
+from lp_model import build_production_lp
+from solver_stats import MemorySink
+from stacked_solver import optimize_production_stacked, stack_programs
+from instancias import instancia_aleatoria
+
+
+def _planes(semillas, infactibles=()):
+    # Horizontes distintos entre planes
+    return [instancia_aleatoria(semilla, num_periods=12 + 4 * k, factible=semilla not in infactibles)
+            for k, semilla in enumerate(semillas)]
+
+
+def _programa(plan, objective="min"):
+    return build_production_lp(plan['initial_stock'], plan['demands'], plan['yield_percentage'] * plan['density'],
+                               plan['max_productivity'], plan['safety_stocks'], objective=objective,
+                               final_stock=plan.get('final_stock'))
+
+
+@pytest.mark.parametrize("objective", ["min", "max"])
+def test_coincide_con_resolver_cada_plan(objective):
+    planes = _planes(range(8))
+    resultados = optimize_production_stacked(planes, objective=objective)
+    for plan, resultado in zip(planes, resultados):
+        referencia = HighsBackend().solve(_programa(plan, objective))
+        assert resultado['status'] == 'Optimal'
+        assert resultado['optimal_value'] == pytest.approx(referencia['objective'], rel=1e-7)
+        assert len(resultado['production_levels']) == len(plan['demands'])
+
+
+def test_stock_final_exacto_por_plan():
+    planes = _planes(range(4))
+    for plan in planes:
+        plan['final_stock'] = HighsBackend().solve(_programa(plan))['x'][2 * len(plan['demands']) - 1] + 5.0
+    for plan, resultado in zip(planes, optimize_production_stacked(planes)):
+        referencia = HighsBackend().solve(_programa(plan))
+        assert resultado['optimal_value'] == pytest.approx(referencia['objective'], rel=1e-7)
+        assert resultado['ending_stocks'][-1] == pytest.approx(plan['final_stock'], rel=1e-7)
+
+
+def test_planes_infactibles_aislados():
+    planes = _planes(range(6), infactibles={1, 4})
+    resultados = optimize_production_stacked(planes)
+    assert [r['status'] for r in resultados] == ['Optimal', 'Infeasible', 'Optimal', 'Optimal', 'Infeasible',
+                                                 'Optimal']
+    assert not resultados[1]['feasibility']['feasible']
+    for k in (0, 2, 3, 5):
+        referencia = HighsBackend().solve(_programa(planes[k]))
+        assert resultados[k]['optimal_value'] == pytest.approx(referencia['objective'], rel=1e-7)
+
+
+def test_todos_infactibles_no_invoca_al_solucionador(monkeypatch):
+    def sin_solucionador(*args, **kwargs):
+        raise AssertionError("No se debe invocar al solucionador")
+
+    monkeypatch.setattr(stacked_solver, 'get_backend', sin_solucionador)
+    resultados = optimize_production_stacked(_planes(range(3), infactibles={0, 1, 2}))
+    assert [r['status'] for r in resultados] == ['Infeasible'] * 3
+
+
+class BackendQueFallaConElApilado:
+    # Falla solo con el programa apilado, para forzar la resolución bloque a bloque
+    name = "falla-apilado"
+
+    def __init__(self, columnas_apiladas):
+        self.columnas_apiladas = columnas_apiladas
+
+    def solve(self, lp):
+        if lp.num_columns == self.columnas_apiladas:
+            return {'status': 'Not Solved'}
+        return HighsBackend().solve(lp)
+
+
+def test_falla_del_apilado_se_resuelve_por_bloques(monkeypatch):
+    planes = _planes(range(4))
+    columnas = sum(_programa(plan).num_columns for plan in planes)
+    monkeypatch.setattr(stacked_solver, 'get_backend',
+                        lambda backend, scaling=False, config=None: BackendQueFallaConElApilado(columnas))
+    for plan, resultado in zip(planes, optimize_production_stacked(planes)):
+        assert resultado['status'] == 'Optimal'
+        assert resultado['optimal_value'] == pytest.approx(HighsBackend().solve(_programa(plan))['objective'])
+
+
+def test_programa_apilado_es_diagonal_por_bloques():
+    programas = [_programa(plan) for plan in _planes(range(3))]
+    programa, desplazamientos = stack_programs(programas)
+    assert programa.num_columns == desplazamientos[-1] == sum(lp.num_columns for lp in programas)
+    assert programa.nonzeros == sum(lp.nonzeros for lp in programas)
+    solucion = HighsBackend().solve(programa)
+    assert solucion['objective'] == pytest.approx(sum(HighsBackend().solve(lp)['objective'] for lp in programas))
+
+
+def test_registro_de_estadisticas():
+    planes = _planes(range(4), infactibles={2})
+    sink = MemorySink()
+    optimize_production_stacked(planes, stats_sink=sink)
+    assert len(sink.records) == 1
+    registro = sink.records[0]
+    assert registro['source'] == "stacked_solver.optimize_production_stacked"
+    assert registro['num_periods'] == max(len(plan['demands']) for k, plan in enumerate(planes) if k != 2)
+    assert registro['columns'] == sum(_programa(plan).num_columns for k, plan in enumerate(planes) if k != 2)
+    assert registro['status'] == 'Optimal'
+    assert np.isfinite(registro['solve_s'])
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from backends import HighsBackend
+from feasibility import check_feasibility
+from lp_model import build_production_lp
+from sweep import sweep_parameters
+from instancias import instancia_aleatoria
+
+RENDIMIENTOS = (0.8, 0.9)
+DENSIDADES = (0.9, 1.0)
+
+
+def _grilla(instancia, puntos=60):
+    minima = check_feasibility(instancia['initial_stock'], instancia['demands'], min(RENDIMIENTOS),
+                               min(DENSIDADES), 1.0, instancia['safety_stocks'])['min_max_productivity']
+    return np.linspace(0.5 * minima, 2.0 * minima, puntos)
+
+
+def _referencia(instancia, punto, objective, final_stock=None):
+    lp = build_production_lp(instancia['initial_stock'], instancia['demands'],
+                             punto['yield_percentage'] * punto['density'], punto['max_productivity'],
+                             instancia['safety_stocks'], objective=objective, final_stock=final_stock)
+    return lp, HighsBackend().solve(lp)
+
+
+@pytest.mark.parametrize("semilla", range(4))
+@pytest.mark.parametrize("objective", ["min", "max"])
+def test_cada_punto_coincide_con_una_resolucion_propia(semilla, objective):
+    instancia = instancia_aleatoria(semilla)
+    capacidades = _grilla(instancia)
+    barrido = sweep_parameters(instancia['initial_stock'], instancia['demands'], capacidades, RENDIMIENTOS,
+                               DENSIDADES, instancia['safety_stocks'], objective=objective)
+
+    assert len(barrido['points']) == len(RENDIMIENTOS) * len(DENSIDADES) * len(capacidades)
+    assert barrido['solves'] < len(barrido['points']) / 4
+    for punto in barrido['points']:
+        lp, referencia = _referencia(instancia, punto, objective)
+        if referencia['status'] != 'Optimal':
+            assert punto['status'] == 'Infeasible'
+            continue
+        assert punto['status'] == 'Optimal'
+        assert punto['optimal_value'] == pytest.approx(referencia['objective'], rel=1e-6, abs=1e-6)
+        # Los planes interpolados también son factibles para su capacidad
+        plan = np.concatenate([punto['production_levels'], punto['ending_stocks']])
+        assert lp.primal_residual(plan) <= 1e-6 * max(1.0, np.abs(lp.b_eq).max())
+        assert np.all(plan[:len(instancia['demands'])] <= punto['max_productivity'] * (1 + 1e-9))
+
+
+def test_puntos_por_debajo_de_la_minima_no_se_resuelven():
+    instancia = instancia_aleatoria(0)
+    capacidades = _grilla(instancia, puntos=20)
+    barrido = sweep_parameters(instancia['initial_stock'], instancia['demands'], capacidades,
+                               safety_stocks=instancia['safety_stocks'])
+    infactibles = [p for p in barrido['points'] if p['status'] == 'Infeasible']
+    assert infactibles
+    assert all(p['source'] == 'feasibility' for p in infactibles)
+    assert any(p['source'] == 'ranging' for p in barrido['points'])
+
+
+def test_stock_final_exacto():
+    instancia = instancia_aleatoria(1)
+    capacidades = _grilla(instancia, puntos=30)
+    final = instancia['safety_stocks'][-1] + 20.0
+    barrido = sweep_parameters(instancia['initial_stock'], instancia['demands'], capacidades,
+                               safety_stocks=instancia['safety_stocks'], final_stock=final)
+    for punto in barrido['points']:
+        _, referencia = _referencia(instancia, punto, "min", final_stock=final)
+        assert punto['status'] == ('Optimal' if referencia['status'] == 'Optimal' else 'Infeasible')
+        if punto['status'] == 'Optimal':
+            assert punto['optimal_value'] == pytest.approx(referencia['objective'], rel=1e-6)
+            assert punto['ending_stocks'][-1] == pytest.approx(final, rel=1e-6)
+
+
+def test_factores_iguales_comparten_modelo():
+    instancia = instancia_aleatoria(2)
+    capacidades = _grilla(instancia, puntos=20)
+    argumentos = (instancia['initial_stock'], instancia['demands'], capacidades)
+    # 0.8 x 1.0 y 1.0 x 0.8 tienen el mismo factor; 0.8 x 0.8 y 1.0 x 1.0 uno propio cada uno
+    barrido = sweep_parameters(*argumentos, (0.8, 1.0), (1.0, 0.8), instancia['safety_stocks'], return_plans=False)
+    por_separado = [sweep_parameters(*argumentos, (r,), (d,), instancia['safety_stocks'], return_plans=False)
+                    for r, d in ((0.8, 1.0), (0.8, 0.8), (1.0, 1.0))]
+    assert barrido['solves'] == sum(b['solves'] for b in por_separado)
+
+    valores = {}
+    for punto in barrido['points']:
+        valores.setdefault((punto['yield_percentage'], punto['density']), []).append(punto['optimal_value'])
+    assert valores[(0.8, 1.0)] == valores[(1.0, 0.8)]